@@ -0,0 +1,298 @@
+#!/usr/bin/env -S uv run --quiet --script
+# /// script
+# dependencies = [
+#   "web3>=6.0.0",
+# ]
+# ///
+"""
+Local index of the AttestationMade events of the AttestationTracker.
+
+Every run scans the blocks after the last indexed one, and stores the events in
+attestations.jsonl with a cursor in attestations_cursor.json. Block ranges are
+scanned in parallel, and their size adapts to the log limits of the RPC.
+
+Usage:
+  # Index the new events and print a summary
+  ./attestation_indexer.py
+
+  # Attestations of the last 24 hours, from the local index only
+  ./attestation_indexer.py --offline --since 24h
+
+  # Attestations of a multisig since a date
+  ./attestation_indexer.py --multisig 0x... --since 2025-01-31T12:00:00
+"""
+
+import os
+import re
+import json
+import sys
+import argparse
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+from web3 import Web3
+
+from staking_report import ATTESTATION_TRACKER, get_service_entry, load_all_service_configs
+
+# Configuration
+SCRIPT_PATH = Path(__file__).resolve().parent
+ATTESTATIONS_FILE = SCRIPT_PATH / "attestations.jsonl"
+CURSOR_FILE = SCRIPT_PATH / "attestations_cursor.json"
+
+ATTESTATION_MADE_TOPIC = Web3.to_hex(Web3.keccak(text="AttestationMade(address,bytes32)"))
+
+INITIAL_CHUNK_SIZE = 2_000
+MIN_CHUNK_SIZE = 1
+MAX_CHUNK_SIZE = 100_000
+DEFAULT_WORKERS = 4
+CONFIRMATIONS = 10  # Blocks left out of the scan, to stay clear of reorgs
+
+# Errors returned by RPCs when a log query is too large
+RANGE_ERROR_PATTERN = re.compile(
+    r"range|limit|too many|too large|exceed|more than|response size|timeout|timed out",
+    re.IGNORECASE,
+)
+
+
+def get_rpc_url() -> str:
+    """RPC of the service, as in staking_report.py."""
+    rpc_url = os.getenv("BASE_LEDGER_RPC")
+    if not rpc_url:
+        services = load_all_service_configs()
+        if services:
+            rpc_url = get_service_entry(*services[0])["rpc_url"]
+
+    if not rpc_url:
+        print("Error: No RPC URL found (set BASE_LEDGER_RPC)")
+        sys.exit(1)
+    return rpc_url
+
+
+def load_cursor(chain_id: int) -> Optional[int]:
+    """Last indexed block, if the index is for the same tracker and chain."""
+    if not CURSOR_FILE.exists():
+        return None
+
+    with open(CURSOR_FILE) as f:
+        cursor = json.load(f)
+
+    if cursor.get("tracker", "").lower() != ATTESTATION_TRACKER.lower() or cursor.get("chain_id") != chain_id:
+        print("Warning: The local index is for another tracker or chain. Indexing from scratch.")
+        ATTESTATIONS_FILE.unlink(missing_ok=True)
+        return None
+
+    return cursor["last_block"]
+
+
+def save_cursor(chain_id: int, last_block: int):
+    """Atomically save the last indexed block."""
+    tmp_file = CURSOR_FILE.with_suffix(".tmp")
+    with open(tmp_file, "w") as f:
+        json.dump({"tracker": ATTESTATION_TRACKER, "chain_id": chain_id, "last_block": last_block}, f, indent=2)
+    os.replace(tmp_file, CURSOR_FILE)
+
+
+def load_attestations() -> list[dict]:
+    """Load the indexed events, without duplicates."""
+    if not ATTESTATIONS_FILE.exists():
+        return []
+
+    events = {}
+    with open(ATTESTATIONS_FILE) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                event = json.loads(line)
+                events[(event["tx_hash"], event["log_index"])] = event
+    return sorted(events.values(), key=lambda event: (event["block"], event["log_index"]))
+
+
+def find_deployment_block(w3: Web3, address: str, latest_block: int) -> int:
+    """First block where the contract has code, found by binary search (requires an archive RPC)."""
+    low, high = 0, latest_block
+    while low < high:
+        middle = (low + high) // 2
+        if w3.eth.get_code(address, block_identifier=middle):
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+def _get_events(w3: Web3, start: int, end: int) -> list[dict]:
+    """AttestationMade events in the given range, with the timestamps of their blocks."""
+    logs = w3.eth.get_logs({
+        "address": ATTESTATION_TRACKER,
+        "topics": [ATTESTATION_MADE_TOPIC],
+        "fromBlock": start,
+        "toBlock": end,
+    })
+    timestamps = {
+        block: w3.eth.get_block(block)["timestamp"]
+        for block in sorted({log["blockNumber"] for log in logs})
+    }
+    return [
+        {
+            "block": log["blockNumber"],
+            "timestamp": timestamps[log["blockNumber"]],
+            "tx_hash": Web3.to_hex(log["transactionHash"]),
+            "log_index": log["logIndex"],
+            "multisig": Web3.to_checksum_address("0x" + Web3.to_hex(log["topics"][1])[-40:]),
+            "attestation_uid": Web3.to_hex(log["topics"][2]),
+        }
+        for log in logs
+    ]
+
+
+class _ContiguousWriter:
+    """Writes the events of the scanned ranges, advancing the cursor only over contiguous ranges.
+
+    Ranges may complete in any order. A range is only written once every range
+    before it has completed, so that the cursor never skips over unscanned blocks.
+    """
+
+    def __init__(self, chain_id: int, from_block: int):
+        self.chain_id = chain_id
+        self.next_block = from_block
+        self.completed: dict[int, tuple[int, list[dict]]] = {}
+        self.num_events = 0
+
+    def add(self, start: int, end: int, events: list[dict]):
+        self.completed[start] = (end, events)
+        if self.next_block not in self.completed:
+            return
+
+        with open(ATTESTATIONS_FILE, "a") as f:
+            while self.next_block in self.completed:
+                end, events = self.completed.pop(self.next_block)
+                for event in events:
+                    f.write(json.dumps(event) + "\n")
+                self.num_events += len(events)
+                self.next_block = end + 1
+
+        save_cursor(self.chain_id, self.next_block - 1)
+
+
+def index_attestations(w3: Web3, from_block: int, to_block: int, workers: int) -> int:
+    """Index the events between the given blocks. Returns the number of new events."""
+    writer = _ContiguousWriter(w3.eth.chain_id, from_block)
+    chunk_size = INITIAL_CHUNK_SIZE
+    next_start = from_block
+    retries: deque[tuple[int, int]] = deque()
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while next_start <= to_block or retries or running:
+            while len(running) < workers and (retries or next_start <= to_block):
+                if retries:
+                    start, end = retries.popleft()
+                else:
+                    start, end = next_start, min(next_start + chunk_size - 1, to_block)
+                    next_start = end + 1
+                running[executor.submit(_get_events, w3, start, end)] = (start, end)
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                start, end = running.pop(future)
+                try:
+                    events = future.result()
+                except Exception as e:
+                    if start == end or not RANGE_ERROR_PATTERN.search(str(e)):
+                        raise
+                    # Split the range and use smaller chunks from now on
+                    middle = (start + end) // 2
+                    retries.extendleft([(middle + 1, end), (start, middle)])
+                    chunk_size = max(MIN_CHUNK_SIZE, (end - start + 1) // 2)
+                    continue
+
+                chunk_size = min(MAX_CHUNK_SIZE, chunk_size * 2)
+                writer.add(start, end, events)
+                print(f"  Scanned up to block {writer.next_block - 1} ({writer.num_events} events)", end="\r")
+
+    print("")
+    return writer.num_events
+
+
+def parse_since(since: str) -> int:
+    """Timestamp from a relative duration (24h, 3d) or an ISO date."""
+    match = re.fullmatch(r"(\d+)([hd])", since)
+    if match:
+        amount, unit = int(match.group(1)), match.group(2)
+        delta = timedelta(hours=amount) if unit == "h" else timedelta(days=amount)
+        return int((datetime.now() - delta).timestamp())
+    return int(datetime.fromisoformat(since).timestamp())
+
+
+def print_summary(events: list[dict], since: Optional[int], multisig: Optional[str]):
+    """Print the attestations per multisig, and the latest ones."""
+    if since is not None:
+        events = [event for event in events if event["timestamp"] >= since]
+    if multisig:
+        events = [event for event in events if event["multisig"].lower() == multisig.lower()]
+
+    print("\n" + "=" * 80)
+    title = "📋 ATTESTATIONS"
+    if since is not None:
+        title += f" SINCE {datetime.fromtimestamp(since).isoformat(sep=' ', timespec='seconds')}"
+    print(title)
+    print("=" * 80)
+
+    if not events:
+        print("No attestations found")
+        return
+
+    print(f"{'Multisig':<44} {'Attestations':<14} {'Last attestation':<20}")
+    print("-" * 80)
+    counts = Counter(event["multisig"] for event in events)
+    last = {event["multisig"]: event["timestamp"] for event in events}
+    for address, count in counts.most_common():
+        print(f"{address:<44} {count:<14} {datetime.fromtimestamp(last[address]).strftime('%Y-%m-%d %H:%M:%S'):<20}")
+
+    print("\nLatest attestations:")
+    for event in events[-10:]:
+        print(f"  {datetime.fromtimestamp(event['timestamp']).strftime('%Y-%m-%d %H:%M:%S')}  "
+              f"{event['multisig']}  {event['attestation_uid']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index the AttestationMade events of the AttestationTracker")
+    parser.add_argument("--from-block", type=int, help="Block to start indexing from (default: tracker deployment)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"Parallel log queries (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--offline", action="store_true", help="Only query the local index")
+    parser.add_argument("--since", help="Only show attestations since a duration (24h, 3d) or an ISO date")
+    parser.add_argument("--multisig", help="Only show the attestations of this multisig")
+
+    args = parser.parse_args()
+
+    if not args.offline:
+        rpc_url = get_rpc_url()
+        w3 = Web3(Web3.HTTPProvider(rpc_url))
+        if not w3.is_connected():
+            print(f"Error: Could not connect to {rpc_url}")
+            sys.exit(1)
+
+        to_block = w3.eth.block_number - CONFIRMATIONS
+        last_block = load_cursor(w3.eth.chain_id)
+        if last_block is not None:
+            from_block = last_block + 1
+        elif args.from_block is not None:
+            from_block = args.from_block
+        else:
+            print("Looking for the tracker deployment block...")
+            from_block = find_deployment_block(w3, ATTESTATION_TRACKER, to_block)
+
+        if from_block <= to_block:
+            print(f"Indexing blocks {from_block} to {to_block}...")
+            num_events = index_attestations(w3, from_block, to_block, args.workers)
+            print(f"✅ Indexed {num_events} new attestations")
+        else:
+            print("✅ Index is up to date")
+
+    since = parse_since(args.since) if args.since else None
+    print_summary(load_attestations(), since, args.multisig)
+
+
+if __name__ == "__main__":
+    main()
@@ -23,5 +23,6 @@ export PYTHONUTF8=1
 
 set -e  # Exit script on first error
 
-poetry install --only main --no-cache
+source "$(dirname "${BASH_SOURCE[0]}")/scripts/bootstrap.sh"
+install_dependencies --only main --no-cache
 poetry run python -m operate.cli claim $@
\ No newline at end of file
@@ -0,0 +1,222 @@
+#!/usr/bin/env -S uv run --quiet --script
+# /// script
+# dependencies = [
+#   "web3>=6.0.0",
+# ]
+# ///
+"""
+Decode the votes behind EAS attestations of the Quorum voting agent.
+
+Attestations are fetched from EAS in batched calls, and their data is decoded with
+the schema used by the agent. Attestations are immutable, so the decoded rows are
+cached by UID in attestation_data.jsonl and never fetched again.
+
+Usage:
+  # Decode every attestation of the local index (see attestation_indexer.py)
+  ./decode_attestations.py
+
+  # Only the attestations of a multisig
+  ./decode_attestations.py --multisig 0x...
+
+  # Specific attestation UIDs
+  ./decode_attestations.py 0x... 0x...
+"""
+
+import json
+import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from eth_abi import decode
+from web3 import Web3
+
+from attestation_indexer import get_rpc_url, load_attestations
+from scripts.multicall import Call, aggregate
+from staking_report import EAS_CONTRACT
+
+# Configuration
+SCRIPT_PATH = Path(__file__).resolve().parent
+CACHE_FILE = SCRIPT_PATH / "attestation_data.jsonl"
+
+BATCH_SIZE = 100  # Attestations fetched in a single Multicall3 batch
+DEFAULT_WORKERS = 4
+
+# Schema of the attestation data, as encoded by the agent
+ATTESTATION_SCHEMA = [
+    ("agent_address", "address"),
+    ("space_id", "string"),
+    ("proposal_id", "string"),
+    ("vote_choice", "uint8"),
+    ("snapshot_sig", "string"),
+    ("timestamp", "uint256"),
+    ("run_id", "string"),
+    ("confidence", "uint8"),
+]
+VOTE_LABELS = ["For", "Against", "Abstain"]
+
+EAS_ABI = [
+    {
+        "inputs": [{"internalType": "bytes32", "name": "uid", "type": "bytes32"}],
+        "name": "getAttestation",
+        "outputs": [{
+            "components": [
+                {"internalType": "bytes32", "name": "uid", "type": "bytes32"},
+                {"internalType": "bytes32", "name": "schema", "type": "bytes32"},
+                {"internalType": "uint64", "name": "time", "type": "uint64"},
+                {"internalType": "uint64", "name": "expirationTime", "type": "uint64"},
+                {"internalType": "uint64", "name": "revocationTime", "type": "uint64"},
+                {"internalType": "bytes32", "name": "refUID", "type": "bytes32"},
+                {"internalType": "address", "name": "recipient", "type": "address"},
+                {"internalType": "address", "name": "attester", "type": "address"},
+                {"internalType": "bool", "name": "revocable", "type": "bool"},
+                {"internalType": "bytes", "name": "data", "type": "bytes"}
+            ],
+            "internalType": "struct Attestation",
+            "name": "",
+            "type": "tuple"
+        }],
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+
+
+def load_cache() -> dict[str, dict]:
+    """Load the decoded attestations, keyed by UID."""
+    if not CACHE_FILE.exists():
+        return {}
+
+    cache = {}
+    with open(CACHE_FILE) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                row = json.loads(line)
+                cache[row["uid"]] = row
+    return cache
+
+
+def decode_attestation_data(data: bytes) -> Optional[dict]:
+    """Decode the attestation data with the agent schema, or None if it does not match."""
+    try:
+        values = decode([type_ for _, type_ in ATTESTATION_SCHEMA], data)
+    except Exception:
+        return None
+    return {name: value for (name, _), value in zip(ATTESTATION_SCHEMA, values)}
+
+
+def fetch_attestations(w3: Web3, uids: list[str]) -> list[dict]:
+    """Fetch and decode a batch of attestations in a single eth_call."""
+    eas = w3.eth.contract(address=EAS_CONTRACT, abi=EAS_ABI)
+    attestations = aggregate(
+        w3, [Call(eas, "getAttestation", (Web3.to_bytes(hexstr=uid),), allow_failure=True) for uid in uids]
+    )
+
+    rows = []
+    for uid, attestation in zip(uids, attestations):
+        # Unknown UIDs return an empty attestation, they may not be final yet
+        if attestation is None or not any(attestation[0]):
+            continue
+        _, schema, time_, _, _, _, recipient, attester, _, data = attestation
+        decoded = decode_attestation_data(data)
+        row = {
+            "uid": uid,
+            "schema": Web3.to_hex(schema),
+            "time": time_,
+            "attester": attester,
+            "recipient": recipient,
+            "decoded": decoded is not None,
+        }
+        if decoded is None:
+            row["data"] = Web3.to_hex(data)
+        else:
+            decoded["agent_address"] = Web3.to_checksum_address(decoded["agent_address"])
+            row.update(decoded)
+        rows.append(row)
+    return rows
+
+
+def decode_attestations(w3: Web3, uids: list[str], workers: int) -> dict[str, dict]:
+    """Decoded attestations of the given UIDs, fetching the ones that are not cached yet."""
+    cache = load_cache()
+    missing = list(dict.fromkeys(uid for uid in uids if uid not in cache))
+    print(f"{len(uids)} attestations, {len(uids) - len(missing)} cached, fetching {len(missing)}")
+
+    if missing:
+        batches = [missing[i:i + BATCH_SIZE] for i in range(0, len(missing), BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=workers) as executor, open(CACHE_FILE, "a") as f:
+            for rows in executor.map(lambda batch: fetch_attestations(w3, batch), batches):
+                for row in rows:
+                    f.write(json.dumps(row) + "\n")
+                    cache[row["uid"]] = row
+                f.flush()
+
+    not_found = [uid for uid in uids if uid not in cache]
+    if not_found:
+        print(f"Warning: {len(not_found)} attestations not found on EAS")
+    return {uid: cache[uid] for uid in uids if uid in cache}
+
+
+def print_attestations(rows: list[dict]):
+    """Print the decoded votes."""
+    print("\n" + "=" * 100)
+    print("🗳️  DECODED ATTESTATIONS")
+    print("=" * 100)
+
+    if not rows:
+        print("No attestations found")
+        return
+
+    print(f"{'Time':<20} {'Space':<24} {'Proposal':<24} {'Vote':<9} {'Conf.':<6} {'Run':<15}")
+    print("-" * 100)
+    for row in sorted(rows, key=lambda row: row["time"]):
+        time_ = datetime.fromtimestamp(row["time"]).strftime('%Y-%m-%d %H:%M:%S')
+        if not row["decoded"]:
+            print(f"{time_:<20} (data does not match the schema: {row['uid']})")
+            continue
+        choice = row["vote_choice"]
+        vote = VOTE_LABELS[choice] if choice < len(VOTE_LABELS) else f"Choice {choice}"
+        print(f"{time_:<20} "
+              f"{row['space_id'][:23]:<24} "
+              f"{row['proposal_id'][:23]:<24} "
+              f"{vote:<9} "
+              f"{row['confidence']:<6} "
+              f"{row['run_id'][:15]:<15}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode the votes behind EAS attestations")
+    parser.add_argument("uids", nargs="*", help="Attestation UIDs (default: every UID of the local index)")
+    parser.add_argument("--multisig", help="Only decode the indexed attestations of this multisig")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"Parallel batches (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--json", action="store_true", help="Print the decoded rows as JSON")
+
+    args = parser.parse_args()
+
+    uids = [uid.lower() for uid in args.uids]
+    if not uids:
+        uids = [
+            event["attestation_uid"] for event in load_attestations()
+            if not args.multisig or event["multisig"].lower() == args.multisig.lower()
+        ]
+        if not uids:
+            print("No attestation UIDs given, and none found in the local index (run ./attestation_indexer.py)")
+            sys.exit(1)
+
+    rpc_url = get_rpc_url()
+    w3 = Web3(Web3.HTTPProvider(rpc_url))
+    if not w3.is_connected():
+        print(f"Error: Could not connect to {rpc_url}")
+        sys.exit(1)
+
+    rows = list(decode_attestations(w3, uids, args.workers).values())
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_attestations(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env -S uv run --quiet --script
+# /// script
+# dependencies = [
+#   "web3>=6.0.0",
+# ]
+# ///
+"""
+Liveness forecast for the current epoch of the Quorum voting agent.
+
+The liveness parameters, checkpoint times and nonces of every service are read in
+one batched call. The forecast is then computed with the same integer arithmetic
+as the activity checker, so it needs no further RPC requests:
+
+  ratio pass  <=>  attestations * 1e18 >= livenessRatio * seconds since the epoch start
+
+Usage:
+  # Forecast every service in .operate/services
+  ./liveness_forecast.py
+"""
+
+import sys
+import time
+import argparse
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from web3 import Web3
+
+from scripts.multicall import Call, aggregate, block_timestamp_call
+from staking_report import (
+    ACTIVITY_CHECKER,
+    ACTIVITY_CHECKER_ABI,
+    STAKING_ABI,
+    get_service_entry,
+    load_all_service_configs,
+)
+
+# Liveness ratio of the Quorum activity checker (1 attestation per 24 hours), for when it cannot be read
+DEFAULT_LIVENESS_RATIO = 11574074074074
+
+RATIO_PRECISION = 10**18
+
+STAKING_EPOCH_ABI = [
+    {
+        "inputs": [],
+        "name": "tsCheckpoint",
+        "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "inputs": [],
+        "name": "maxInactivity",
+        "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function"
+    },
+]
+
+
+def is_ratio_pass(attestations: int, time_elapsed: int, liveness_ratio: int) -> bool:
+    """Whether the attestations pass the liveness ratio, as checked by the activity checker."""
+    return time_elapsed > 0 and (attestations * RATIO_PRECISION) // time_elapsed >= liveness_ratio
+
+
+def required_attestations(time_elapsed: int, liveness_ratio: int) -> int:
+    """Minimum number of attestations passing the liveness ratio after the elapsed time."""
+    return -(-liveness_ratio * time_elapsed // RATIO_PRECISION)
+
+
+def attestations_needed(attestations: int, time_elapsed: int, liveness_ratio: int) -> int:
+    """Attestations still missing to pass the liveness ratio after the elapsed time."""
+    return max(0, required_attestations(time_elapsed, liveness_ratio) - attestations)
+
+
+def read_liveness_ratio(w3: Web3) -> int:
+    """Liveness ratio of the activity checker, or the default one if it cannot be read."""
+    activity_checker = w3.eth.contract(address=ACTIVITY_CHECKER, abi=ACTIVITY_CHECKER_ABI)
+    try:
+        return activity_checker.functions.livenessRatio().call()
+    except Exception:
+        return DEFAULT_LIVENESS_RATIO
+
+
+@dataclass(frozen=True)
+class LivenessForecast:
+    """Liveness forecast of a service for the current epoch."""
+
+    now: int
+    epoch_start: int  # Last checkpoint, or the staking time if the service was staked after it
+    next_checkpoint: int  # Earliest time the next checkpoint can be called
+    liveness_ratio: int
+    attestations: int  # Attestations since the epoch start
+    max_inactivity: Optional[int]
+
+    @property
+    def passes_now(self) -> bool:
+        """Whether the service would pass if the checkpoint was called now."""
+        return is_ratio_pass(self.attestations, self.now - self.epoch_start, self.liveness_ratio)
+
+    @property
+    def passes_at_checkpoint(self) -> bool:
+        """Whether the service passes at the next checkpoint without more attestations."""
+        return is_ratio_pass(self.attestations, self.next_checkpoint - self.epoch_start, self.liveness_ratio)
+
+    @property
+    def attestations_needed(self) -> int:
+        """Attestations still needed to pass at the next checkpoint."""
+        return attestations_needed(self.attestations, self.next_checkpoint - self.epoch_start, self.liveness_ratio)
+
+    @property
+    def passing_until(self) -> int:
+        """Last time at which the current attestations still pass the ratio."""
+        return self.epoch_start + self.attestations * RATIO_PRECISION // self.liveness_ratio
+
+    @property
+    def submit_deadline(self) -> int:
+        """Latest time to submit the missing attestations."""
+        return self.next_checkpoint
+
+    @property
+    def eviction_risk_at(self) -> Optional[int]:
+        """Time after which a service that keeps failing the ratio from the epoch start may be evicted."""
+        return self.epoch_start + self.max_inactivity if self.max_inactivity is not None else None
+
+
+# Calls made for each service in read_forecasts
+FORECAST_CALLS_PER_SERVICE = 5
+
+
+def read_forecasts(w3: Web3, services: list[dict], block_identifier="latest") -> list[Optional[LivenessForecast]]:
+    """Read the liveness forecasts of services sharing an RPC, in one Multicall3 batch.
+
+    Services whose reads failed get None, without failing the others.
+    """
+    activity_checker = w3.eth.contract(address=ACTIVITY_CHECKER, abi=ACTIVITY_CHECKER_ABI)
+
+    calls = [block_timestamp_call(w3), Call(activity_checker, "livenessRatio", allow_failure=True)]
+    for service in services:
+        staking = w3.eth.contract(address=service["staking_contract"], abi=STAKING_ABI + STAKING_EPOCH_ABI)
+        calls += [
+            Call(staking, "getServiceInfo", (int(service["service_id"]),), allow_failure=True),
+            Call(staking, "tsCheckpoint", allow_failure=True),
+            Call(staking, "livenessPeriod", allow_failure=True),
+            Call(staking, "maxInactivity", allow_failure=True),
+            Call(activity_checker, "getMultisigNonces", (service["multisig"],), allow_failure=True),
+        ]
+
+    now, liveness_ratio, *results = aggregate(w3, calls, block_identifier)
+    liveness_ratio = liveness_ratio or DEFAULT_LIVENESS_RATIO
+
+    forecasts: list[Optional[LivenessForecast]] = []
+    for i in range(len(services)):
+        service_info, ts_checkpoint, liveness_period, max_inactivity, current_nonces = results[
+            i * FORECAST_CALLS_PER_SERVICE:(i + 1) * FORECAST_CALLS_PER_SERVICE
+        ]
+        if None in (service_info, ts_checkpoint, liveness_period, current_nonces):
+            forecasts.append(None)
+            continue
+
+        # The activity checker counts the attestations in the nonces at index 1
+        last_nonces = service_info[2]
+        last_attestations = last_nonces[1] if len(last_nonces) > 1 else 0
+        current_attestations = current_nonces[1] if len(current_nonces) > 1 else 0
+        forecasts.append(
+            LivenessForecast(
+                now=now,
+                epoch_start=max(ts_checkpoint, service_info[3]),
+                next_checkpoint=ts_checkpoint + liveness_period,
+                liveness_ratio=liveness_ratio,
+                attestations=current_attestations - last_attestations,
+                max_inactivity=max_inactivity,
+            )
+        )
+
+    return forecasts
+
+
+def _format_time(timestamp: int, now: int) -> str:
+    remaining = timestamp - now
+    sign = "-" if remaining < 0 else "+"
+    hours, seconds = divmod(abs(remaining), 3600)
+    return f"{datetime.fromtimestamp(timestamp).strftime('%m-%d %H:%M')} ({sign}{hours}h{seconds // 60:02d})"
+
+
+def print_forecasts(services: list[dict], forecasts: list[Optional[LivenessForecast]]):
+    """Print the forecast of every service."""
+    print("\n" + "=" * 110)
+    print("🔮 LIVENESS FORECAST")
+    print("=" * 110)
+    print(f"{'Service':<24} {'Attest.':>7} {'Now':<5} {'Next checkpoint':<22} {'Needed':>6} {'Passing until':<22} {'Eviction risk':<22}")
+    print("-" * 110)
+    for service, forecast in zip(services, forecasts):
+        name = service["name"][:24]
+        if forecast is None:
+            print(f"{name:<24} {'error':>7}")
+            continue
+        eviction = _format_time(forecast.eviction_risk_at, forecast.now) if forecast.eviction_risk_at else "N/A"
+        print(f"{name:<24} {forecast.attestations:>7} "
+              f"{'PASS' if forecast.passes_now else 'FAIL':<5} "
+              f"{_format_time(forecast.next_checkpoint, forecast.now):<22} "
+              f"{forecast.attestations_needed:>6} "
+              f"{_format_time(forecast.passing_until, forecast.now):<22} "
+              f"{eviction:<22}")
+    print("-" * 110)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Liveness forecast for the current epoch")
+    parser.add_argument("--block", type=int, help="Block to read at (default: latest)")
+
+    args = parser.parse_args()
+
+    services = [
+        entry
+        for entry in (get_service_entry(service_dir, config) for service_dir, config in load_all_service_configs())
+        if entry["service_id"] and int(entry["service_id"]) > 0 and entry["multisig"] and entry["rpc_url"]
+    ]
+    if not services:
+        print("Error: No deployed service found in .operate/services")
+        sys.exit(1)
+
+    # Services sharing an RPC are forecast together
+    by_rpc: dict[str, list[int]] = {}
+    for i, service in enumerate(services):
+        by_rpc.setdefault(service["rpc_url"], []).append(i)
+
+    forecasts: list[Optional[LivenessForecast]] = [None] * len(services)
+    start = time.perf_counter()
+    for rpc_url, indexes in by_rpc.items():
+        w3 = Web3(Web3.HTTPProvider(rpc_url))
+        try:
+            results = read_forecasts(w3, [services[i] for i in indexes], args.block if args.block is not None else "latest")
+        except Exception as e:
+            print(f"Warning: Could not read the services of {rpc_url}: {e}")
+            continue
+        for i, forecast in zip(indexes, results):
+            forecasts[i] = forecast
+
+    print_forecasts(services, forecasts)
+    print(f"Forecast {len(services)} services in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,15 +4,37 @@
 #   "web3>=6.0.0",
 # ]
 # ///
-"""Query the Attestation Tracker contract directly for voting data."""
+"""
+Query the Attestation Tracker contract directly for voting data.
 
+The counters of every multisig are read in a single Multicall3 batch, so checking
+a whole fleet costs one RPC round trip.
+
+Usage:
+  # Every service multisig in .operate/services
+  ./query_attestations.py
+
+  # Specific multisigs, exported as CSV
+  ./query_attestations.py 0x... 0x... --format csv --output attestations.csv
+"""
+
+import os
+import csv
+import json
+import sys
+import argparse
 from web3 import Web3
 
+from scripts.multicall import Call, aggregate
+from staking_report import get_service_entry, load_all_service_configs
+
 # Configuration
 RPC_URL = "https://cosmopolitan-cosmological-resonance.base-mainnet.quiknode.pro/b4c827323f0a8012212429b0bd4a72a060c5373c/"
 ATTESTATION_TRACKER = "0x9BC8c713a159a028aC5590ffE42DaF0d9A6467AC"
 MULTISIG = "0x7dF2A42C5a9006B16E6c7e6Ac750cdf336489c80"
 
+COLUMNS = ["name", "multisig", "attestations", "for", "against", "abstain", "other", "total_votes", "mapping"]
+
 # ABI for the attestation tracker
 ATTESTATION_TRACKER_ABI = [
     {
@@ -38,62 +60,109 @@ ATTESTATION_TRACKER_ABI = [
     }
 ]
 
+
+def get_targets(multisigs: list[str], from_operate: bool) -> tuple[list[dict], str]:
+    """Multisigs to query, with a name each, and the RPC to query them with."""
+    entries = [get_service_entry(service_dir, config) for service_dir, config in load_all_service_configs()]
+    targets = [{"name": multisig[:10], "multisig": multisig} for multisig in multisigs]
+    if from_operate or not targets:
+        targets += [{"name": entry["name"], "multisig": entry["multisig"]} for entry in entries if entry["multisig"]]
+    if not targets:
+        targets = [{"name": "default", "multisig": MULTISIG}]
+
+    rpc_url = os.getenv("BASE_LEDGER_RPC") or next((entry["rpc_url"] for entry in entries if entry["rpc_url"]), RPC_URL)
+    return targets, rpc_url
+
+
+def query_attestations(w3: Web3, targets: list[dict], block_identifier="latest") -> list[dict]:
+    """Read the attestation counters of every multisig in one Multicall3 batch."""
+    tracker = w3.eth.contract(address=ATTESTATION_TRACKER, abi=ATTESTATION_TRACKER_ABI)
+
+    calls = []
+    for target in targets:
+        multisig = Web3.to_checksum_address(target["multisig"])
+        calls += [
+            Call(tracker, "getNumAttestations", (multisig,), allow_failure=True),
+            Call(tracker, "getVotingStats", (multisig,), allow_failure=True),
+            Call(tracker, "mapMultisigAttestations", (multisig,), allow_failure=True),
+        ]
+    results = aggregate(w3, calls, block_identifier)
+
+    rows = []
+    for i, target in enumerate(targets):
+        num_attestations, voting_stats, mapping = results[3 * i:3 * i + 3]
+        voting_stats = voting_stats or []
+        rows.append({
+            "name": target["name"],
+            "multisig": Web3.to_checksum_address(target["multisig"]),
+            "attestations": num_attestations,
+            "for": voting_stats[0] if len(voting_stats) > 0 else 0,
+            "against": voting_stats[1] if len(voting_stats) > 1 else 0,
+            "abstain": voting_stats[2] if len(voting_stats) > 2 else 0,
+            "other": sum(voting_stats[3:]),
+            "total_votes": sum(voting_stats),
+            "mapping": mapping,
+        })
+    return rows
+
+
+def print_table(rows: list[dict], out=sys.stdout):
+    """Print the counters of every multisig."""
+    print("=" * 110, file=out)
+    print("ATTESTATION DATA", file=out)
+    print("=" * 110, file=out)
+    print(f"{'Name':<20} {'Multisig':<44} {'Attest.':>8} {'For':>6} {'Against':>8} {'Abstain':>8} {'Votes':>6} {'Votes/att.':>10}", file=out)
+    print("-" * 110, file=out)
+    for row in rows:
+        if row["attestations"] is None:
+            print(f"{row['name'][:20]:<20} {row['multisig']:<44} {'error':>8}", file=out)
+            continue
+        votes_per_attestation = f"{row['total_votes'] / row['attestations']:.2f}" if row["attestations"] else "-"
+        print(f"{row['name'][:20]:<20} {row['multisig']:<44} {row['attestations']:>8} "
+              f"{row['for']:>6} {row['against']:>8} {row['abstain']:>8} {row['total_votes']:>6} {votes_per_attestation:>10}", file=out)
+    print("-" * 110, file=out)
+
+    # getNumAttestations counts transactions, and an attestation may hold several votes
+    if any(row["attestations"] is not None and row["total_votes"] != row["attestations"] for row in rows):
+        print("Note: Votes/att. above 1 means that single attestations hold votes on several proposals", file=out)
+
+
 def main():
-    # Connect to Base
-    w3 = Web3(Web3.HTTPProvider(RPC_URL))
-    
+    parser = argparse.ArgumentParser(description="Query the Attestation Tracker for the voting data of many multisigs")
+    parser.add_argument("multisigs", nargs="*", help="Multisigs to query (default: the service multisigs in .operate/services)")
+    parser.add_argument("--from-operate", action="store_true", help="Also query the service multisigs in .operate/services")
+    parser.add_argument("--rpc", help="RPC URL (default: BASE_LEDGER_RPC or the service configuration)")
+    parser.add_argument("--block", type=int, help="Block to read at (default: latest)")
+    parser.add_argument("--format", choices=["table", "csv", "json"], default="table", help="Output format (default: table)")
+    parser.add_argument("--output", help="File to write to (default: standard output)")
+
+    args = parser.parse_args()
+
+    targets, rpc_url = get_targets(args.multisigs, args.from_operate)
+    w3 = Web3(Web3.HTTPProvider(args.rpc or rpc_url))
+
     if not w3.is_connected():
         print(f"Error: Could not connect to RPC")
-        return
-    
-    print(f"Connected to chain ID: {w3.eth.chain_id}")
-    print(f"Attestation Tracker: {ATTESTATION_TRACKER}")
-    print(f"Multisig: {MULTISIG}")
-    print()
-    
-    # Initialize contract
-    tracker = w3.eth.contract(address=ATTESTATION_TRACKER, abi=ATTESTATION_TRACKER_ABI)
-    
-    # Query attestation count
-    print("=" * 60)
-    print("ATTESTATION DATA")
-    print("=" * 60)
-    
-    try:
-        num_attestations = tracker.functions.getNumAttestations(MULTISIG).call()
-        print(f"Total Attestations: {num_attestations}")
-    except Exception as e:
-        print(f"Error getting attestation count: {e}")
-    
-    # Query voting stats
-    print("\nVOTING BREAKDOWN")
-    print("-" * 60)
-    
+        sys.exit(1)
+
+    rows = query_attestations(w3, targets, args.block if args.block is not None else "latest")
+
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
     try:
-        voting_stats = tracker.functions.getVotingStats(MULTISIG).call()
-        if voting_stats:
-            vote_labels = ["For", "Against", "Abstain"]
-            for i, count in enumerate(voting_stats):
-                if i < len(vote_labels):
-                    print(f"{vote_labels[i]:>10}: {count}")
-                else:
-                    print(f"Choice {i:>3}: {count}")
+        if args.format == "csv":
+            writer = csv.DictWriter(out, fieldnames=COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+        elif args.format == "json":
+            json.dump(rows, out, indent=2)
+            out.write("\n")
         else:
-            print("No voting stats available")
-    except Exception as e:
-        print(f"Error getting voting stats: {e}")
-    
-    # Query direct mapping
-    print("\nDIRECT MAPPING QUERY")
-    print("-" * 60)
-    
-    try:
-        map_value = tracker.functions.mapMultisigAttestations(MULTISIG).call()
-        print(f"mapMultisigAttestations[{MULTISIG}]: {map_value}")
-    except Exception as e:
-        print(f"Error querying mapping: {e}")
-    
-    print("\n" + "=" * 60)
+            print_table(rows, out)
+    finally:
+        if args.output:
+            out.close()
+            print(f"✅ Wrote {len(rows)} rows to {args.output}")
+
 
 if __name__ == "__main__":
     main()
@@ -88,6 +88,6 @@ if [ -d ".operate/services" ]; then
 fi
 
 # Install dependencies and run the agent througth the middleware
-poetry install --only main --no-cache
-poetry run pip install --upgrade packaging  # TODO: update packaging version from open-aea
+source "$(dirname "${BASH_SOURCE[0]}")/scripts/bootstrap.sh"
+install_dependencies --only main --no-cache
 poetry run python -m operate.cli quickstart $@
\ No newline at end of file
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Local Anvil forks, one per test run, and funding of accounts on them.
+
+Every fork listens on its own free port, so several forks can run side by side,
+for instance one per config under pytest-xdist.
+
+The service agents run in Docker containers, where localhost is the container
+itself: they are given `AnvilFork.container_url`, while the test harness uses
+`AnvilFork.url`.
+"""
+
+import os
+import shutil
+import socket
+import subprocess  # nosec
+import sys
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, List, Optional
+
+from eth_abi import encode
+from eth_utils import keccak
+from web3 import Web3
+
+from scripts.docker_status import get_docker_client
+
+
+ANVIL_START_TIMEOUT = 60
+# Storage slots tried when looking for the balances mapping of an ERC20 token
+MAX_BALANCE_SLOT = 20
+
+ERC20_BALANCE_ABI = [
+    {
+        "constant": True,
+        "inputs": [{"name": "_owner", "type": "address"}],
+        "name": "balanceOf",
+        "outputs": [{"name": "balance", "type": "uint256"}],
+        "type": "function"
+    }
+]
+
+
+def get_free_port(host: str = "127.0.0.1") -> int:
+    """Port that is free on the host, as picked by the OS."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+@lru_cache(maxsize=None)
+def get_docker_host_address() -> str:
+    """Address of the host that is reachable both from the host and from the service containers.
+
+    Operate does not rewrite localhost RPCs: the configured RPC is used as is by
+    the middleware on the host and by the agents in their containers. On Linux,
+    the gateway of the default bridge network is an address of the host, and it
+    is what host.docker.internal resolves to in the agent containers, which are
+    started with "host.docker.internal:host-gateway". Docker Desktop resolves
+    host.docker.internal itself.
+    """
+    if not sys.platform.startswith("linux"):
+        return "host.docker.internal"
+    bridge = get_docker_client().networks.get("bridge")
+    return bridge.attrs["IPAM"]["Config"][0]["Gateway"]
+
+
+def get_xdist_worker() -> str:
+    """Name of the pytest-xdist worker running this process ("gw0", ...), or "main"."""
+    return os.getenv("PYTEST_XDIST_WORKER", "main")
+
+
+class AnvilFork:
+    """Anvil node forking a chain from an RPC, or loading a saved state.
+
+    Use it as a context manager, or call `start` and `stop`.
+    """
+
+    def __init__(
+        self,
+        fork_url: Optional[str] = None,
+        state_path: Optional[Path] = None,
+        port: Optional[int] = None,
+        host: str = "0.0.0.0",  # nosec
+    ) -> None:
+        """Initialize the fork."""
+        self.fork_url = fork_url
+        self.state_path = state_path
+        self.host = host
+        self.port = port or get_free_port()
+        self._process: Optional[subprocess.Popen] = None
+
+    @property
+    def url(self) -> str:
+        """RPC URL of the fork, from the host."""
+        return f"http://localhost:{self.port}"
+
+    @property
+    def container_url(self) -> str:
+        """RPC URL of the fork, from the host and from the service containers."""
+        return f"http://{get_docker_host_address()}:{self.port}"
+
+    def command(self) -> List[str]:
+        """Command line starting the fork."""
+        command = ["anvil", "--host", self.host, "--port", str(self.port), "--auto-impersonate", "--silent"]
+        if self.fork_url:
+            command += ["--fork-url", self.fork_url]
+        if self.state_path:
+            command += ["--load-state", str(self.state_path)]
+        return command
+
+    def start(self, timeout: float = ANVIL_START_TIMEOUT) -> "AnvilFork":
+        """Start Anvil and wait until it answers RPC requests."""
+        if shutil.which("anvil") is None:
+            raise RuntimeError("Anvil is not installed, see https://book.getfoundry.sh/getting-started/installation")
+
+        self._process = subprocess.Popen(  # nosec
+            self.command(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+        w3 = Web3(Web3.HTTPProvider(self.url))
+        deadline = time.monotonic() + timeout
+        delay = 0.1
+        while not w3.is_connected():
+            if self._process.poll() is not None:
+                error = self._process.stderr.read().decode(errors="replace") if self._process.stderr else ""
+                raise RuntimeError(f"Anvil exited with code {self._process.returncode}: {error.strip()}")
+            if time.monotonic() > deadline:
+                self.stop()
+                raise TimeoutError(f"Anvil did not answer on {self.url} within {timeout} seconds")
+            time.sleep(delay)
+            delay = min(delay * 2, 2.0)
+        return self
+
+    def stop(self) -> None:
+        """Stop Anvil."""
+        if self._process is None:
+            return
+        self._process.terminate()
+        try:
+            self._process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+        self._process = None
+
+    def __enter__(self) -> "AnvilFork":
+        """Start the fork."""
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:
+        """Stop the fork."""
+        self.stop()
+
+
+def is_anvil(w3: Web3) -> bool:
+    """Whether the node behind the provider is Anvil."""
+    try:
+        return "anvil" in w3.client_version.lower()
+    except Exception:  # pylint: disable=broad-except
+        return False
+
+
+def add_balance(w3: Web3, address: str, amount_wei: int) -> None:
+    """Add native tokens to an account of an Anvil node."""
+    address = Web3.to_checksum_address(address)
+    balance = w3.eth.get_balance(address)
+    w3.provider.make_request("anvil_setBalance", [address, hex(balance + amount_wei)])
+
+
+def set_erc20_balance(w3: Web3, token: str, address: str, amount: int) -> None:
+    """Set the ERC20 balance of an account of an Anvil node.
+
+    The balances mapping is found by writing each candidate storage slot and
+    checking `balanceOf`, as tokens don't expose its position.
+    """
+    token = Web3.to_checksum_address(token)
+    address = Web3.to_checksum_address(address)
+    contract = w3.eth.contract(address=token, abi=ERC20_BALANCE_ABI)
+    value = "0x" + amount.to_bytes(32, "big").hex()
+
+    for slot in range(MAX_BALANCE_SLOT):
+        storage_key = "0x" + keccak(encode(["address", "uint256"], [address, slot])).hex()
+        previous = w3.eth.get_storage_at(token, storage_key)
+        w3.provider.make_request("anvil_setStorageAt", [token, storage_key, value])
+        if contract.functions.balanceOf(address).call() == amount:
+            return
+        w3.provider.make_request("anvil_setStorageAt", [token, storage_key, "0x" + bytes(previous).rjust(32, b"\0").hex()])
+
+    raise RuntimeError(f"Could not find the balances slot of token {token}")
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""EIP-712 signatures of EAS delegated attestations.
+
+The domain separator and the type hash are computed once per signer, so signing
+only hashes the message struct. Large sets can be signed across a process pool.
+This module only depends on web3, so that it can be used by the standalone scripts.
+
+Benchmark:
+  python -m scripts.attestation_signer --benchmark 10000 --workers 4
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from eth_abi import encode
+from eth_keys import keys
+from eth_utils import keccak, to_checksum_address
+
+
+EAS_DOMAIN_NAME = "EAS"
+EAS_DOMAIN_VERSION = "1.0.1"
+
+EIP712_DOMAIN_TYPEHASH = keccak(
+    text="EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)"
+)
+ATTEST_TYPEHASH = keccak(
+    text=(
+        "Attest(bytes32 schema,address recipient,uint64 expirationTime,bool revocable,"
+        "bytes32 refUID,bytes data,uint256 value,uint256 nonce,uint64 deadline)"
+    )
+)
+ZERO_BYTES32 = bytes(32)
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+@dataclass(frozen=True)
+class AttestationRequest:
+    """Fields of a delegated attestation that change between messages."""
+
+    data: bytes
+    nonce: int
+    deadline: int
+    recipient: str = ZERO_ADDRESS
+    expiration_time: int = 0
+    revocable: bool = True
+    ref_uid: bytes = ZERO_BYTES32
+    value: int = 0
+
+
+def get_domain_separator(chain_id: int, verifying_contract: str) -> bytes:
+    """EIP-712 domain separator of the EAS contract."""
+    return keccak(
+        encode(
+            ["bytes32", "bytes32", "bytes32", "uint256", "address"],
+            [
+                EIP712_DOMAIN_TYPEHASH,
+                keccak(text=EAS_DOMAIN_NAME),
+                keccak(text=EAS_DOMAIN_VERSION),
+                chain_id,
+                to_checksum_address(verifying_contract),
+            ],
+        )
+    )
+
+
+class AttestationSigner:
+    """Signs EAS delegated attestations of a schema for a chain and EAS contract."""
+
+    def __init__(self, private_key: str, chain_id: int, verifying_contract: str, schema_uid: str) -> None:
+        """Initialize the signer."""
+        self.private_key = keys.PrivateKey(bytes.fromhex(private_key.removeprefix("0x")))
+        self.address = self.private_key.public_key.to_checksum_address()
+        self.chain_id = chain_id
+        self.verifying_contract = verifying_contract
+        self.schema = bytes.fromhex(schema_uid.removeprefix("0x"))
+        self.domain_separator = get_domain_separator(chain_id, verifying_contract)
+
+    def digest(self, request: AttestationRequest) -> bytes:
+        """EIP-712 digest of an attestation."""
+        struct_hash = keccak(
+            encode(
+                ["bytes32", "bytes32", "address", "uint64", "bool", "bytes32", "bytes32", "uint256", "uint256", "uint64"],
+                [
+                    ATTEST_TYPEHASH,
+                    self.schema,
+                    request.recipient,
+                    request.expiration_time,
+                    request.revocable,
+                    request.ref_uid,
+                    keccak(request.data),
+                    request.value,
+                    request.nonce,
+                    request.deadline,
+                ],
+            )
+        )
+        return keccak(b"\x19\x01" + self.domain_separator + struct_hash)
+
+    def sign(self, request: AttestationRequest) -> bytes:
+        """65-byte signature (r, s, v) of an attestation, with v in {27, 28}."""
+        signature = self.private_key.sign_msg_hash(self.digest(request))
+        return signature.r.to_bytes(32, "big") + signature.s.to_bytes(32, "big") + bytes([signature.v + 27])
+
+    def sign_batch(
+        self, requests: Sequence[AttestationRequest], workers: Optional[int] = None, chunk_size: int = 256
+    ) -> List[bytes]:
+        """Signatures of many attestations, in order, spread over a process pool."""
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(requests) <= chunk_size:
+            return [self.sign(request) for request in requests]
+
+        chunks = [requests[i:i + chunk_size] for i in range(0, len(requests), chunk_size)]
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self.private_key.to_hex(), self.chain_id, self.verifying_contract, "0x" + self.schema.hex()),
+        ) as executor:
+            return [signature for signatures in executor.map(_sign_chunk, chunks) for signature in signatures]
+
+
+# Signer of each pool process, created once by the initializer
+_worker_signer: Optional[AttestationSigner] = None
+
+
+def _init_worker(private_key: str, chain_id: int, verifying_contract: str, schema_uid: str) -> None:
+    global _worker_signer  # pylint: disable=global-statement
+    _worker_signer = AttestationSigner(private_key, chain_id, verifying_contract, schema_uid)
+
+
+def _sign_chunk(requests: Sequence[AttestationRequest]) -> List[bytes]:
+    return [_worker_signer.sign(request) for request in requests]  # type: ignore[union-attr]
+
+
+def _benchmark(count: int, workers: int) -> None:
+    signer = AttestationSigner(
+        # Anvil default key
+        "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80",
+        chain_id=8453,
+        verifying_contract="0x4200000000000000000000000000000000000021",
+        schema_uid="0xc93c2cd5d2027a300cc7ca3d22b36b5581353f6dabab6e14eb41daf76d5b0eb4",
+    )
+    deadline = int(time.time()) + 3600
+    requests = [
+        AttestationRequest(data=encode(["string", "uint256"], [f"synthetic-{i}", i]), nonce=0, deadline=deadline)
+        for i in range(count)
+    ]
+
+    start = time.perf_counter()
+    signer.sign_batch(requests, workers=workers)
+    elapsed = time.perf_counter() - start
+    print(f"Signed {count} attestations with {workers} worker(s) in {elapsed:.2f}s ({count / elapsed:,.0f}/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the attestation signer")
+    parser.add_argument("--benchmark", type=int, default=10000, metavar="N", help="Number of attestations to sign")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Signing processes")
+    args = parser.parse_args()
+    _benchmark(args.benchmark, args.workers)
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Delegated attestations sent through the AttestationTracker on an Anvil fork.
+
+Used by the staking test scripts: the attestations are signed by an operate key
+and sent from the service multisig, which Anvil impersonates.
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+from eth_abi import encode
+
+from scripts.attestation_signer import AttestationRequest, AttestationSigner
+
+
+ATTESTATION_TRACKER = "0x9BC8c713a159a028aC5590ffE42DaF0d9A6467AC"
+EAS_CONTRACT = "0x4200000000000000000000000000000000000021"  # Base EAS
+SCHEMA_UID = "0xc93c2cd5d2027a300cc7ca3d22b36b5581353f6dabab6e14eb41daf76d5b0eb4"
+NO_EXPIRATION = 0
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+KEYS_FILE = Path(__file__).resolve().parents[1] / ".operate" / "keys.json"
+ANVIL_DEFAULT_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+
+
+def load_private_key(keys_file: Path = KEYS_FILE) -> str:
+    """Private key of the first operate key, or the Anvil default key if there is none."""
+    if not keys_file.exists():
+        print("Using Anvil default key")
+        return ANVIL_DEFAULT_KEY
+
+    with open(keys_file) as f:
+        keys_data = json.load(f)
+    first_addr = list(keys_data.keys())[0]
+    print(f"Loaded key for {first_addr}")
+    return keys_data[first_addr]
+
+
+def encode_attestation_data(  # pylint: disable=too-many-arguments
+    agent_address: str,
+    space_id: str,
+    proposal_id: str,
+    vote_choice: int,
+    snapshot_sig: str,
+    run_id: str,
+    confidence: int,
+) -> bytes:
+    """Encode attestation data according to the schema."""
+    timestamp = int(time.time())
+    return encode(
+        ["address", "string", "string", "uint8", "string", "uint256", "string", "uint8"],
+        [agent_address, space_id, proposal_id, vote_choice, snapshot_sig, timestamp, run_id, confidence],
+    )
+
+
+# Signers by account and schema, so that the domain separator is only computed once
+_signers: Dict[Tuple[str, str], AttestationSigner] = {}
+
+
+def get_attestation_signer(w3: Any, account: Any, schema_uid: str) -> AttestationSigner:
+    """Attestation signer of the account for the schema."""
+    key = (account.address, schema_uid)
+    if key not in _signers:
+        _signers[key] = AttestationSigner(account.key.hex(), w3.eth.chain_id, EAS_CONTRACT, schema_uid)
+    return _signers[key]
+
+
+def build_attestation_tx_data(  # pylint: disable=too-many-arguments
+    w3: Any,
+    account: Any,
+    tracker: Any,
+    attestation_num: int,
+    multisig: str,
+    nonce: int,
+    deadline: int,
+) -> str:
+    """Sign an attestation and encode the attestByDelegation call for it."""
+    encoded_data = encode_attestation_data(
+        agent_address=multisig,
+        space_id=f"test-space-{attestation_num}",
+        proposal_id=f"0xprop{attestation_num:04d}",
+        vote_choice=(attestation_num % 3),
+        snapshot_sig=f"sig-{attestation_num}",
+        run_id=f"run-{attestation_num}",
+        confidence=85,
+    )
+    signature = get_attestation_signer(w3, account, SCHEMA_UID).sign(
+        AttestationRequest(
+            data=encoded_data,
+            nonce=nonce,
+            deadline=deadline,
+            recipient=ZERO_ADDRESS,
+            expiration_time=NO_EXPIRATION,
+        )
+    )
+    r, s, v = signature[:32], signature[32:64], signature[64]
+
+    # attestByDelegation takes the request and the signature as 12 separate parameters
+    return tracker.encodeABI(
+        fn_name="attestByDelegation",
+        args=[
+            bytes.fromhex(SCHEMA_UID[2:]),  # schema (bytes32)
+            ZERO_ADDRESS,  # recipient (address)
+            NO_EXPIRATION,  # expirationTime (uint64)
+            True,  # revocable (bool)
+            bytes(32),  # refUID (bytes32)
+            encoded_data,  # data (bytes)
+            0,  # value (uint256)
+            v,  # v (uint8)
+            r,  # r (bytes32)
+            s,  # s (bytes32)
+            account.address,  # attester (signer's address)
+            deadline,  # deadline (uint64)
+        ],
+    )
+
+
+def create_attestation(w3: Any, account: Any, tracker: Any, attestation_num: int, multisig: str) -> bool:
+    """Create a single attestation, sent from the multisig impersonated by Anvil."""
+    nonce = w3.eth.get_transaction_count(account.address)
+    deadline = int(time.time()) + 3600
+    tx_data = build_attestation_tx_data(w3, account, tracker, attestation_num, multisig, nonce, deadline)
+
+    # Test with eth_call first to get the revert reason
+    try:
+        w3.eth.call({"from": multisig, "to": tracker.address, "data": tx_data})
+    except Exception as e:  # pylint: disable=broad-except
+        print(f"Call would revert: {e}")
+        return False
+
+    tx_hash = w3.provider.make_request(
+        "eth_sendTransaction",
+        [{"from": multisig, "to": tracker.address, "data": tx_data, "gas": hex(1000000)}],
+    )
+    receipt = w3.eth.wait_for_transaction_receipt(tx_hash["result"], timeout=30)
+    return receipt["status"] == 1
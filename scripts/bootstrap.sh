@@ -0,0 +1,78 @@
+#!/bin/bash
+
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+# Shared bootstrap of the quickstart scripts, to be sourced from the repository root.
+#
+# install_dependencies runs `poetry install` with the given arguments, unless
+# nothing changed since the last install. The virtualenv keeps a stamp with a hash
+# of poetry.lock, pyproject.toml, the Python version, the virtualenv path and the
+# install arguments, so deleting the virtualenv also drops the stamp.
+# Set QUICKSTART_FORCE_INSTALL=1 to always install. The start and the end of the
+# install are printed, for tests/benchmark_startup.py to time it.
+
+INSTALL_STAMP_FILE=".quickstart_install_stamp"
+
+_sha256() {
+    if command -v sha256sum >/dev/null 2>&1; then
+        sha256sum | cut -d ' ' -f 1
+    else
+        shasum -a 256 | cut -d ' ' -f 1
+    fi
+}
+
+_install_fingerprint() {
+    local venv_path="$1"
+    shift
+    local python_bin="$venv_path/bin/python"
+    [ -x "$python_bin" ] || python_bin="$venv_path/Scripts/python.exe"
+    {
+        cat poetry.lock pyproject.toml 2>/dev/null
+        "$python_bin" --version 2>&1
+        echo "$venv_path"
+        echo "$@"
+    } | _sha256
+}
+
+_install_dependencies() {
+    local venv_path stamp fingerprint
+    venv_path="$(poetry env info --path 2>/dev/null || true)"
+    if [ -n "$venv_path" ] && [ -z "$QUICKSTART_FORCE_INSTALL" ]; then
+        stamp="$venv_path/$INSTALL_STAMP_FILE"
+        fingerprint="$(_install_fingerprint "$venv_path" "$@")"
+        if [ -f "$stamp" ] && [ "$(cat "$stamp")" = "$fingerprint" ]; then
+            echo "Dependencies are up to date, skipping poetry install"
+            return 0
+        fi
+    fi
+
+    poetry install "$@"
+    poetry run pip install --upgrade packaging  # TODO: update packaging version from open-aea
+
+    venv_path="$(poetry env info --path 2>/dev/null || true)"
+    if [ -n "$venv_path" ]; then
+        _install_fingerprint "$venv_path" "$@" > "$venv_path/$INSTALL_STAMP_FILE"
+    fi
+}
+
+install_dependencies() {
+    echo "Installing dependencies..."
+    _install_dependencies "$@" || return
+    echo "Dependencies installed"
+}
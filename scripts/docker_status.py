@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Status of the service containers, filtered by the Docker daemon."""
+
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import docker
+
+
+# Container state after each lifecycle event. Other events do not change it.
+EVENT_STATES = {
+    "create": "created",
+    "start": "running",
+    "restart": "running",
+    "unpause": "running",
+    "pause": "paused",
+    "die": "exited",
+    "stop": "exited",
+}
+
+# Polling delays used by `ContainerStateCache.wait_for` when the events stream is not available
+POLL_INITIAL_DELAY = 0.5
+POLL_MAX_DELAY = 10.0
+
+
+@dataclass(frozen=True)
+class ContainerStatus:
+    """Status of a container."""
+
+    id: str
+    name: str
+    state: str
+    labels: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the container is running."""
+        return self.state == "running"
+
+
+@lru_cache(maxsize=None)
+def get_docker_client() -> docker.DockerClient:
+    """Docker client shared by all the lookups."""
+    return docker.from_env()
+
+
+def name_filter(prefix: str = "", suffixes: Iterable[str] = ("",)) -> str:
+    """Regex matching the names that start with the prefix and end with any of the suffixes."""
+    suffix_pattern = "|".join(re.escape(suffix) for suffix in suffixes)
+    return f"^/?{re.escape(prefix)}.*({suffix_pattern})$"
+
+
+def find_containers(
+    name: str,
+    all: bool = False,  # pylint: disable=redefined-builtin
+    labels: Optional[Dict[str, str]] = None,
+    client: Optional[docker.DockerClient] = None,
+) -> List[ContainerStatus]:
+    """Find the containers whose name matches the regex `name`.
+
+    Filtering is done by the Docker daemon, so only the matching containers are
+    sent back. Stopped containers are only included if `all` is set.
+    """
+    client = client or get_docker_client()
+    filters: Dict[str, Any] = {"name": name}
+    if labels:
+        filters["label"] = [f"{key}={value}" for key, value in labels.items()]
+
+    return [
+        ContainerStatus(
+            id=container["Id"],
+            name=container["Names"][0].lstrip("/"),
+            state=container["State"],
+            labels=container.get("Labels") or {},
+        )
+        for container in client.api.containers(all=all, filters=filters)
+    ]
+
+
+class ContainerStateCache:
+    """Live state of the containers matching a name, kept up to date with the Docker events.
+
+    Use it as a context manager, or call `start` and `stop`. If the events stream
+    breaks, the lookups fall back to querying the daemon.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        labels: Optional[Dict[str, str]] = None,
+        client: Optional[docker.DockerClient] = None,
+    ) -> None:
+        """Initialize the cache."""
+        self.name = name
+        self.labels = labels or {}
+        self.client = client or get_docker_client()
+        self._pattern = re.compile(name)
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._version = 0
+        self._containers: Dict[str, ContainerStatus] = {}
+        self._events: Any = None
+        self._thread: Optional[threading.Thread] = None
+        self._is_live = False
+
+    def start(self) -> "ContainerStateCache":
+        """Load the current state and start following the events."""
+        # Subscribe before listing, so that no event is missed in between
+        self._events = self.client.events(decode=True, filters={"type": "container"})
+        containers = find_containers(self.name, all=True, labels=self.labels, client=self.client)
+        with self._lock:
+            self._containers = {container.id: container for container in containers}
+            self._is_live = True
+
+        self._thread = threading.Thread(target=self._follow_events, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop following the events."""
+        self._is_live = False
+        if self._events is not None:
+            self._events.close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "ContainerStateCache":
+        """Start the cache."""
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:
+        """Stop the cache."""
+        self.stop()
+
+    def _follow_events(self) -> None:
+        try:
+            for event in self._events:
+                self._handle_event(event)
+        except Exception:  # pylint: disable=broad-except
+            pass
+        finally:
+            with self._lock:
+                self._is_live = False
+                self._changed.notify_all()
+
+    def _handle_event(self, event: Dict[str, Any]) -> None:
+        actor = event.get("Actor", {})
+        attributes = actor.get("Attributes", {})
+        container_name = attributes.get("name", "")
+        if not self._pattern.search(f"/{container_name}"):
+            return
+        if any(attributes.get(key) != value for key, value in self.labels.items()):
+            return
+
+        container_id = actor.get("ID") or event.get("id")
+        action = event.get("Action") or event.get("status")
+        with self._lock:
+            if action == "destroy":
+                self._containers.pop(container_id, None)
+                self._version += 1
+                self._changed.notify_all()
+                return
+            state = EVENT_STATES.get(action)
+            if state is None:
+                return
+            self._containers[container_id] = ContainerStatus(
+                id=container_id,
+                name=container_name,
+                state=state,
+                labels={
+                    key: value
+                    for key, value in attributes.items()
+                    if key not in ("name", "image", "exitCode")
+                },
+            )
+            self._version += 1
+            self._changed.notify_all()
+
+    def containers(self, all: bool = False) -> List[ContainerStatus]:  # pylint: disable=redefined-builtin
+        """Containers matching the name. Stopped containers are only included if `all` is set."""
+        if not self._is_live:
+            return find_containers(self.name, all=all, labels=self.labels, client=self.client)
+
+        with self._lock:
+            containers = list(self._containers.values())
+        return [container for container in containers if all or container.is_running]
+
+    def wait_for(
+        self,
+        predicate: Callable[[List[ContainerStatus]], bool],
+        timeout: float,
+        all: bool = True,  # pylint: disable=redefined-builtin
+    ) -> Optional[List[ContainerStatus]]:
+        """Wait until the matching containers satisfy the predicate.
+
+        Returns the containers, or None if the timeout expired first. The check
+        runs again on every container event, or with exponential backoff if
+        the events stream is not available.
+        """
+        deadline = time.monotonic() + timeout
+        delay = POLL_INITIAL_DELAY
+        while True:
+            with self._lock:
+                version = self._version
+            containers = self.containers(all=all)
+            if predicate(containers):
+                return containers
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+
+            if self._is_live:
+                with self._changed:
+                    if self._version == version and self._is_live:
+                        self._changed.wait(remaining)
+            else:
+                time.sleep(min(delay, remaining))
+                delay = min(delay * 2, POLL_MAX_DELAY)
@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Fast copy of directory trees, used by the legacy migrations.
+
+Every file is cloned with a reflink when the filesystem supports it (Btrfs, XFS,
+APFS...), which takes no time and no space. Otherwise it is hardlinked, if allowed,
+or copied, large files in parallel chunks. Copied files are verified with a checksum.
+
+Usage:
+  python -m scripts.fast_copy SOURCE TARGET [--hardlink] [--no-verify]
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import errno
+import hashlib
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore
+
+
+# ioctl cloning a file on Linux (Btrfs, XFS, bcachefs...)
+FICLONE = 0x40049409
+# Files larger than this are copied in parallel chunks
+CHUNK_SIZE = 64 * 1024 * 1024
+BLOCK_SIZE = 1024 * 1024
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Errors meaning that the filesystem cannot reflink or hardlink the file
+UNSUPPORTED_ERRNOS = {
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.ENOTTY,
+    errno.EPERM,
+    errno.EMLINK,
+    getattr(errno, "EOPNOTSUPP", errno.EINVAL),
+    getattr(errno, "ENOTSUP", errno.EINVAL),
+    getattr(errno, "ENOSYS", errno.EINVAL),
+}
+
+
+@dataclass
+class CopyStats:
+    """Statistics of a tree copy."""
+
+    files: int = 0
+    bytes: int = 0
+    reflinked: int = 0
+    hardlinked: int = 0
+    copied: int = 0
+    verified: int = 0
+    seconds: float = 0.0
+    _lock: Lock = field(default_factory=Lock, repr=False)
+
+    def add(self, method: str, size: int) -> None:
+        """Count a file."""
+        with self._lock:
+            self.files += 1
+            self.bytes += size
+            setattr(self, method, getattr(self, method) + 1)
+
+    @property
+    def bytes_per_second(self) -> float:
+        """Throughput of the copy."""
+        return self.bytes / self.seconds if self.seconds > 0 else 0.0
+
+    def __str__(self) -> str:
+        """Summary of the copy."""
+        return (
+            f"{self.files} files, {self.bytes / 1024**2:,.1f} MiB in {self.seconds:.2f}s "
+            f"({self.bytes_per_second / 1024**2:,.1f} MiB/s): {self.reflinked} reflinked, "
+            f"{self.hardlinked} hardlinked, {self.copied} copied ({self.verified} verified)"
+        )
+
+
+def _clonefile_function() -> Optional[Callable]:
+    if sys.platform != "darwin":
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        return libc.clonefile
+    except (OSError, AttributeError):
+        return None
+
+
+_clonefile = _clonefile_function()
+
+
+def reflink(source: Path, target: Path) -> bool:
+    """Clone a file sharing its blocks, if the filesystem supports it."""
+    # A symlink would be followed, and a hardlink shares the file being truncated
+    if target.exists() or target.is_symlink():
+        target.unlink()
+    if _clonefile is not None:
+        if _clonefile(os.fsencode(source), os.fsencode(target), 0) == 0:
+            return True
+        if ctypes.get_errno() not in UNSUPPORTED_ERRNOS:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()), str(source))
+        return False
+
+    if fcntl is None:
+        return False
+    with open(source, "rb") as fsrc, open(target, "wb") as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            return True
+        except OSError as e:
+            if e.errno not in UNSUPPORTED_ERRNOS:
+                raise
+            return False
+
+
+def hardlink(source: Path, target: Path) -> bool:
+    """Hardlink a file, if both paths are on the same filesystem."""
+    if target.exists() or target.is_symlink():
+        target.unlink()
+    try:
+        os.link(source, target)
+        return True
+    except OSError as e:
+        if e.errno not in UNSUPPORTED_ERRNOS:
+            raise
+        return False
+
+
+def _copy_range(source: Path, target: Path, offset: int, length: int) -> None:
+    """Copy a byte range of a file into a target already sized to the source."""
+    with open(source, "rb") as fsrc, open(target, "r+b") as fdst:
+        copy_file_range = getattr(os, "copy_file_range", None)
+        if copy_file_range is not None:
+            try:
+                copied = 0
+                while copied < length:
+                    written = copy_file_range(
+                        fsrc.fileno(), fdst.fileno(), length - copied, offset + copied, offset + copied
+                    )
+                    if written == 0:
+                        break
+                    copied += written
+                return
+            except OSError as e:
+                if e.errno not in UNSUPPORTED_ERRNOS:
+                    raise
+
+        fsrc.seek(offset)
+        fdst.seek(offset)
+        remaining = length
+        while remaining > 0:
+            block = fsrc.read(min(BLOCK_SIZE, remaining))
+            if not block:
+                break
+            fdst.write(block)
+            remaining -= len(block)
+
+
+def file_checksum(path: Path) -> str:
+    """BLAKE2 checksum of a file."""
+    digest = hashlib.blake2b()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _list_tree(
+    source: Path, target: Path, exclude: Iterable[str]
+) -> Tuple[List[Tuple[Path, Path]], List[Tuple[Path, Path]]]:
+    """Pairs of source and target directories and files, creating the target directories.
+
+    Symlinks are followed, but a directory reached again through a symlink is skipped,
+    so that a symlink to a parent directory does not loop.
+    """
+    excluded = set(exclude)
+    target.mkdir(parents=True, exist_ok=True)
+    source_stat = source.stat()
+    visited = {(source_stat.st_dev, source_stat.st_ino)}
+    directories = [(source, target)]
+    files: List[Tuple[Path, Path]] = []
+    for root, dir_names, file_names in os.walk(source, followlinks=True):
+        root_path = Path(root)
+        if root_path == source:
+            dir_names[:] = [name for name in dir_names if name not in excluded]
+            file_names = [name for name in file_names if name not in excluded]
+        target_root = target / root_path.relative_to(source)
+        walked = []
+        for name in dir_names:
+            dir_stat = (root_path / name).stat()
+            if (dir_stat.st_dev, dir_stat.st_ino) not in visited:
+                visited.add((dir_stat.st_dev, dir_stat.st_ino))
+                walked.append(name)
+        dir_names[:] = walked
+        for name in dir_names:
+            (target_root / name).mkdir(exist_ok=True)
+            directories.append((root_path / name, target_root / name))
+        files.extend((root_path / name, target_root / name) for name in file_names)
+    return directories, files
+
+
+def copy_tree(
+    source: Path,
+    target: Path,
+    exclude: Iterable[str] = (),
+    allow_hardlinks: bool = False,
+    verify: bool = True,
+    workers: int = DEFAULT_WORKERS,
+) -> CopyStats:
+    """Copy a directory tree into a target directory, overwriting existing files.
+
+    Hardlinks are only used if `allow_hardlinks` is set, as the source and the
+    target then share their contents: it is only safe if the source is not used
+    any more. `exclude` lists names of the top-level entries that are not copied.
+    The directories get the permissions and times of the source ones.
+    """
+    stats = CopyStats()
+    start = time.perf_counter()
+    copied: List[Tuple[Path, Path]] = []
+    chunked: List[Tuple[Path, Path]] = []
+
+    def copy_file(source_file: Path, target_file: Path) -> None:
+        size = source_file.stat().st_size
+        if target_file.exists() and os.path.samefile(source_file, target_file):
+            # Hardlinked by a previous run: opening the target would truncate the source
+            stats.add("hardlinked", size)
+        elif reflink(source_file, target_file):
+            shutil.copystat(source_file, target_file)
+            stats.add("reflinked", size)
+        elif allow_hardlinks and hardlink(source_file, target_file):
+            stats.add("hardlinked", size)
+        elif size > CHUNK_SIZE:
+            # Sized now, filled by the chunk tasks
+            with open(target_file, "wb") as f:
+                f.truncate(size)
+            chunked.append((source_file, target_file))
+        else:
+            shutil.copyfile(source_file, target_file)
+            shutil.copystat(source_file, target_file)
+            stats.add("copied", size)
+            copied.append((source_file, target_file))
+
+    directories, files = _list_tree(Path(source), Path(target), exclude)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda pair: copy_file(*pair), files))
+
+        chunks = [
+            (source_file, target_file, offset, min(CHUNK_SIZE, size - offset))
+            for source_file, target_file in chunked
+            for size in (source_file.stat().st_size,)
+            for offset in range(0, size, CHUNK_SIZE)
+        ]
+        list(executor.map(lambda chunk: _copy_range(*chunk), chunks))
+        for source_file, target_file in chunked:
+            shutil.copystat(source_file, target_file)
+            stats.add("copied", source_file.stat().st_size)
+            copied.append((source_file, target_file))
+
+        if verify:
+            for source_file, source_sum, target_sum in executor.map(
+                lambda pair: (pair[0], file_checksum(pair[0]), file_checksum(pair[1])), copied
+            ):
+                if source_sum != target_sum:
+                    raise OSError(f"Checksum mismatch after copying {source_file}")
+                stats.verified += 1
+
+    # Last, as creating the files updates the times of their directory
+    for source_dir, target_dir in directories:
+        shutil.copystat(source_dir, target_dir)
+
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fast copy of a directory tree")
+    parser.add_argument("source", type=Path)
+    parser.add_argument("target", type=Path)
+    parser.add_argument("--hardlink", action="store_true", help="Hardlink files that cannot be reflinked")
+    parser.add_argument("--no-verify", action="store_true", help="Skip the checksums of the copied files")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Parallel copies")
+    args = parser.parse_args()
+
+    stats = copy_tree(
+        args.source, args.target, allow_hardlinks=args.hardlink, verify=not args.no_verify, workers=args.workers
+    )
+    print(f"Copied {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Utilities to batch contract reads with Multicall3.
+
+This module only depends on web3, so that it can be used by the standalone scripts.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from eth_utils.abi import collapse_if_tuple
+from web3 import Web3
+from web3.contract import Contract
+from web3.exceptions import Web3ValidationError
+from web3.types import BlockIdentifier
+
+
+# Multicall3 is deployed at the same address on every supported chain
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"internalType": "address", "name": "target", "type": "address"},
+                    {"internalType": "bool", "name": "allowFailure", "type": "bool"},
+                    {"internalType": "bytes", "name": "callData", "type": "bytes"},
+                ],
+                "internalType": "struct Multicall3.Call3[]",
+                "name": "calls",
+                "type": "tuple[]",
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"internalType": "bool", "name": "success", "type": "bool"},
+                    {"internalType": "bytes", "name": "returnData", "type": "bytes"},
+                ],
+                "internalType": "struct Multicall3.Result[]",
+                "name": "returnData",
+                "type": "tuple[]",
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function",
+    },
+    {
+        "inputs": [{"internalType": "address", "name": "addr", "type": "address"}],
+        "name": "getEthBalance",
+        "outputs": [{"internalType": "uint256", "name": "balance", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function",
+    },
+    {
+        "inputs": [],
+        "name": "getCurrentBlockTimestamp",
+        "outputs": [{"internalType": "uint256", "name": "timestamp", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function",
+    },
+]
+
+
+@dataclass(frozen=True)
+class Call:
+    """A contract read to be batched with Multicall3."""
+
+    contract: Contract
+    fn_name: str
+    args: Tuple[Any, ...] = ()
+    allow_failure: bool = False
+
+
+def get_multicall(w3: Web3) -> Contract:
+    """Get the Multicall3 contract instance."""
+    return w3.eth.contract(address=MULTICALL3_ADDRESS, abi=MULTICALL3_ABI)  # type: ignore
+
+
+def eth_balance_call(w3: Web3, address: str) -> Call:
+    """Read the native balance of an address."""
+    return Call(get_multicall(w3), "getEthBalance", (address,))
+
+
+def block_timestamp_call(w3: Web3) -> Call:
+    """Read the timestamp of the block the batch is executed on."""
+    return Call(get_multicall(w3), "getCurrentBlockTimestamp")
+
+
+def _get_function_abi(contract: Contract, fn_name: str) -> Dict[str, Any]:
+    for item in contract.abi:
+        if item.get("type") == "function" and item.get("name") == fn_name:
+            return item
+    raise ValueError(f"Function {fn_name} not found in the contract ABI.")
+
+
+def _normalize(output: Dict[str, Any], value: Any) -> Any:
+    """Normalize a decoded value the same way web3 does for contract calls."""
+    abi_type = output["type"]
+    if abi_type.endswith("]"):
+        item_output = dict(output, type=abi_type[: abi_type.rindex("[")])
+        return [_normalize(item_output, item) for item in value]
+    if abi_type == "tuple":
+        return tuple(
+            _normalize(component, item)
+            for component, item in zip(output["components"], value)
+        )
+    if abi_type == "address":
+        return Web3.to_checksum_address(value)
+    return value
+
+
+def _decode(w3: Web3, call: Call, success: bool, return_data: bytes) -> Any:
+    outputs = _get_function_abi(call.contract, call.fn_name)["outputs"]
+    if not success or (outputs and not return_data):
+        if call.allow_failure:
+            return None
+        raise ValueError(
+            f"Call to {call.fn_name} on {call.contract.address} returned no data."
+        )
+
+    decoded = w3.codec.decode([collapse_if_tuple(o) for o in outputs], return_data)
+    normalized = [_normalize(o, value) for o, value in zip(outputs, decoded)]
+    return normalized[0] if len(normalized) == 1 else tuple(normalized)
+
+
+def aggregate(
+    w3: Web3,
+    calls: Sequence[Call],
+    block_identifier: BlockIdentifier = "latest",
+) -> List[Any]:
+    """Perform the calls in a single `aggregate3` eth_call and return the decoded results.
+
+    Results are returned in the same order as the calls. Calls that allow failure
+    return None if they revert, or if they cannot be encoded with the contract ABI.
+    """
+    encoded_calls: List[Optional[str]] = []
+    for call in calls:
+        try:
+            encoded_calls.append(
+                call.contract.encodeABI(fn_name=call.fn_name, args=list(call.args))
+            )
+        except (ValueError, Web3ValidationError):
+            if not call.allow_failure:
+                raise
+            encoded_calls.append(None)
+
+    batch = [
+        (call.contract.address, call.allow_failure, call_data)
+        for call, call_data in zip(calls, encoded_calls)
+        if call_data is not None
+    ]
+    if not batch:
+        return [None] * len(calls)
+
+    results = iter(
+        get_multicall(w3)
+        .functions.aggregate3(batch)
+        .call(block_identifier=block_identifier)
+    )
+
+    decoded = []
+    for call, call_data in zip(calls, encoded_calls):
+        if call_data is None:
+            decoded.append(None)
+            continue
+        success, return_data = next(results)
+        decoded.append(_decode(w3, call, success, return_data))
+
+    return decoded
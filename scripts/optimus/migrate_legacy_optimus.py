@@ -1,11 +1,11 @@
 from argparse import ArgumentParser
 from pathlib import Path
 import json
-import shutil
 from dataclasses import dataclass
 from operate.quickstart.run_service import QuickstartConfig
 from operate.operate_types import Chain
 from operate.quickstart.utils import print_section, print_title
+from scripts.fast_copy import copy_tree
 from scripts.utils import validate_config_params, handle_missing_rpcs
 
 OPTIMUS_PATH = Path(__file__).parent.parent.parent / ".optimus"
@@ -62,17 +62,9 @@ def copy_optimus_to_operate():
     """Copy all files from .optimus to .operate."""
     print_section("Copying files from .optimus to .operate...")
     
-    # Create .operate directory if it doesn't exist
-    OPERATE_HOME.mkdir(parents=True, exist_ok=True)
-    
     # Copy all contents except local_config.json
-    for item in OPTIMUS_PATH.iterdir():
-        if item.name != "local_config.json":
-            target = OPERATE_HOME / item.name
-            if item.is_dir():
-                shutil.copytree(item, target, dirs_exist_ok=True)
-            else:
-                shutil.copy2(item, target)
+    stats = copy_tree(OPTIMUS_PATH, OPERATE_HOME, exclude=["local_config.json"])
+    print(f"Copied {stats}")
 
 def create_operate_config(optimus_config: OptimusConfig, service_name: str):
     """Create new local_config.json for operate using QuickstartConfig."""
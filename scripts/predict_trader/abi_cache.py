@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Local on-disk cache of the contract ABIs used by the scripts."""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+import requests
+
+
+SCRIPT_PATH = Path(__file__).resolve().parent
+ABI_CACHE_PATH = Path(SCRIPT_PATH.parents[1], "data", "abi_cache")
+ABI_CACHE_VERSION = 1
+ABI_REQUEST_TIMEOUT = 30
+
+
+def _cache_file(url: str) -> Path:
+    """Path of the cache entry for the given URL."""
+    return ABI_CACHE_PATH / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+
+
+def _content_hash(data: Any) -> str:
+    """Hash of the contents of a contract JSON artifact."""
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+def _read_cache_entry(url: str) -> Optional[Dict[str, Any]]:
+    """Read the cache entry for the given URL, if it exists and is valid."""
+    try:
+        with open(_cache_file(url), "r", encoding="utf-8") as file:
+            entry = json.load(file)
+    except (FileNotFoundError, json.decoder.JSONDecodeError):
+        return None
+
+    if (
+        entry.get("cache_version") != ABI_CACHE_VERSION
+        or entry.get("url") != url
+        or entry.get("sha256") != _content_hash(entry.get("data"))
+    ):
+        return None
+
+    return entry
+
+
+def _write_cache_entry(url: str, data: Any, etag: Optional[str]) -> None:
+    """Atomically write the cache entry for the given URL."""
+    ABI_CACHE_PATH.mkdir(parents=True, exist_ok=True)
+    entry = {
+        "cache_version": ABI_CACHE_VERSION,
+        "url": url,
+        "etag": etag,
+        "sha256": _content_hash(data),
+        "fetched_at": int(time.time()),
+        "data": data,
+    }
+    cache_file = _cache_file(url)
+    tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_file, "w", encoding="utf-8") as file:
+        json.dump(entry, file)
+    os.replace(tmp_file, cache_file)
+
+
+def get_contract_data(url: str, revalidate: bool = False) -> Dict[str, Any]:
+    """Returns the contract JSON artifact at the given URL.
+
+    Cached artifacts are returned without any network access, unless `revalidate`
+    is set. In that case, the artifact is revalidated with its ETag (or by comparing
+    its hash if the server does not provide one), and the cached copy is used as a
+    fallback if the server cannot be reached.
+    """
+    entry = _read_cache_entry(url)
+    if entry is not None and not revalidate:
+        return entry["data"]
+
+    headers = {}
+    if entry is not None and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+
+    try:
+        response = requests.get(url, headers=headers, timeout=ABI_REQUEST_TIMEOUT)
+        if response.status_code == 304 and entry is not None:
+            return entry["data"]
+        response.raise_for_status()
+        data = response.json()
+    except (requests.RequestException, ValueError) as e:
+        if entry is None:
+            raise
+        print(f"WARNING: Could not revalidate {url} ({e}). Using the cached ABI.")
+        return entry["data"]
+
+    etag = response.headers.get("ETag")
+    if entry is None or entry["sha256"] != _content_hash(data) or entry["etag"] != etag:
+        _write_cache_entry(url, data, etag)
+
+    return data
+
+
+def _get_optional_contract_data(url: str, revalidate: bool) -> Dict[str, Any]:
+    """Returns the contract JSON artifact at the given URL, or an empty one if it cannot be fetched."""
+    try:
+        return get_contract_data(url, revalidate)
+    except (requests.RequestException, ValueError) as e:
+        print(f"WARNING: Could not fetch {url} ({e}).")
+        return {}
+
+
+def prefetch_contract_data(
+    urls: Iterable[str], revalidate: bool = False, optional_urls: Iterable[str] = ()
+) -> Dict[str, Dict[str, Any]]:
+    """Returns the contract JSON artifacts at the given URLs, fetching the missing ones in parallel.
+
+    The artifacts at `optional_urls` are empty if they cannot be fetched, instead of
+    raising the error.
+    """
+    optional = set(optional_urls)
+    unique_urls = list(dict.fromkeys([*urls, *optional_urls]))
+    if not unique_urls:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=len(unique_urls)) as executor:
+        contract_data = executor.map(
+            lambda url: (
+                _get_optional_contract_data(url, revalidate)
+                if url in optional
+                else get_contract_data(url, revalidate)
+            ),
+            unique_urls,
+        )
+        return dict(zip(unique_urls, contract_data))
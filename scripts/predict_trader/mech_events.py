@@ -29,7 +29,7 @@ from dataclasses import dataclass
 from pathlib import Path
 from string import Template
 from tqdm import tqdm
-from typing import Any, ClassVar, Dict
+from typing import Any, ClassVar, Dict, Iterator, List, Optional, TextIO, Tuple
 
 from gql import Client, gql
 from gql.transport.requests import RequestsHTTPTransport
@@ -45,6 +45,7 @@ HTTPS = HTTP[:4] + "s" + HTTP[4:]
 CID_PREFIX = "f01701220"
 IPFS_ADDRESS = f"{HTTPS}gateway.autonolas.tech/ipfs/"
 MECH_EVENTS_DB_VERSION = 3
+STREAM_CHUNK_SIZE = 1024 * 1024
 DEFAULT_MECH_FEE = 10000000000000000
 DEFAULT_FROM_TIMESTAMP = 0
 DEFAULT_TO_TIMESTAMP = 2147483647
@@ -194,6 +195,182 @@ def _write_mech_events_data_to_file(
         last_write_time = now
 
 
+class _JsonStreamReader:
+    """Incremental reader of a JSON document, decoding one value at a time with raw_decode."""
+
+    def __init__(self, file: TextIO, chunk_size: int = STREAM_CHUNK_SIZE) -> None:
+        """Initializes the reader"""
+        self._file = file
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+
+    def _fill(self) -> bool:
+        """Drop the consumed input and read the next chunk. Returns False at the end of the file."""
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            return False
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, or an empty string at the end of the file."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        """Consume the next non-whitespace character, which must be `char`."""
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting {char!r}", self._buffer, self._pos)
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Decode the next value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number at the end of the buffer may go on in the next chunk
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def keys(self) -> Iterator[str]:
+        """Keys of the next object. The value of each key must be consumed before the next one."""
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self._pos += 1
+                continue
+            self.expect("}")
+            return
+
+
+def _iter_mech_events_db(
+    path: Path, chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[Tuple[str, Optional[str], Optional[str], Any]]:
+    """Stream a Mech events database file, without loading it.
+
+    Yields (sender, event_name, event_id, event) for every event, and
+    (key, None, None, value) for the top-level values other than senders, e.g. the DB version.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        reader = _JsonStreamReader(file, chunk_size)
+        for sender in reader.keys():
+            if reader.peek() != "{":
+                yield sender, None, None, reader.value()
+                continue
+            for event_name in reader.keys():
+                for event_id in reader.keys():
+                    yield sender, event_name, event_id, reader.value()
+
+
+def _scan_mech_events_db(
+    path: Path, chunk_size: int = STREAM_CHUNK_SIZE
+) -> Tuple[Dict[str, Any], Dict[Tuple[str, str, str], bool], List[Tuple[str, str]]]:
+    """Top-level values, whether each event has IPFS contents, and the (sender, event_name) groups, in file order."""
+    top_level: Dict[str, Any] = {}
+    has_contents: Dict[Tuple[str, str, str], bool] = {}
+    groups: Dict[Tuple[str, str], None] = {}
+    for sender, event_name, event_id, event in _iter_mech_events_db(path, chunk_size):
+        if event_name is None or event_id is None:
+            top_level[sender] = event
+            continue
+        has_contents[(sender, event_name, event_id)] = bool(event.get("ipfs_contents"))
+        groups[(sender, event_name)] = None
+    return top_level, has_contents, list(groups)
+
+
+def merge_mech_events_files(
+    source: Path, target: Path = MECH_EVENTS_JSON_PATH, chunk_size: int = STREAM_CHUNK_SIZE
+) -> int:
+    """Merge a Mech events database file into another one, by event id.
+
+    Of the events found in both files, the one with IPFS contents is kept (the target's
+    one if both have them). The files are streamed, so memory use only grows with the
+    number of events, not with their contents. The target is replaced atomically.
+
+    To keep the events of a (sender, event_name) group together, each file is read
+    again for every group, so the merge takes O(groups x file size) time. There are
+    only a few groups per database (the Request and Deliver events of the trader).
+    Returns the number of events taken from the source.
+    """
+    source_top_level, source_contents, source_groups = _scan_mech_events_db(source, chunk_size)
+    if target.exists():
+        target_top_level, target_contents, target_groups = _scan_mech_events_db(target, chunk_size)
+    else:
+        target_top_level, target_contents, target_groups = {}, {}, []
+
+    source_version = source_top_level.get("db_version", 0)
+    target_version = target_top_level.get("db_version", source_version)
+    if source_version < target_version:
+        # The events of an older DB version would be discarded when the target is read
+        return 0
+    if source_version > target_version:
+        target_contents, target_groups = {}, []
+
+    taken = {
+        key
+        for key, has_contents in source_contents.items()
+        if key not in target_contents or (has_contents and not target_contents[key])
+    }
+    if not taken and target.exists() and source_version == target_version:
+        return 0
+
+    senders: Dict[str, List[str]] = {}
+    for sender, event_name in target_groups + source_groups:
+        if event_name not in senders.setdefault(sender, []):
+            senders[sender].append(event_name)
+
+    passes = [(source, lambda key: key in taken)]
+    if target_contents:
+        passes.insert(0, (target, lambda key: key in target_contents and key not in taken))
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(target.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        file.write("{")
+        separator = ""
+        for key, value in {**source_top_level, **target_top_level, "db_version": source_version}.items():
+            file.write(f"{separator}{json.dumps(key)}: {json.dumps(value)}")
+            separator = ", "
+        for sender, event_names in senders.items():
+            file.write(f"{separator}{json.dumps(sender)}: {{")
+            separator = ", "
+            for i, event_name in enumerate(event_names):
+                file.write(f"{', ' if i else ''}{json.dumps(event_name)}: {{")
+                event_separator = ""
+                for path, keep in passes:
+                    for event_sender, event_group, event_id, event in _iter_mech_events_db(path, chunk_size):
+                        if (event_sender, event_group) == (sender, event_name) and keep((sender, event_name, event_id)):
+                            file.write(f"{event_separator}{json.dumps(event_id)}: {json.dumps(event)}")
+                            event_separator = ", "
+                file.write("}")
+            file.write("}")
+        file.write("}\n")
+    os.replace(tmp_path, target)
+
+    return len(taken)
+
+
 def get_mech_subgraph_url() -> str:
     """Get the mech subgraph's URL."""
     subgraph_api_key = get_subgraph_api_key()
@@ -27,6 +27,7 @@ from operate.services.service import Service
 from operate.quickstart.utils  import ask_yes_or_no, CHAIN_TO_METADATA, print_section, print_title
 from operate.quickstart.run_service import NO_STAKING_PROGRAM_ID
 from operate.utils.gnosis import get_asset_balance, get_assets_balances
+from scripts.predict_trader.mech_events import merge_mech_events_files
 
 ROOT_PATH = Path(__file__).parent.parent.parent
 TRADER_RUNNER_PATH = ROOT_PATH / ".trader_runner"
@@ -239,20 +240,13 @@ def populate_operate(operate: OperateApp, trader_data: TraderData, service_templ
 
     old_mech_events_file = TRADER_RUNNER_PATH / "mech_events.json"
     new_mech_events_file = ROOT_PATH / "data" / "mech_events.json"
-    if old_mech_events_file.exists() and (
-        not new_mech_events_file.exists() or
-        old_mech_events_file.stat().st_size > new_mech_events_file.stat().st_size
-    ):
-        spinner = Halo(text="Copying existing mech events...", spinner="dots").start()
+    if old_mech_events_file.exists():
+        spinner = Halo(text="Merging existing mech events...", spinner="dots").start()
         try:
-            new_mech_events_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(old_mech_events_file, "r") as f:
-                mech_events = json.load(f)
-            with open(new_mech_events_file, "w") as f:
-                json.dump(obj=mech_events, fp=f, indent=2)
-            spinner.succeed("Mech events copied")
+            merged_events = merge_mech_events_files(old_mech_events_file, new_mech_events_file)
+            spinner.succeed(f"Mech events merged ({merged_events} events copied)")
         except Exception as e:
-            spinner.fail(f"Failed to copy mech events: {e}.")
+            spinner.fail(f"Failed to merge mech events: {e}.")
             print(
                 f"Please copy the file {old_mech_events_file} to {new_mech_events_file} manually."
             )
@@ -21,12 +21,13 @@
 
 
 import datetime
+import heapq
 import requests
 import sys
 from argparse import ArgumentParser
 from collections import defaultdict
 from string import Template
-from typing import Any
+from typing import Any, NamedTuple, Optional, Sequence, Union
 
 from operate.operate_types import Chain
 from operate.quickstart.run_service import load_local_config
@@ -102,6 +103,38 @@ omen_xdai_trades_query = Template(
 )
 
 ATTRIBUTE_CHOICES = {i.name: i for i in MarketAttribute}
+TOTAL_STATE = "TOTAL"
+
+
+def _parse_state(s: str) -> Union[MarketState, str]:
+    """Performs string conversion to a statistics table column."""
+    if s.upper() == TOTAL_STATE:
+        return TOTAL_STATE
+    return MarketState.argparse(s)
+
+
+class SortKey(NamedTuple):
+    """A market attribute to sort by, evaluated on a statistics table column."""
+
+    attribute: MarketAttribute
+    state: Optional[Union[MarketState, str]] = None
+    descending: bool = True
+
+    def __str__(self) -> str:
+        """Prints the sort key."""
+        direction = "" if self.descending else ", ascending"
+        return f"{self.attribute} ({self.state or 'default'}{direction})"
+
+    @staticmethod
+    def argparse(s: str) -> "SortKey":
+        """Performs string conversion to SortKey, e.g., `roi`, `-fees` or `investment:total`."""
+        descending = not s.startswith("-")
+        attribute, _, state = s.lstrip("-").partition(":")
+        return SortKey(
+            attribute=MarketAttribute.argparse(attribute),
+            state=_parse_state(state) if state else None,
+            descending=descending,
+        )
 
 
 def _parse_args() -> Any:
@@ -133,10 +166,34 @@ def _parse_args() -> Any:
     )
     parser.add_argument(
         "--sort-by",
-        choices=list(MarketAttribute),
-        default=MarketAttribute.ROI,
-        type=MarketAttribute.argparse,
-        help="Specify the market attribute for sorting.",
+        nargs="+",
+        default=[SortKey(MarketAttribute.ROI)],
+        type=SortKey.argparse,
+        metavar="[-]ATTRIBUTE[:STATE]",
+        help=(
+            "Specify the market attributes for sorting, in order of priority. "
+            f"Attributes: {', '.join(ATTRIBUTE_CHOICES)}. "
+            f"States: {', '.join(i.name for i in MarketState)}, {TOTAL_STATE} (defaults to --state). "
+            "Prefix an attribute with '-' to sort it in ascending order."
+        ),
+    )
+    parser.add_argument(
+        "--state",
+        default=MarketState.CLOSED,
+        type=MarketState.argparse,
+        help="Specify the market state of the summary (default: CLOSED).",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=None,
+        help="Only print the top K users.",
+    )
+    parser.add_argument(
+        "--min-trades",
+        type=int,
+        default=0,
+        help="Only rank users with at least this number of trades on the summary market state.",
     )
     args = parser.parse_args()
 
@@ -231,26 +288,62 @@ def _group_trades_by_creator(trades_json: dict[str, Any]) -> dict[str, Any]:
     return _creator_to_trades
 
 
+def _select_users(
+    creator_to_statistics: dict[str, Any],
+    sort_by: Sequence[SortKey],
+    state: MarketState = MarketState.CLOSED,
+    top: Optional[int] = None,
+    min_trades: int = 0,
+) -> list[tuple[str, Any]]:
+    """Selects the users to rank, ordered by the sort keys."""
+
+    user_ids = list(creator_to_statistics)
+    statistics = [creator_to_statistics[user_id] for user_id in user_ids]
+
+    # Precompute one column per sort key, so that the selection only compares tuples.
+    columns = [
+        [
+            table[key.attribute][key.state or state] * (1 if key.descending else -1)
+            for table in statistics
+        ]
+        for key in sort_by
+    ]
+    keys = list(zip(*columns))
+    num_trades = [table[MarketAttribute.NUM_TRADES][state] for table in statistics]
+    candidates = [i for i, n in enumerate(num_trades) if n >= min_trades]
+
+    if top is None:
+        ranked = sorted(candidates, key=keys.__getitem__, reverse=True)
+    else:
+        ranked = heapq.nlargest(top, candidates, key=keys.__getitem__)
+
+    return [(user_ids[i], statistics[i]) for i in ranked]
+
+
 def _print_user_summary(
     creator_to_statistics: dict[str, Any],
-    sort_by_attribute: MarketAttribute = MarketAttribute.ROI,
+    sort_by: Sequence[SortKey] = (SortKey(MarketAttribute.ROI),),
     state: MarketState = MarketState.CLOSED,
+    top: Optional[int] = None,
+    min_trades: int = 0,
 ) -> None:
     """Prints user ranking."""
 
-    sorted_users = sorted(
-        creator_to_statistics.items(),
-        key=lambda item: item[1][sort_by_attribute][state],
-        reverse=True,
+    sort_by = [key._replace(state=key.state or state) for key in sort_by]
+    selected_users = _select_users(
+        creator_to_statistics, sort_by, state, top, min_trades
     )
 
     print("")
-    title = f"User summary for {state} markets sorted by {sort_by_attribute}:"
+    title = f"User summary for {state} markets sorted by {', '.join(map(str, sort_by))}:"
     print()
     print("-" * len(title))
     print(title)
     print("-" * len(title))
     print("")
+    if top is not None or min_trades:
+        print(f"Showing {len(selected_users)} of {len(creator_to_statistics)} users")
+        print("")
 
     titles = [
         "User ID".ljust(42),
@@ -266,8 +359,8 @@ def _print_user_summary(
         "\n",
     ]
 
-    output = "".join(titles)
-    for user_id, statistics_table in sorted_users:
+    rows = ["".join(titles)]
+    for user_id, statistics_table in selected_users:
         values = [
             user_id,
             str(statistics_table[MarketAttribute.NUM_TRADES][state]).rjust(8),
@@ -281,9 +374,9 @@ def _print_user_summary(
             f"{statistics_table[MarketAttribute.ROI][state] * 100.0:7.2f}%".rjust(9),
             "\n",
         ]
-        output += "".join(values)
+        rows.append("".join(values))
 
-    print(output)
+    print("".join(rows))
 
 
 def _print_progress_bar(  # pylint: disable=too-many-arguments
@@ -335,4 +428,10 @@ if __name__ == "__main__":
         creator_to_statistics[creator_id] = statistics_table_id
         _print_progress_bar(i, total_traders)
 
-    _print_user_summary(creator_to_statistics, user_args.sort_by)
+    _print_user_summary(
+        creator_to_statistics,
+        user_args.sort_by,
+        user_args.state,
+        user_args.top,
+        user_args.min_trades,
+    )
@@ -20,46 +20,48 @@
 
 """Obtains a report of the current service."""
 
+import io
 import json
-import math
 import sys
 import time
 import traceback
 from argparse import ArgumentParser
 from collections import Counter
+from contextlib import redirect_stderr, redirect_stdout
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
 
-from enum import Enum
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Optional, Sequence
 
-import docker
-import requests
 import scripts.predict_trader.trades as trades
 from scripts.predict_trader.trades import (
     MarketAttribute,
     MarketState,
-    get_balance,
-    get_token_balance,
     wei_to_olas,
     wei_to_unit,
     wei_to_wxdai,
     wei_to_xdai,
 )
-from web3 import HTTPProvider, Web3
-from web3.exceptions import ABIFunctionNotFound, ContractLogicError
-
-from operate.constants import (
-    OPERATE_HOME,
-    STAKING_TOKEN_INSTANCE_ABI_PATH,
-    SERVICE_REGISTRY_TOKEN_UTILITY_JSON_URL,
-    MECH_ACTIVITY_CHECKER_JSON_URL,
-    MECH_CONTRACT_JSON_URL,
+from scripts.predict_trader.staking_snapshot import (
+    StakingSnapshot,
+    StakingSnapshotReader,
+    StakingState,
 )
+from web3 import HTTPProvider, Web3
+
+from operate.constants import OPERATE_HOME
 from operate.cli import OperateApp
 from operate.ledger.profiles import get_staking_contract
 from operate.operate_types import Chain
 from operate.quickstart.run_service import ask_password_if_needed, load_local_config
 from operate.quickstart.utils import print_title
+from scripts.docker_status import (
+    ContainerStateCache,
+    find_containers,
+    name_filter,
+)
+from scripts.multicall import Call, aggregate, eth_balance_call
 from scripts.utils import get_service_from_config
 
 SCRIPT_PATH = Path(__file__).resolve().parent
@@ -71,6 +73,9 @@ TRADES_LOOKBACK_DAYS = 3
 MULTI_TRADE_LOOKBACK_DAYS = TRADES_LOOKBACK_DAYS
 SECONDS_PER_DAY = 60 * 60 * 24
 OUTPUT_WIDTH = 80
+WATCH_INTERVAL = 5
+CLEAR_SCREEN = "\033[H\033[2J"
+AGENT_CONTAINERS_FILTER = name_filter("traderpearl", ("abci_0", "tm_0"))
 
 
 class ColorCode:
@@ -82,12 +87,59 @@ class ColorCode:
     RESET = "\033[0m"
 
 
-class StakingState(Enum):
-    """Staking state enumeration for the staking."""
+ERC20_BALANCE_OF_ABI = [
+    {
+        "inputs": [{"internalType": "address", "name": "account", "type": "address"}],
+        "name": "balanceOf",
+        "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function",
+    }
+]
+
+
+SAFE_NONCE_ABI = [
+    {
+        "inputs": [],
+        "name": "nonce",
+        "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function",
+    }
+]
+
+
+@dataclass(frozen=True)
+class Balances:
+    """Balances of the service addresses."""
+
+    agent_xdai: int
+    safe_xdai: int
+    safe_wxdai: int
+    operator_xdai: int
+    master_eoa_xdai: int
+
 
-    UNSTAKED = 0
-    STAKED = 1
-    EVICTED = 2
+@dataclass(frozen=True)
+class TraderService:  # pylint: disable=too-many-instance-attributes
+    """Addresses and settings of the trader service the report is about."""
+
+    service_id: int
+    staking_program_id: str
+    rpc: str
+    agent_address: str
+    safe_address: str
+    operator_address: str
+    master_eoa: str
+
+
+@dataclass(frozen=True)
+class Section:
+    """A task of the report, run as soon as the sections it depends on are done."""
+
+    name: str
+    fn: Callable[..., Any]
+    deps: tuple[str, ...] = ()
 
 
 def _color_string(text: str, color_code: str) -> str:
@@ -196,240 +248,161 @@ def _warning_message(current_value: int, threshold: int = 0, message: str = "")
     return ""
 
 
-def _get_agent_status() -> str:
-    client = docker.from_env()
-    trader_abci_container = None
-    trader_tm_container = None
-    for container in client.containers.list():
-        if container.name.startswith("traderpearl") and container.name.endswith("abci_0"):
-            trader_abci_container = container
-        elif container.name.startswith("traderpearl") and container.name.endswith("tm_0"):
-            trader_tm_container = container
-        if trader_abci_container and trader_tm_container:
-            break
+def _get_agent_status(container_cache: Optional[ContainerStateCache] = None) -> str:
+    if container_cache is not None:
+        containers = container_cache.containers()
+    else:
+        containers = find_containers(AGENT_CONTAINERS_FILTER)
 
-    is_running = trader_abci_container and trader_tm_container
+    is_running = any(c.name.endswith("abci_0") for c in containers) and any(
+        c.name.endswith("tm_0") for c in containers
+    )
     return _color_bool(is_running, "Running", "Stopped")
 
 
-def _parse_args() -> Any:
-    """Parse the script arguments."""
-    parser = ArgumentParser(description="Get a report for a trader service.")
-    args = parser.parse_args()
-    return args
-
-
-if __name__ == "__main__":
-    user_args = _parse_args()
-
-    operate_wallet_path = OPERATE_HOME / "wallets" / "ethereum.json"
-    if not operate_wallet_path.exists():
-        print("Operate wallet not found.")
-        sys.exit(1)
-
-    with open(operate_wallet_path) as file:
-        operator_wallet_data = json.load(file)
-
-    template_path = Path(SCRIPT_PATH.parents[1], "configs", "config_predict_trader.json")
-    operate = OperateApp()
-    ask_password_if_needed(operate)
-    service = get_service_from_config(template_path, operate)
-    config = load_local_config(operate=operate, service_name=service.name)
-    chain_config = service.chain_configs["gnosis"]
-    agent_address = service.keys[0].address
-    master_eoa = operator_wallet_data["address"]
-    if "safes" in operator_wallet_data and "gnosis" in operator_wallet_data["safes"]:
-        operator_address = operator_wallet_data["safes"]["gnosis"]
-    else:
-        print("Operate wallet not found.")
-        sys.exit(1)
+def _get_balances(  # pylint: disable=too-many-arguments
+    w3: Web3,
+    agent_address: str,
+    safe_address: str,
+    operator_address: str,
+    master_eoa: str,
+    block_number: int,
+) -> Balances:
+    wxdai_contract = w3.eth.contract(
+        address=trades.WXDAI_CONTRACT_ADDRESS, abi=ERC20_BALANCE_OF_ABI  # type: ignore
+    )
+    return Balances(
+        *aggregate(
+            w3,
+            [
+                eth_balance_call(w3, agent_address),
+                eth_balance_call(w3, safe_address),
+                Call(wxdai_contract, "balanceOf", (safe_address,)),
+                eth_balance_call(w3, operator_address),
+                eth_balance_call(w3, master_eoa),
+            ],
+            block_number,
+        )
+    )
 
-    safe_address = chain_config.chain_data.multisig
-    service_id = chain_config.chain_data.token
-    rpc = chain_config.ledger_config.rpc
 
-    # Prediction market trading
-    mech_requests = trades.get_mech_requests(safe_address)
+def _get_trading_statistics(
+    rpc: str,
+    safe_address: str,
+    mech_requests: dict[str, Any],
+    trades_json: dict[str, Any],
+) -> dict[Any, dict[Any, Any]]:
     mech_statistics = trades.get_mech_statistics(mech_requests)
-    trades_json = trades._query_omen_xdai_subgraph(safe_address)
     _, statistics_table = trades.parse_user(
         rpc, safe_address, trades_json, mech_statistics
     )
+    return statistics_table
 
-    try:
-        w3 = Web3(HTTPProvider(rpc))
-        current_block_number = w3.eth.block_number
-
-        print("")
-        print_title(f"\nService report on block number {current_block_number}\n")
 
-        # Performance
-        _print_section_header(f"Performance")
-        _print_subsection_header("Staking")
-
-        staking_token_address = get_staking_contract(
-            chain=Chain.GNOSIS.value,
-            staking_program_id=config.staking_program_id,
+def _run_section(section: Section, args: list[Any], timings: dict[str, float]) -> Any:
+    start = time.perf_counter()
+    try:
+        return section.fn(*args)
+    finally:
+        timings[section.name] = time.perf_counter() - start
+
+
+def _run_sections(
+    sections: Sequence[Section],
+) -> tuple[dict[str, Any], dict[str, BaseException], dict[str, float]]:
+    """Run the report sections concurrently.
+
+    Each section is started as soon as the sections it depends on are done, and
+    receives their results as positional arguments. Sections whose dependencies
+    failed are not run.
+    """
+    names = {section.name for section in sections}
+    for section in sections:
+        unknown_deps = set(section.deps) - names
+        if unknown_deps:
+            raise ValueError(f"Unknown dependencies for section {section.name}: {unknown_deps}")
+
+    results: dict[str, Any] = {}
+    errors: dict[str, BaseException] = {}
+    timings: dict[str, float] = {}
+    pending = list(sections)
+    running: dict[Future, Section] = {}
+
+    with ThreadPoolExecutor(max_workers=len(sections)) as executor:
+        while pending or running:
+            for section in list(pending):
+                failed_deps = [dep for dep in section.deps if dep in errors]
+                if failed_deps:
+                    pending.remove(section)
+                    errors[section.name] = RuntimeError(
+                        f"Skipped because {', '.join(failed_deps)} failed."
+                    )
+                elif all(dep in results for dep in section.deps):
+                    pending.remove(section)
+                    args = [results[dep] for dep in section.deps]
+                    future = executor.submit(_run_section, section, args, timings)
+                    running[future] = section
+
+            if not running:
+                if pending:
+                    raise ValueError(
+                        f"Circular dependencies between sections: {[section.name for section in pending]}"
+                    )
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                section = running.pop(future)
+                try:
+                    results[section.name] = future.result()
+                except Exception as e:  # pylint: disable=broad-except
+                    errors[section.name] = e
+
+    return results, errors, timings
+
+
+def _print_error(error: BaseException, message: str) -> None:
+    traceback.print_exception(type(error), error, error.__traceback__)
+    print(message)
+
+
+def _print_staking(staking_program_id: str, staking_snapshot: StakingSnapshot) -> None:
+    staking_state = staking_snapshot.staking_state
+    is_staked = staking_snapshot.is_staked
+
+    _print_status("Is service staked?", _color_bool(is_staked, "Yes", "No"))
+    if is_staked:
+        _print_status("Staking program", staking_program_id)  # type: ignore
+    if staking_state == StakingState.STAKED:
+        _print_status("Staking state", staking_state.name)
+    elif staking_state == StakingState.EVICTED:
+        _print_status("Staking state", _color_string(staking_state.name, ColorCode.RED))
+
+    if is_staked:
+        _print_status(
+            "Staked (security deposit)",
+            f"{wei_to_olas(staking_snapshot.security_deposit)} {_warning_message(staking_snapshot.security_deposit, staking_snapshot.min_security_deposit)}",
+        )
+        _print_status(
+            "Staked (agent bond)",
+            f"{wei_to_olas(staking_snapshot.agent_bond)} {_warning_message(staking_snapshot.agent_bond, staking_snapshot.min_staking_deposit)}",
+        )
+        _print_status("Accrued rewards", f"{wei_to_olas(staking_snapshot.accrued_rewards)}")
+
+        # mech_requests_current_epoch = _get_mech_requests_count(
+        #     mech_requests, staking_snapshot.last_checkpoint_ts
+        # )
+        mech_requests_current_epoch = staking_snapshot.mech_requests_current_epoch
+        mech_requests_24h_threshold = staking_snapshot.mech_requests_threshold
+        _print_status(
+            "Num. Mech txs current epoch",
+            f"{mech_requests_current_epoch} {_warning_message(mech_requests_current_epoch, mech_requests_24h_threshold, f'- Too low. Threshold is {mech_requests_24h_threshold}.')}",
         )
-        if staking_token_address is None:
-            is_staked = False
-            staking_state = StakingState.UNSTAKED
-        else:
-            staking_token_data = requests.get(STAKING_TOKEN_INSTANCE_ABI_PATH).json()
-
-            staking_token_abi = staking_token_data.get("abi", [])
-            staking_token_contract = w3.eth.contract(
-                address=staking_token_address, abi=staking_token_abi  # type: ignore
-            )
-
-            staking_state = StakingState(
-                staking_token_contract.functions.getStakingState(
-                    service_id
-                ).call(block_identifier=current_block_number)
-            )
-
-            is_staked = (
-                staking_state == StakingState.STAKED
-                or staking_state == StakingState.EVICTED
-            )
-
-        _print_status("Is service staked?", _color_bool(is_staked, "Yes", "No"))
-        if is_staked:
-            _print_status("Staking program", config.staking_program_id)  # type: ignore
-        if staking_state == StakingState.STAKED:
-            _print_status("Staking state", staking_state.name)
-        elif staking_state == StakingState.EVICTED:
-            _print_status("Staking state", _color_string(staking_state.name, ColorCode.RED))
-
-        if is_staked:
-
-            activity_checker_address = staking_token_contract.functions.activityChecker().call(block_identifier=current_block_number)
-            activity_checker_data = requests.get(MECH_ACTIVITY_CHECKER_JSON_URL).json()
-
-            activity_checker_abi = activity_checker_data.get("abi", [])
-            activity_checker_contract = w3.eth.contract(
-                address=activity_checker_address, abi=activity_checker_abi  # type: ignore
-            )
-
-            service_registry_token_utility_data = requests.get(SERVICE_REGISTRY_TOKEN_UTILITY_JSON_URL).json()
-            service_registry_token_utility_contract_address = (
-                staking_token_contract.functions.serviceRegistryTokenUtility().call(block_identifier=current_block_number)
-            )
-            service_registry_token_utility_abi = (
-                service_registry_token_utility_data.get("abi", [])
-            )
-            service_registry_token_utility_contract = w3.eth.contract(
-                address=service_registry_token_utility_contract_address,
-                abi=service_registry_token_utility_abi,
-            )
-
-            try:
-                activity_checker_data = requests.get(MECH_CONTRACT_JSON_URL).json()
-                activity_checker_abi = activity_checker_data.get("abi", [])
-                mm_activity_checker_contract = w3.eth.contract(
-                    address=activity_checker_address, abi=activity_checker_abi  # type: ignore
-                )
-                mech_contract_address = mm_activity_checker_contract.functions.mechMarketplace().call(block_identifier=current_block_number)
-            except (ContractLogicError, ValueError):
-                mech_contract_address = activity_checker_contract.functions.agentMech().call(block_identifier=current_block_number)
-
-            mech_contract_abi = [
-                {
-                    "inputs": [
-                        {
-                        "internalType": "address",
-                        "name": "account",
-                        "type": "address"
-                        }
-                    ],
-                    "name": function_name,
-                    "outputs": [
-                        {
-                        "internalType": "uint256",
-                        "name": "",
-                        "type": "uint256"
-                        }
-                    ],
-                    "stateMutability": "view",
-                    "type": "function"
-                }
-                for function_name in ("mapRequestsCounts", "mapRequestCounts")
-            ]
-            mech_contract = w3.eth.contract(
-                address=mech_contract_address, abi=mech_contract_abi   # type: ignore
-            )
-            try:
-                mech_request_count = mech_contract.functions.mapRequestsCounts(safe_address).call(block_identifier=current_block_number)
-            except (ABIFunctionNotFound, ValueError):
-                # Use mapRequestCounts for newer mechs
-                mech_request_count = mech_contract.functions.mapRequestCounts(safe_address).call(block_identifier=current_block_number)
-
-            security_deposit = (
-                service_registry_token_utility_contract.functions.getOperatorBalance(
-                    operator_address, service_id
-                ).call(block_identifier=current_block_number)
-            )
-            agent_id = int(staking_token_contract.functions.getAgentIds().call(block_identifier=current_block_number)[0])
-            agent_bond = service_registry_token_utility_contract.functions.getAgentBond(
-                service_id, agent_id
-            ).call(block_identifier=current_block_number)
-            min_staking_deposit = (
-                staking_token_contract.functions.minStakingDeposit().call(block_identifier=current_block_number)
-            )
-
-            # In the setting 1 agent instance as of now: minOwnerBond = minStakingDeposit
-            min_security_deposit = min_staking_deposit
-            _print_status(
-                "Staked (security deposit)",
-                f"{wei_to_olas(security_deposit)} {_warning_message(security_deposit, min_security_deposit)}",
-            )
-            _print_status(
-                "Staked (agent bond)",
-                f"{wei_to_olas(agent_bond)} {_warning_message(agent_bond, min_staking_deposit)}",
-            )
-
-            service_info = staking_token_contract.functions.mapServiceInfo(
-                service_id
-            ).call(block_identifier=current_block_number)
-            rewards = service_info[3]
-            _print_status("Accrued rewards", f"{wei_to_olas(rewards)}")
-
-            liveness_ratio = (
-                activity_checker_contract.functions.livenessRatio().call(block_identifier=current_block_number)
-            )
-            current_timestamp = w3.eth.get_block(current_block_number).timestamp
-            last_ts_checkpoint = staking_token_contract.functions.tsCheckpoint().call(block_identifier=current_block_number)
-            liveness_period = (
-                staking_token_contract.functions.livenessPeriod().call(block_identifier=current_block_number)
-            )
-            mech_requests_24h_threshold = math.ceil(
-                max(liveness_period, (current_timestamp - last_ts_checkpoint))
-                * liveness_ratio
-                / 10 ** 18
-            )
-
-            next_checkpoint_ts = (
-                staking_token_contract.functions.getNextRewardCheckpointTimestamp().call(block_identifier=current_block_number)
-            )
-            last_checkpoint_ts = next_checkpoint_ts - liveness_period
-
-            mech_request_count_on_last_checkpoint = (
-                staking_token_contract.functions.getServiceInfo(service_id).call(block_identifier=current_block_number)
-            )[2][1]
-            mech_requests_since_last_cp = mech_request_count - mech_request_count_on_last_checkpoint
-            # mech_requests_current_epoch = _get_mech_requests_count(
-            #     mech_requests, last_checkpoint_ts
-            # )
-            mech_requests_current_epoch = mech_requests_since_last_cp
-            _print_status(
-                "Num. Mech txs current epoch",
-                f"{mech_requests_current_epoch} {_warning_message(mech_requests_current_epoch, mech_requests_24h_threshold, f'- Too low. Threshold is {mech_requests_24h_threshold}.')}",
-            )
 
-    except Exception:  # pylint: disable=broad-except
-        traceback.print_exc()
-        print("An error occurred while interacting with the staking contract.")
 
+def _print_trading(
+    statistics_table: dict[Any, dict[Any, Any]], trades_json: dict[str, Any]
+) -> None:
     _print_subsection_header("Prediction market trading")
     _print_status(
         "ROI on closed markets",
@@ -450,46 +423,321 @@ if __name__ == "__main__":
     _print_status(f"Average trades per market", _average_trades_since_message(n_trades, n_unique_markets))
     _print_status(f"Max trades per market", _max_trades_per_market_since_message(filtered_trades))
 
-    # Service
-    _print_section_header("Service")
-    _print_status("ID", str(service_id))
 
+def _print_balances(  # pylint: disable=too-many-arguments
+    agent_status: str,
+    agent_address: str,
+    safe_address: str,
+    operator_address: str,
+    master_eoa: str,
+    balances: Balances,
+) -> None:
     # Agent
-    agent_status = _get_agent_status()
-    agent_xdai = get_balance(agent_address, rpc, block_identifier=current_block_number)
     _print_subsection_header("Agent")
     _print_status("Status (on this machine)", agent_status)
     _print_status("Address", agent_address)
     _print_status(
         "xDAI Balance",
-        f"{wei_to_xdai(agent_xdai)} {_warning_message(agent_xdai, AGENT_XDAI_BALANCE_THRESHOLD)}",
+        f"{wei_to_xdai(balances.agent_xdai)} {_warning_message(balances.agent_xdai, AGENT_XDAI_BALANCE_THRESHOLD)}",
     )
 
     # Safe
-    safe_xdai = get_balance(safe_address, rpc, block_identifier=current_block_number)
-    safe_wxdai = get_token_balance(safe_address, trades.WXDAI_CONTRACT_ADDRESS, rpc, block_identifier=current_block_number)
     _print_subsection_header(
-        f"Safe {_warning_message(safe_xdai + safe_wxdai, SAFE_BALANCE_THRESHOLD)}"
+        f"Safe {_warning_message(balances.safe_xdai + balances.safe_wxdai, SAFE_BALANCE_THRESHOLD)}"
     )
     _print_status("Address", safe_address)
-    _print_status("xDAI Balance", wei_to_xdai(safe_xdai))
-    _print_status("WxDAI Balance", wei_to_wxdai(safe_wxdai))
+    _print_status("xDAI Balance", wei_to_xdai(balances.safe_xdai))
+    _print_status("WxDAI Balance", wei_to_wxdai(balances.safe_wxdai))
 
     # Master Safe - Agent Owner/Operator
-    operator_xdai = get_balance(operator_address, rpc, block_identifier=current_block_number)
     _print_subsection_header("Master Safe - Agent Owner/Operator")
     _print_status("Address", operator_address)
     _print_status(
         "xDAI Balance",
-        f"{wei_to_xdai(operator_xdai)} {_warning_message(operator_xdai, OPERATOR_XDAI_BALANCE_THRESHOLD)}",
+        f"{wei_to_xdai(balances.operator_xdai)} {_warning_message(balances.operator_xdai, OPERATOR_XDAI_BALANCE_THRESHOLD)}",
     )
 
     # Master EOA - Master Safe Owner
-    master_eoa_xdai = get_balance(master_eoa, rpc, block_identifier=current_block_number)
     _print_subsection_header("Master EOA - Master Safe Owner")
     _print_status("Address", master_eoa)
     _print_status(
         "xDAI Balance",
-        f"{wei_to_xdai(master_eoa_xdai)} {_warning_message(master_eoa_xdai, OPERATOR_XDAI_BALANCE_THRESHOLD)}",
+        f"{wei_to_xdai(balances.master_eoa_xdai)} {_warning_message(balances.master_eoa_xdai, OPERATOR_XDAI_BALANCE_THRESHOLD)}",
+    )
+
+
+def _print_timings(timings: dict[str, float], total: float) -> None:
+    _print_section_header("Timings")
+    for name, elapsed in sorted(timings.items(), key=lambda item: item[1], reverse=True):
+        _print_status(name, f"{elapsed:.2f} s")
+    _print_status("Total (wall clock)", f"{total:.2f} s")
+
+
+def _print_report(
+    service: TraderService,
+    results: dict[str, Any],
+    errors: dict[str, BaseException],
+    timings: dict[str, float],
+    total_time: float,
+) -> bool:
+    """Print the report from the results of the sections."""
+    if "block_number" in errors:
+        _print_error(errors["block_number"], "An error occurred while connecting to the RPC.")
+        return False
+
+    print("")
+    print_title(f"\nService report on block number {results['block_number']}\n")
+
+    # Performance
+    _print_section_header(f"Performance")
+    _print_subsection_header("Staking")
+    if "staking" in errors:
+        _print_error(errors["staking"], "An error occurred while interacting with the staking contract.")
+    else:
+        _print_staking(service.staking_program_id, results["staking"])
+
+    if "trading_statistics" in errors:
+        _print_error(errors["trading_statistics"], "An error occurred while computing the trading statistics.")
+    else:
+        _print_trading(results["trading_statistics"], results["trades"])
+
+    # Service
+    _print_section_header("Service")
+    _print_status("ID", str(service.service_id))
+
+    if "agent_status" in errors:
+        _print_error(errors["agent_status"], "An error occurred while inspecting the Docker containers.")
+    if "balances" in errors:
+        _print_error(errors["balances"], "An error occurred while reading the balances.")
+    else:
+        _print_balances(
+            results.get("agent_status", _color_string("Unknown", ColorCode.YELLOW)),
+            service.agent_address,
+            service.safe_address,
+            service.operator_address,
+            service.master_eoa,
+            results["balances"],
+        )
+
+    _print_timings(timings, total_time)
+    return True
+
+
+def _trading_sections(service: TraderService) -> list[Section]:
+    """Sections of the trade history, which only changes when the service trades."""
+    return [
+        Section("mech_requests", lambda: trades.get_mech_requests(service.safe_address)),
+        Section("trades", lambda: trades._query_omen_xdai_subgraph(service.safe_address)),
+        Section(
+            "trading_statistics",
+            lambda mech_requests, trades_json: _get_trading_statistics(
+                service.rpc, service.safe_address, mech_requests, trades_json
+            ),
+            deps=("mech_requests", "trades"),
+        ),
+    ]
+
+
+def _block_sections(
+    w3: Web3,
+    service: TraderService,
+    staking_reader: StakingSnapshotReader,
+    block_number: Optional[int] = None,
+    container_cache: Optional[ContainerStateCache] = None,
+) -> list[Section]:
+    """Sections that can change on every block."""
+    return [
+        Section(
+            "block_number",
+            lambda: w3.eth.block_number if block_number is None else block_number,
+        ),
+        Section("staking", staking_reader.read, deps=("block_number",)),
+        Section(
+            "balances",
+            lambda block_number: _get_balances(
+                w3,
+                service.agent_address,
+                service.safe_address,
+                service.operator_address,
+                service.master_eoa,
+                block_number,
+            ),
+            deps=("block_number",),
+        ),
+        Section("agent_status", lambda: _get_agent_status(container_cache)),
+    ]
+
+
+def _watch(
+    w3: Web3,
+    service: TraderService,
+    staking_reader: StakingSnapshotReader,
+    interval: float,
+    container_cache: Optional[ContainerStateCache] = None,
+) -> None:
+    """Redraw the report on every new block.
+
+    The trade history is only refetched when the nonce of the service Safe
+    changes, as every trade and mech request is a Safe transaction.
+    """
+    safe_contract = w3.eth.contract(
+        address=service.safe_address, abi=SAFE_NONCE_ABI  # type: ignore
+    )
+    last_block_number = None
+    last_safe_nonce = None
+    trading_results: dict[str, Any] = {}
+    trading_errors: dict[str, BaseException] = {}
+
+    while True:
+        try:
+            block_number = w3.eth.block_number
+        except Exception as e:  # pylint: disable=broad-except
+            print(f"WARNING: Could not get the block number ({e}).")
+            time.sleep(interval)
+            continue
+
+        if block_number == last_block_number:
+            time.sleep(interval)
+            continue
+        last_block_number = block_number
+
+        refresh_start = time.perf_counter()
+        # Silence the progress messages of the sections while gathering
+        with redirect_stdout(io.StringIO()):
+            results, errors, timings = _run_sections(
+                _block_sections(
+                    w3, service, staking_reader, block_number, container_cache
+                )
+                + [
+                    Section(
+                        "safe_nonce",
+                        lambda block_number: safe_contract.functions.nonce().call(
+                            block_identifier=block_number
+                        ),
+                        deps=("block_number",),
+                    )
+                ]
+            )
+            safe_nonce = results.get("safe_nonce")
+            if not (trading_results or trading_errors) or (
+                safe_nonce is not None and safe_nonce != last_safe_nonce
+            ):
+                trading_results, trading_errors, trading_timings = _run_sections(
+                    _trading_sections(service)
+                )
+                timings.update(trading_timings)
+                last_safe_nonce = safe_nonce
+        results.update(trading_results)
+        errors.update(trading_errors)
+        refresh_time = time.perf_counter() - refresh_start
+
+        output = io.StringIO()
+        with redirect_stdout(output), redirect_stderr(output):
+            _print_report(service, results, errors, timings, refresh_time)
+            print(f"\nWatching for new blocks every {interval} s. Press Ctrl+C to exit.")
+        print(CLEAR_SCREEN + output.getvalue(), end="", flush=True)
+
+
+def _parse_args() -> Any:
+    """Parse the script arguments."""
+    parser = ArgumentParser(description="Get a report for a trader service.")
+    parser.add_argument(
+        "--refresh-abis",
+        action="store_true",
+        help="Revalidate the locally cached contract ABIs.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and redraw the report on every new block.",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=WATCH_INTERVAL,
+        help=f"Seconds between new block checks in watch mode (default: {WATCH_INTERVAL}).",
+    )
+    args = parser.parse_args()
+    return args
+
+
+if __name__ == "__main__":
+    user_args = _parse_args()
+
+    operate_wallet_path = OPERATE_HOME / "wallets" / "ethereum.json"
+    if not operate_wallet_path.exists():
+        print("Operate wallet not found.")
+        sys.exit(1)
+
+    with open(operate_wallet_path) as file:
+        operator_wallet_data = json.load(file)
+
+    template_path = Path(SCRIPT_PATH.parents[1], "configs", "config_predict_trader.json")
+    operate = OperateApp()
+    ask_password_if_needed(operate)
+    service = get_service_from_config(template_path, operate)
+    config = load_local_config(operate=operate, service_name=service.name)
+    chain_config = service.chain_configs["gnosis"]
+    if "safes" in operator_wallet_data and "gnosis" in operator_wallet_data["safes"]:
+        operator_address = operator_wallet_data["safes"]["gnosis"]
+    else:
+        print("Operate wallet not found.")
+        sys.exit(1)
+
+    trader_service = TraderService(
+        service_id=chain_config.chain_data.token,
+        staking_program_id=config.staking_program_id,
+        rpc=chain_config.ledger_config.rpc,
+        agent_address=service.keys[0].address,
+        safe_address=chain_config.chain_data.multisig,
+        operator_address=operator_address,
+        master_eoa=operator_wallet_data["address"],
+    )
+    w3 = Web3(HTTPProvider(trader_service.rpc))
+    staking_reader = StakingSnapshotReader(
+        w3=w3,
+        staking_token_address=get_staking_contract(
+            chain=Chain.GNOSIS.value,
+            staking_program_id=config.staking_program_id,
+        ),
+        service_id=trader_service.service_id,
+        safe_address=trader_service.safe_address,
+        operator_address=trader_service.operator_address,
+        revalidate_abis=user_args.refresh_abis,
     )
+
+    if user_args.watch:
+        # Follow the Docker events instead of querying the containers on every block
+        try:
+            agent_container_cache = ContainerStateCache(AGENT_CONTAINERS_FILTER).start()
+        except Exception as e:  # pylint: disable=broad-except
+            print(f"WARNING: Could not follow the Docker events ({e}).")
+            agent_container_cache = None
+
+        try:
+            _watch(
+                w3,
+                trader_service,
+                staking_reader,
+                user_args.interval,
+                agent_container_cache,
+            )
+        except KeyboardInterrupt:
+            print("")
+        finally:
+            if agent_container_cache is not None:
+                agent_container_cache.stop()
+        sys.exit(0)
+
+    # The sections are independent except for the listed dependencies,
+    # so that the subgraph, IPFS, RPC and Docker requests overlap.
+    report_start = time.perf_counter()
+    results, errors, timings = _run_sections(
+        _trading_sections(trader_service)
+        + _block_sections(w3, trader_service, staking_reader)
+    )
+    report_time = time.perf_counter() - report_start
+
+    if not _print_report(trader_service, results, errors, timings, report_time):
+        sys.exit(1)
     print("")
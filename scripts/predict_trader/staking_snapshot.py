@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2024 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Staking status of a trader service, read at a pinned block."""
+
+import math
+from dataclasses import dataclass
+from enum import Enum
+from typing import List, Optional
+
+from web3 import Web3
+
+from operate.constants import (
+    MECH_ACTIVITY_CHECKER_JSON_URL,
+    MECH_CONTRACT_JSON_URL,
+    SERVICE_REGISTRY_TOKEN_UTILITY_JSON_URL,
+    STAKING_TOKEN_INSTANCE_ABI_PATH,
+)
+from scripts.multicall import Call, aggregate, block_timestamp_call
+from scripts.predict_trader.abi_cache import prefetch_contract_data
+
+
+MECH_CONTRACT_ABI = [
+    {
+        "inputs": [{"internalType": "address", "name": "account", "type": "address"}],
+        "name": function_name,
+        "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function",
+    }
+    for function_name in ("mapRequestsCounts", "mapRequestCounts")
+]
+
+
+class StakingState(Enum):
+    """Staking state enumeration for the staking."""
+
+    UNSTAKED = 0
+    STAKED = 1
+    EVICTED = 2
+
+
+@dataclass(frozen=True)
+class StakingSnapshot:
+    """Staking status of a service at a given block."""
+
+    block_number: int
+    block_timestamp: int
+    staking_state: StakingState
+    security_deposit: int = 0
+    agent_bond: int = 0
+    min_staking_deposit: int = 0
+    accrued_rewards: int = 0
+    liveness_ratio: int = 0
+    liveness_period: int = 0
+    ts_checkpoint: int = 0
+    next_checkpoint_ts: int = 0
+    mech_request_count: int = 0
+    mech_request_count_on_last_checkpoint: int = 0
+
+    @property
+    def is_staked(self) -> bool:
+        """Whether the service is staked (including evicted services)."""
+        return self.staking_state in (StakingState.STAKED, StakingState.EVICTED)
+
+    @property
+    def min_security_deposit(self) -> int:
+        """Minimum security deposit."""
+        # In the setting 1 agent instance as of now: minOwnerBond = minStakingDeposit
+        return self.min_staking_deposit
+
+    @property
+    def last_checkpoint_ts(self) -> int:
+        """Timestamp of the last reward checkpoint."""
+        return self.next_checkpoint_ts - self.liveness_period
+
+    @property
+    def mech_requests_current_epoch(self) -> int:
+        """Mech requests made since the last checkpoint."""
+        return self.mech_request_count - self.mech_request_count_on_last_checkpoint
+
+    @property
+    def mech_requests_threshold(self) -> int:
+        """Mech requests required to pass the liveness check in the current epoch."""
+        return math.ceil(
+            max(self.liveness_period, (self.block_timestamp - self.ts_checkpoint))
+            * self.liveness_ratio
+            / 10**18
+        )
+
+
+class StakingSnapshotReader:  # pylint: disable=too-many-instance-attributes
+    """Reads staking snapshots of a service, keeping the contracts between reads.
+
+    The activity checker, token utility and mech addresses cannot change for a
+    staking contract, so they are resolved on the first read only. Every read
+    after that is a single Multicall3 batch.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        w3: Web3,
+        staking_token_address: Optional[str],
+        service_id: int,
+        safe_address: str,
+        operator_address: str,
+        revalidate_abis: bool = False,
+    ) -> None:
+        """Initialize the reader."""
+        self.w3 = w3
+        self.staking_token_address = staking_token_address
+        self.service_id = service_id
+        self.safe_address = safe_address
+        self.operator_address = operator_address
+        self.revalidate_abis = revalidate_abis
+        self._calls: Optional[List[Call]] = None
+
+    def _get_calls(self, block_number: int) -> List[Call]:
+        """Resolve the contracts and build the calls of a snapshot."""
+        if self._calls is not None:
+            return self._calls
+
+        w3 = self.w3
+        if self.staking_token_address is None:
+            self._calls = [block_timestamp_call(w3)]
+            return self._calls
+
+        contract_data = prefetch_contract_data(
+            (
+                STAKING_TOKEN_INSTANCE_ABI_PATH,
+                MECH_ACTIVITY_CHECKER_JSON_URL,
+                SERVICE_REGISTRY_TOKEN_UTILITY_JSON_URL,
+            ),
+            revalidate=self.revalidate_abis,
+            # Only needed for the mech marketplace, the agent mech is the fallback
+            optional_urls=(MECH_CONTRACT_JSON_URL,),
+        )
+        staking_token_contract = w3.eth.contract(
+            address=self.staking_token_address,  # type: ignore
+            abi=contract_data[STAKING_TOKEN_INSTANCE_ABI_PATH].get("abi", []),
+        )
+        (
+            activity_checker_address,
+            service_registry_token_utility_address,
+            agent_ids,
+        ) = aggregate(
+            w3,
+            [
+                Call(staking_token_contract, "activityChecker"),
+                Call(staking_token_contract, "serviceRegistryTokenUtility"),
+                Call(staking_token_contract, "getAgentIds"),
+            ],
+            block_number,
+        )
+
+        activity_checker_contract = w3.eth.contract(
+            address=activity_checker_address,
+            abi=contract_data[MECH_ACTIVITY_CHECKER_JSON_URL].get("abi", []),
+        )
+        mm_activity_checker_contract = w3.eth.contract(
+            address=activity_checker_address,
+            abi=contract_data[MECH_CONTRACT_JSON_URL].get("abi", []),
+        )
+        service_registry_token_utility_contract = w3.eth.contract(
+            address=service_registry_token_utility_address,
+            abi=contract_data[SERVICE_REGISTRY_TOKEN_UTILITY_JSON_URL].get("abi", []),
+        )
+        mech_marketplace_address, agent_mech_address = aggregate(
+            w3,
+            [
+                Call(mm_activity_checker_contract, "mechMarketplace", allow_failure=True),
+                Call(activity_checker_contract, "agentMech", allow_failure=True),
+            ],
+            block_number,
+        )
+        mech_contract_address = mech_marketplace_address or agent_mech_address
+        if mech_contract_address is None:
+            raise ValueError(
+                f"Could not get the mech address from the activity checker {activity_checker_address}."
+            )
+        mech_contract = w3.eth.contract(
+            address=mech_contract_address, abi=MECH_CONTRACT_ABI  # type: ignore
+        )
+
+        agent_id = int(agent_ids[0])
+        self._calls = [
+            block_timestamp_call(w3),
+            Call(staking_token_contract, "getStakingState", (self.service_id,)),
+            Call(staking_token_contract, "minStakingDeposit"),
+            Call(staking_token_contract, "mapServiceInfo", (self.service_id,)),
+            Call(staking_token_contract, "tsCheckpoint"),
+            Call(staking_token_contract, "livenessPeriod"),
+            Call(staking_token_contract, "getNextRewardCheckpointTimestamp"),
+            Call(staking_token_contract, "getServiceInfo", (self.service_id,)),
+            Call(activity_checker_contract, "livenessRatio"),
+            Call(
+                service_registry_token_utility_contract,
+                "getOperatorBalance",
+                (self.operator_address, self.service_id),
+            ),
+            Call(
+                service_registry_token_utility_contract,
+                "getAgentBond",
+                (self.service_id, agent_id),
+            ),
+            # Use mapRequestCounts for newer mechs
+            Call(mech_contract, "mapRequestsCounts", (self.safe_address,), allow_failure=True),
+            Call(mech_contract, "mapRequestCounts", (self.safe_address,), allow_failure=True),
+        ]
+        return self._calls
+
+    def read(self, block_number: int) -> StakingSnapshot:
+        """Read the staking snapshot at the given block."""
+        calls = self._get_calls(block_number)
+        if self.staking_token_address is None:
+            (block_timestamp,) = aggregate(self.w3, calls, block_number)
+            return StakingSnapshot(
+                block_number=block_number,
+                block_timestamp=block_timestamp,
+                staking_state=StakingState.UNSTAKED,
+            )
+
+        (
+            block_timestamp,
+            staking_state,
+            min_staking_deposit,
+            service_info,
+            ts_checkpoint,
+            liveness_period,
+            next_checkpoint_ts,
+            staking_service_info,
+            liveness_ratio,
+            security_deposit,
+            agent_bond,
+            *mech_request_counts,
+        ) = aggregate(self.w3, calls, block_number)
+
+        staking_state = StakingState(staking_state)
+        if staking_state == StakingState.UNSTAKED:
+            # The service info of an unstaked service is empty
+            return StakingSnapshot(
+                block_number=block_number,
+                block_timestamp=block_timestamp,
+                staking_state=staking_state,
+            )
+
+        mech_request_count = next(
+            (count for count in mech_request_counts if count is not None), None
+        )
+        if mech_request_count is None:
+            raise ValueError("Could not get the mech request count from the mech.")
+
+        return StakingSnapshot(
+            block_number=block_number,
+            block_timestamp=block_timestamp,
+            staking_state=staking_state,
+            security_deposit=security_deposit,
+            agent_bond=agent_bond,
+            min_staking_deposit=min_staking_deposit,
+            accrued_rewards=service_info[3],
+            liveness_ratio=liveness_ratio,
+            liveness_period=liveness_period,
+            ts_checkpoint=ts_checkpoint,
+            next_checkpoint_ts=next_checkpoint_ts,
+            mech_request_count=mech_request_count,
+            mech_request_count_on_last_checkpoint=staking_service_info[2][1],
+        )
+
+
+def get_staking_snapshot(  # pylint: disable=too-many-arguments
+    w3: Web3,
+    staking_token_address: Optional[str],
+    service_id: int,
+    safe_address: str,
+    operator_address: str,
+    block_number: int,
+    revalidate_abis: bool = False,
+) -> StakingSnapshot:
+    """Read the staking status of a service at the given block."""
+    return StakingSnapshotReader(
+        w3=w3,
+        staking_token_address=staking_token_address,
+        service_id=service_id,
+        safe_address=safe_address,
+        operator_address=operator_address,
+        revalidate_abis=revalidate_abis,
+    ).read(block_number)
@@ -166,6 +166,14 @@ class MarketState(Enum):
         """Prints the market status."""
         return self.name.capitalize()
 
+    @staticmethod
+    def argparse(s: str) -> "MarketState":
+        """Performs string conversion to MarketState."""
+        try:
+            return MarketState[s.upper()]
+        except KeyError as e:
+            raise ValueError(f"Invalid MarketState: {s}") from e
+
 
 class MarketAttribute(Enum):
     """Attribute"""
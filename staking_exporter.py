@@ -0,0 +1,205 @@
+#!/usr/bin/env -S uv run --quiet --script
+# /// script
+# dependencies = [
+#   "web3>=6.0.0",
+# ]
+# ///
+"""
+Prometheus metrics endpoint for the staking state of the Quorum voting agent.
+
+Every service in .operate/services is read in one batched snapshot per RPC, as in
+`staking_report.py --fleet`. Snapshots are cached for the refresh interval, so any
+number of scrapers can poll the endpoint without adding RPC load.
+
+Usage:
+  # Serve the metrics on http://127.0.0.1:9110/metrics, refreshed every minute
+  ./staking_exporter.py
+
+  # Listen on every interface, refreshing every 5 minutes
+  ./staking_exporter.py --host 0.0.0.0 --interval 300
+"""
+
+import sys
+import time
+import argparse
+import threading
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from web3 import Web3
+
+from staking_report import (
+    FLEET_TIMEOUT,
+    ServiceSnapshot,
+    get_service_entry,
+    load_all_service_configs,
+    read_fleet_snapshots,
+    read_service_snapshots,
+)
+
+# Configuration
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 9110
+DEFAULT_INTERVAL = 60  # Seconds a snapshot is served before being refreshed
+
+METRIC_PREFIX = "quorum"
+
+# Name, help and value of the per-service metrics
+SERVICE_METRICS = [
+    ("staking_state", "Staking state (0: unstaked, 1: staked, 2: evicted)",
+     lambda snapshot: snapshot.staking_state),
+    ("accrued_rewards_olas", "Accrued staking rewards in OLAS",
+     lambda snapshot: Decimal(snapshot.accrued_rewards) / Decimal(10**18)),
+    ("min_staking_deposit_olas", "Minimum staking deposit in OLAS",
+     lambda snapshot: Decimal(snapshot.min_staking_deposit) / Decimal(10**18)),
+    ("attestations_current_epoch", "Attestations (multisig nonce delta) in the current epoch",
+     lambda snapshot: snapshot.delta_attestations),
+    ("liveness_pass", "Whether the service passes the liveness ratio check",
+     lambda snapshot: None if snapshot.liveness_pass is None else int(snapshot.liveness_pass)),
+    ("safe_balance_eth", "ETH balance of the service Safe",
+     lambda snapshot: Decimal(snapshot.multisig_balance) / Decimal(10**18)),
+    ("agent_balance_eth", "ETH balance of the agent",
+     lambda snapshot: None if snapshot.agent_balance is None else Decimal(snapshot.agent_balance) / Decimal(10**18)),
+    ("block_number", "Block the values were read at",
+     lambda snapshot: snapshot.block_number),
+]
+
+
+def load_services() -> list[dict]:
+    """Services of the .operate directory that are deployed on-chain."""
+    services = [
+        entry
+        for entry in (get_service_entry(service_dir, config) for service_dir, config in load_all_service_configs())
+        if entry["service_id"] and int(entry["service_id"]) > 0 and entry["multisig"] and entry["rpc_url"]
+    ]
+    if not services:
+        print("Error: No deployed service found in .operate/services")
+        sys.exit(1)
+    return services
+
+
+class SnapshotCache:
+    """Snapshots of the services, refreshed at most once per interval.
+
+    Scrapes arriving while a refresh is running wait for it and share its result.
+    """
+
+    def __init__(self, services: list[dict], interval: float, timeout: float = FLEET_TIMEOUT):
+        self.services = services
+        self.interval = interval
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._web3: dict[str, Web3] = {}
+        self._snapshots: list[Optional[ServiceSnapshot]] = [None] * len(services)
+        self._refreshed_at = 0.0
+        self._refresh_duration = 0.0
+
+    def _get_web3(self, rpc_url: str) -> Web3:
+        if rpc_url not in self._web3:
+            self._web3[rpc_url] = Web3(Web3.HTTPProvider(rpc_url, request_kwargs={"timeout": self.timeout}))
+        return self._web3[rpc_url]
+
+    def _read_batch(self, rpc_url: str, services: list[dict]) -> list[Optional[ServiceSnapshot]]:
+        w3 = self._get_web3(rpc_url)
+        return read_service_snapshots(w3, services, w3.eth.block_number)
+
+    def _refresh(self):
+        rows, errors = read_fleet_snapshots(self.services, self._read_batch, self.timeout)
+        for error in errors:
+            print(f"Warning: Could not read {error}")
+        for service, (status, _) in zip(self.services, rows):
+            if status == "timeout":
+                print(f"Warning: Could not read {service['name']}: timed out")
+        return [snapshot for _, snapshot in rows]
+
+    def get(self) -> tuple[list[Optional[ServiceSnapshot]], float, float]:
+        """Snapshots of the services, with the time and duration of their refresh."""
+        with self._lock:
+            if time.time() - self._refreshed_at >= self.interval:
+                start = time.time()
+                self._snapshots = self._refresh()
+                self._refreshed_at = time.time()
+                self._refresh_duration = self._refreshed_at - start
+            return self._snapshots, self._refreshed_at, self._refresh_duration
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_metrics(services: list[dict], snapshots: list[Optional[ServiceSnapshot]], refreshed_at: float, refresh_duration: float) -> str:
+    """Metrics in the Prometheus text exposition format."""
+    labels = [
+        f'service="{_escape_label(service["name"])}",service_id="{service["service_id"]}"'
+        for service in services
+    ]
+
+    lines = [
+        f"# HELP {METRIC_PREFIX}_up Whether the last snapshot of the service could be read",
+        f"# TYPE {METRIC_PREFIX}_up gauge",
+    ]
+    lines += [f"{METRIC_PREFIX}_up{{{label}}} {int(snapshot is not None)}" for label, snapshot in zip(labels, snapshots)]
+
+    for name, help_text, get_value in SERVICE_METRICS:
+        lines += [f"# HELP {METRIC_PREFIX}_{name} {help_text}", f"# TYPE {METRIC_PREFIX}_{name} gauge"]
+        for label, snapshot in zip(labels, snapshots):
+            value = get_value(snapshot) if snapshot is not None else None
+            if value is not None:
+                lines.append(f"{METRIC_PREFIX}_{name}{{{label}}} {value}")
+
+    lines += [
+        f"# HELP {METRIC_PREFIX}_exporter_last_refresh_timestamp_seconds Time of the last snapshot refresh",
+        f"# TYPE {METRIC_PREFIX}_exporter_last_refresh_timestamp_seconds gauge",
+        f"{METRIC_PREFIX}_exporter_last_refresh_timestamp_seconds {refreshed_at:.3f}",
+        f"# HELP {METRIC_PREFIX}_exporter_refresh_duration_seconds Duration of the last snapshot refresh",
+        f"# TYPE {METRIC_PREFIX}_exporter_refresh_duration_seconds gauge",
+        f"{METRIC_PREFIX}_exporter_refresh_duration_seconds {refresh_duration:.3f}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def make_handler(cache: SnapshotCache):
+    """Request handler serving the metrics of the cache."""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+
+            body = render_metrics(cache.services, *cache.get()).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prometheus metrics endpoint for the staking state")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Address to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help=f"Seconds between snapshot refreshes (default: {DEFAULT_INTERVAL})")
+    parser.add_argument("--timeout", type=float, default=FLEET_TIMEOUT, help=f"Seconds to wait for each RPC request (default: {FLEET_TIMEOUT})")
+
+    args = parser.parse_args()
+
+    services = load_services()
+    cache = SnapshotCache(services, args.interval, args.timeout)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(cache))
+    print(f"Serving the metrics of {len(services)} services on http://{args.host}:{args.port}/metrics")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,10 +9,17 @@
 import os
 import json
 import sys
+import threading
+from argparse import ArgumentParser
+from concurrent.futures import Future, wait
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable, Optional
 from web3 import Web3
 from decimal import Decimal
 
+from scripts.multicall import Call, aggregate, block_timestamp_call, eth_balance_call
+
 # Configuration
 SCRIPT_PATH = Path(__file__).resolve().parent
 
@@ -21,6 +28,12 @@ ATTESTATION_TRACKER = "0x9BC8c713a159a028aC5590ffE42DaF0d9A6467AC"
 ACTIVITY_CHECKER = "0x747262cC12524C571e08faCb6E6994EF2E3B97ab"
 EAS_CONTRACT = "0xF095fE4b23958b08D38e52d5d5674bBF0C03cbF6"
 OLAS_TOKEN = "0x54330d28ca3357F294334BDC454a032e7f353416"
+DEFAULT_STAKING_CONTRACT = "0xeF662b5266db0AeFe55554c50cA6Ad25c1DA16fb"
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+# Fleet report
+FLEET_BATCH_SIZE = 20  # Services read in a single Multicall3 batch
+FLEET_TIMEOUT = 30  # Seconds before a row is reported as timed out
 
 # Staking ABIs (inline for simplicity)
 STAKING_ABI = [
@@ -424,6 +437,264 @@ def print_subheader(text: str):
     print("-" * 80)
 
 
+def load_all_service_configs() -> list[tuple[Path, dict]]:
+    """Load the configuration of every valid service in the .operate directory."""
+    operate_dir = SCRIPT_PATH / ".operate" / "services"
+    if not operate_dir.exists():
+        return []
+
+    services = []
+    for service_dir in sorted(operate_dir.iterdir()):
+        config_path = service_dir / "config.json"
+        if not service_dir.is_dir() or service_dir.name.startswith("invalid_") or not config_path.exists():
+            continue
+        with open(config_path) as f:
+            services.append((service_dir, json.load(f)))
+
+    return services
+
+
+def get_service_entry(service_dir: Path, config: dict) -> dict:
+    """Extract what is needed to read the staking data of a service from its configuration."""
+    chain_config = config.get("chain_configs", {}).get("base", {})
+    chain_data = chain_config.get("chain_data", {})
+    ledger_config = chain_config.get("ledger_config", {})
+
+    staking_contract_addr = chain_data.get("user_params", {}).get("staking_program_id")
+    if not staking_contract_addr or staking_contract_addr == "no_staking":
+        staking_contract_addr = DEFAULT_STAKING_CONTRACT
+
+    agent_addresses = get_agent_addresses(service_dir)
+    return {
+        "name": config.get("name") or service_dir.name,
+        "service_id": chain_data.get("token"),
+        "staking_contract": staking_contract_addr,
+        "multisig": chain_data.get("multisig"),
+        "agent_address": agent_addresses[0] if agent_addresses else None,
+        "rpc_url": os.getenv("BASE_LEDGER_RPC") or ledger_config.get("rpc"),
+    }
+
+
+@dataclass(frozen=True)
+class ServiceSnapshot:
+    """Staking data and balances of a service, read at a single block."""
+
+    block_number: int
+    block_timestamp: int
+    staking_state: int
+    service_info: tuple  # (multisig, owner, nonces, tsStart)
+    min_staking_deposit: int
+    accrued_rewards: int
+    current_nonces: list
+    liveness_pass: Optional[bool]
+    multisig_balance: int
+    agent_balance: Optional[int]
+
+    @property
+    def state_name(self) -> str:
+        """Name of the staking state."""
+        return STAKING_STATES.get(self.staking_state, f"Unknown ({self.staking_state})")
+
+    @property
+    def is_staked(self) -> bool:
+        """Whether the service is staked."""
+        return self.staking_state == 1
+
+    @property
+    def delta_attestations(self) -> int:
+        """Attestations in the current epoch (using multisig nonce at index 0)."""
+        nonces = self.service_info[2]
+        return self.current_nonces[0] - (nonces[0] if nonces else 0)
+
+
+# Calls made for each service in read_service_snapshots
+SNAPSHOT_CALLS_PER_SERVICE = 7
+
+
+def read_service_snapshots(
+    w3: Web3, services: list[dict], block_number: int, allow_failure: bool = True
+) -> list[Optional[ServiceSnapshot]]:
+    """Read the snapshots of services sharing an RPC at the given block.
+
+    All the reads are done in one Multicall3 batch, followed by a second batch for
+    isRatioPass, which needs the nonces from the first one. If `allow_failure` is
+    set, services whose reads failed get None, without failing the others.
+    Otherwise, the first failure is raised.
+    """
+    activity_checker = w3.eth.contract(address=ACTIVITY_CHECKER, abi=ACTIVITY_CHECKER_ABI)
+
+    calls = [block_timestamp_call(w3)]
+    for service in services:
+        staking = w3.eth.contract(address=service["staking_contract"], abi=STAKING_ABI)
+        service_id = int(service["service_id"])
+        calls += [
+            Call(staking, "getStakingState", (service_id,), allow_failure=allow_failure),
+            Call(staking, "getServiceInfo", (service_id,), allow_failure=allow_failure),
+            Call(staking, "minStakingDeposit", allow_failure=allow_failure),
+            Call(staking, "calculateStakingReward", (service_id,), allow_failure=allow_failure),
+            Call(activity_checker, "getMultisigNonces", (service["multisig"],), allow_failure=allow_failure),
+            eth_balance_call(w3, service["multisig"]),
+            eth_balance_call(w3, service["agent_address"] or ZERO_ADDRESS),
+        ]
+
+    block_timestamp, *results = aggregate(w3, calls, block_number)
+    rows = [
+        results[i:i + SNAPSHOT_CALLS_PER_SERVICE]
+        for i in range(0, len(results), SNAPSHOT_CALLS_PER_SERVICE)
+    ]
+
+    # Liveness check, which needs the nonces read above
+    ratio_calls = []
+    for _, service_info, _, _, current_nonces, _, _ in rows:
+        if service_info is not None and current_nonces is not None and service_info[2]:
+            time_elapsed = block_timestamp - service_info[3]
+            ratio_calls.append(
+                Call(activity_checker, "isRatioPass", (current_nonces, service_info[2], time_elapsed), allow_failure=allow_failure)
+            )
+    ratio_results = iter(aggregate(w3, ratio_calls, block_number))
+
+    snapshots: list[Optional[ServiceSnapshot]] = []
+    for service, row in zip(services, rows):
+        staking_state, service_info, min_staking_deposit, accrued_rewards, current_nonces, multisig_eth, agent_eth = row
+        liveness_pass = (
+            next(ratio_results)
+            if service_info is not None and current_nonces is not None and service_info[2]
+            else None
+        )
+        if None in (staking_state, service_info, min_staking_deposit, accrued_rewards, current_nonces):
+            snapshots.append(None)
+            continue
+
+        snapshots.append(
+            ServiceSnapshot(
+                block_number=block_number,
+                block_timestamp=block_timestamp,
+                staking_state=staking_state,
+                service_info=service_info,
+                min_staking_deposit=min_staking_deposit,
+                accrued_rewards=accrued_rewards,
+                current_nonces=current_nonces,
+                liveness_pass=liveness_pass,
+                multisig_balance=multisig_eth,
+                agent_balance=agent_eth if service["agent_address"] else None,
+            )
+        )
+
+    return snapshots
+
+
+def _read_fleet_batch(rpc_url: str, services: list[dict], timeout: float) -> list[Optional[ServiceSnapshot]]:
+    """Read a batch of services sharing an RPC, at the latest block of that RPC."""
+    w3 = Web3(Web3.HTTPProvider(rpc_url, request_kwargs={"timeout": timeout}))
+    return read_service_snapshots(w3, services, w3.eth.block_number)
+
+
+def _run_in_daemon_thread(function, *args) -> Future:
+    """Run a function in a daemon thread, which does not keep the interpreter alive if it hangs."""
+    future: Future = Future()
+
+    def run():
+        try:
+            future.set_result(function(*args))
+        except Exception as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+def read_fleet_snapshots(
+    services: list[dict],
+    read_batch: Callable[[str, list[dict]], list[Optional[ServiceSnapshot]]],
+    timeout: float = FLEET_TIMEOUT,
+) -> tuple[list[tuple[str, Optional[ServiceSnapshot]]], list[str]]:
+    """Read the snapshots of services with `read_batch(rpc_url, services)`, by batches sharing an RPC.
+
+    Every batch runs on its own, so that a slow RPC only delays its own services.
+    Returns the status ("ok", "error" or "timeout") and the snapshot of every service,
+    and the errors of the batches that failed.
+    """
+    batches: dict[str, list[list[int]]] = {}
+    for i, service in enumerate(services):
+        rpc_batches = batches.setdefault(service["rpc_url"], [[]])
+        if len(rpc_batches[-1]) == FLEET_BATCH_SIZE:
+            rpc_batches.append([])
+        rpc_batches[-1].append(i)
+
+    rows: list[tuple[str, Optional[ServiceSnapshot]]] = [("timeout", None)] * len(services)
+    errors = []
+    # The reads still running after the timeout are left to the exit of the interpreter
+    futures = {
+        _run_in_daemon_thread(read_batch, rpc_url, [services[i] for i in indexes]): indexes
+        for rpc_url, rpc_batches in batches.items()
+        for indexes in rpc_batches
+    }
+    done, _ = wait(futures, timeout=timeout)
+    for future in done:
+        indexes = futures[future]
+        try:
+            snapshots = future.result()
+        except Exception as e:
+            errors.append(f"{', '.join(services[i]['name'] for i in indexes)}: {e}")
+            for i in indexes:
+                rows[i] = ("error", None)
+            continue
+        for i, snapshot in zip(indexes, snapshots):
+            rows[i] = ("ok" if snapshot else "error", snapshot)
+    return rows, errors
+
+
+def fleet_report(timeout: float = FLEET_TIMEOUT):
+    """Print a compact staking report with a row for every service in the .operate directory."""
+    entries = [get_service_entry(service_dir, config) for service_dir, config in load_all_service_configs()]
+    if not entries:
+        print("Error: No valid service found in .operate/services")
+        sys.exit(1)
+
+    # Row status and snapshot, by entry index
+    rows: dict[int, tuple[str, Optional[ServiceSnapshot]]] = {}
+    deployed = []
+    for i, entry in enumerate(entries):
+        if entry["service_id"] and int(entry["service_id"]) > 0 and entry["multisig"] and entry["rpc_url"]:
+            deployed.append(i)
+        else:
+            rows[i] = ("not deployed", None)
+
+    print(f"Reading {len(entries)} services from {len({entries[i]['rpc_url'] for i in deployed})} RPC endpoints...")
+    deployed_rows, errors = read_fleet_snapshots(
+        [entries[i] for i in deployed],
+        lambda rpc_url, services: _read_fleet_batch(rpc_url, services, timeout),
+        timeout,
+    )
+    rows.update(zip(deployed, deployed_rows))
+
+    print_header("Fleet")
+    print(
+        f"{'Service':<24} {'ID':>5} {'State':<9} {'Rewards':>9} {'Txs':>5} "
+        f"{'Liveness':<8} {'Safe ETH':>9} {'Agent ETH':>9} {'Block':>10} Status"
+    )
+    print("-" * 110)
+    for i, entry in enumerate(entries):
+        status, snapshot = rows[i]
+        name = entry["name"][:24]
+        service_id = entry["service_id"] or "-"
+        if snapshot is None:
+            print(f"{name:<24} {service_id:>5} {'-':<9} {'-':>9} {'-':>5} {'-':<8} {'-':>9} {'-':>9} {'-':>10} {status}")
+            continue
+        liveness = "N/A" if snapshot.liveness_pass is None else ("PASS" if snapshot.liveness_pass else "FAIL")
+        agent_eth = "N/A" if snapshot.agent_balance is None else wei_to_eth(snapshot.agent_balance)
+        print(
+            f"{name:<24} {service_id:>5} {snapshot.state_name.upper():<9} "
+            f"{wei_to_olas(snapshot.accrued_rewards):>9} {snapshot.delta_attestations:>5} {liveness:<8} "
+            f"{wei_to_eth(snapshot.multisig_balance):>9} {agent_eth:>9} {snapshot.block_number:>10} {status}"
+        )
+
+    if errors:
+        print_subheader("Errors")
+        for error in errors:
+            print(error)
+
+
 def main():
     """Generate staking performance report."""
 
@@ -449,7 +720,7 @@ def main():
 
     # If staking is not enabled, use the default staking contract
     if not staking_contract_addr or staking_contract_addr == "no_staking":
-        staking_contract_addr = "0xeF662b5266db0AeFe55554c50cA6Ad25c1DA16fb"
+        staking_contract_addr = DEFAULT_STAKING_CONTRACT
 
     # Get agent addresses
     agent_addresses = get_agent_addresses(service_dir) if service_dir else []
@@ -476,51 +747,45 @@ def main():
 
     print(f"Connected to chain ID: {w3.eth.chain_id}")
 
-    # Initialize contracts
-    tracker = w3.eth.contract(address=ATTESTATION_TRACKER, abi=ATTESTATION_TRACKER_ABI)
-    activity_checker = w3.eth.contract(address=ACTIVITY_CHECKER, abi=ACTIVITY_CHECKER_ABI)
-    staking = w3.eth.contract(address=staking_contract_addr, abi=STAKING_ABI)
-    olas = w3.eth.contract(address=OLAS_TOKEN, abi=OLAS_ABI)
+    # Use multisig from env var if provided, otherwise from the service configuration
+    # (unless the service ID is overridden, as the configuration is for another service)
+    multisig = os.getenv("TEST_MULTISIG")
+    if not multisig and not os.getenv("TEST_SERVICE_ID"):
+        multisig = chain_data.get("multisig")
 
     # Get staking state first
     try:
-        staking_state = staking.functions.getStakingState(service_id).call()
-        state_name = STAKING_STATES.get(staking_state, f"Unknown ({staking_state})")
-        is_staked = staking_state == 1
-
-        # Get service info
-        service_info = staking.functions.getServiceInfo(service_id).call()
-        service_multisig = service_info[0]
-        service_owner = service_info[1]
-        nonces = service_info[2]
-        stake_start_time = service_info[3]
-
-        # Use multisig from env var if provided, otherwise from staking contract
-        multisig = os.getenv("TEST_MULTISIG") or service_multisig
-
-        # Get staking parameters
-        min_staking_deposit = staking.functions.minStakingDeposit().call()
-
-        # Get rewards
-        accrued_rewards = staking.functions.calculateStakingReward(service_id).call()
-
-        # Get current nonces from activity checker
-        current_nonces = activity_checker.functions.getMultisigNonces(multisig).call()
-
-        # Calculate attestations in current epoch (using multisig nonce at index 0)
-        delta_attestations = current_nonces[0] - nonces[0]
-
-        # Calculate liveness check using isRatioPass
-        current_time = w3.eth.get_block('latest')['timestamp']
-        time_elapsed = current_time - stake_start_time
-        liveness_pass = activity_checker.functions.isRatioPass(current_nonces, nonces, time_elapsed).call()
-
-        # Get balances
-        multisig_eth = w3.eth.get_balance(multisig)
-
-        # Get agent info
-        agent_addresses = get_agent_addresses(service_dir) if service_dir else []
-        agent_eth = w3.eth.get_balance(agent_addresses[0]) if agent_addresses else 0
+        # Pin every read to the same block, so that the report is consistent
+        block_number = w3.eth.block_number
+        print(f"Reading state at block {block_number}")
+
+        if not multisig:
+            # Fall back to the multisig registered in the staking contract
+            staking = w3.eth.contract(address=staking_contract_addr, abi=STAKING_ABI)
+            multisig = staking.functions.getServiceInfo(service_id).call(block_identifier=block_number)[0]
+
+        (snapshot,) = read_service_snapshots(
+            w3,
+            [
+                {
+                    "service_id": service_id,
+                    "staking_contract": staking_contract_addr,
+                    "multisig": multisig,
+                    "agent_address": agent_addresses[0] if agent_addresses else None,
+                }
+            ],
+            block_number,
+            allow_failure=False,
+        )
+
+        state_name = snapshot.state_name
+        is_staked = snapshot.is_staked
+        min_staking_deposit = snapshot.min_staking_deposit
+        accrued_rewards = snapshot.accrued_rewards
+        delta_attestations = snapshot.delta_attestations
+        liveness_pass = snapshot.liveness_pass
+        multisig_eth = snapshot.multisig_balance
+        agent_eth = snapshot.agent_balance or 0
 
         # Print simple report
         print_header("Staking")
@@ -531,7 +796,7 @@ def main():
         print(f"{'Staked (agent bond)':<30} {wei_to_olas(min_staking_deposit)} OLAS")
         print(f"{'Accrued rewards':<30} {wei_to_olas(accrued_rewards)} OLAS")
         print(f"{'Num. txs current epoch':<30} {delta_attestations}")
-        print(f"{'Liveness check':<30} {'PASS' if liveness_pass else 'FAIL'}")
+        print(f"{'Liveness check':<30} {'N/A' if liveness_pass is None else ('PASS' if liveness_pass else 'FAIL')}")
 
         if not is_staked:
             return
@@ -559,5 +824,26 @@ def main():
         sys.exit(1)
 
 
+def parse_args():
+    """Parse the script arguments."""
+    parser = ArgumentParser(description="Generate a staking performance report for the Quorum voting agent.")
+    parser.add_argument(
+        "--fleet",
+        action="store_true",
+        help="Report every service in .operate/services, with a row per service.",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=FLEET_TIMEOUT,
+        help=f"Seconds to wait for each RPC endpoint in fleet mode (default: {FLEET_TIMEOUT}).",
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.fleet:
+        fleet_report(args.timeout)
+    else:
+        main()
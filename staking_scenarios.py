@@ -0,0 +1,187 @@
+#!/usr/bin/env -S uv run --quiet --script
+# /// script
+# dependencies = [
+#   "web3>=6.0.0",
+# ]
+# ///
+"""
+Matrix of staking scenarios on a single Anvil deployment.
+
+An evm_snapshot is taken once, after the service is deployed and staked. Every
+case then creates a number of attestations spread over a time advance, calls the
+staking checkpoint, records the liveness and reward outcome, and reverts to the
+snapshot. Dozens of cases run in about the time of one deployment.
+
+Requires Anvil started with --auto-impersonate, so that attestations can be sent
+from the service multisig.
+
+Usage:
+  # Default matrix: 0, 1, 2 and 4 attestations over 24, 48 and 72 hours
+  ./staking_scenarios.py
+
+  # Custom matrix, saved as JSON
+  ./staking_scenarios.py --attestations 0,1,3 --hours 12,24 --output scenarios.json
+"""
+
+import sys
+import json
+import time
+import argparse
+from dataclasses import asdict, dataclass
+from typing import Optional
+from eth_account import Account
+from web3 import Web3
+
+from liveness_forecast import read_forecasts
+from scripts.attestations import create_attestation, load_private_key
+from staking_report import ATTESTATION_TRACKER, ATTESTATION_TRACKER_ABI, STAKING_ABI, STAKING_STATES, wei_to_olas
+from staking_soak import call_checkpoint
+from staking_timeline import load_service
+
+DEFAULT_ATTESTATIONS = "0,1,2,4"
+DEFAULT_HOURS = "24,48,72"
+
+
+@dataclass(frozen=True)
+class CaseResult:
+    """Outcome of a scenario case."""
+
+    attestations: int
+    hours: int
+    created: int
+    passes_liveness: Optional[bool]
+    checkpoint_called: bool
+    staking_state: Optional[int]
+    reward_wei: Optional[int]
+    error: Optional[str] = None
+
+
+def evm_snapshot(w3: Web3) -> str:
+    """Snapshot the chain state."""
+    return w3.provider.make_request("evm_snapshot", [])["result"]
+
+
+def evm_revert(w3: Web3, snapshot_id: str):
+    """Revert the chain state to a snapshot."""
+    if not w3.provider.make_request("evm_revert", [snapshot_id]).get("result"):
+        raise RuntimeError(f"Could not revert to snapshot {snapshot_id}")
+
+
+def _advance(w3: Web3, seconds: int):
+    if seconds > 0:
+        w3.provider.make_request("evm_increaseTime", [seconds])
+        w3.provider.make_request("evm_mine", [])
+
+
+def run_case(w3: Web3, service: dict, account, tracker, attestations: int, hours: int) -> CaseResult:
+    """Spread the attestations evenly over the time advance, then call the checkpoint."""
+    staking = w3.eth.contract(address=service["staking_contract"], abi=STAKING_ABI)
+    service_id = service["service_id"]
+    reward_before = staking.functions.calculateStakingReward(service_id).call()
+
+    step = hours * 3600 // (attestations + 1)
+    created = 0
+    for i in range(attestations):
+        _advance(w3, step)
+        created += bool(create_attestation(w3, account, tracker, i, service["multisig"]))
+    _advance(w3, hours * 3600 - step * attestations)
+
+    (forecast,) = read_forecasts(w3, [service])
+    checkpoint_called = call_checkpoint(w3, service["staking_contract"])
+    return CaseResult(
+        attestations=attestations,
+        hours=hours,
+        created=created,
+        passes_liveness=forecast.passes_now if forecast else None,
+        checkpoint_called=checkpoint_called,
+        staking_state=staking.functions.getStakingState(service_id).call(),
+        reward_wei=staking.functions.calculateStakingReward(service_id).call() - reward_before,
+    )
+
+
+def run_matrix(w3: Web3, service: dict, attestation_counts: list[int], hours_list: list[int]) -> list[CaseResult]:
+    """Run every case of the matrix from the same snapshot."""
+    account = Account.from_key(load_private_key())
+    tracker = w3.eth.contract(address=ATTESTATION_TRACKER, abi=ATTESTATION_TRACKER_ABI)
+
+    results = []
+    snapshot_id = evm_snapshot(w3)
+    for attestations in attestation_counts:
+        for hours in hours_list:
+            print(f"▶️  {attestations} attestation(s) over {hours}h")
+            try:
+                results.append(run_case(w3, service, account, tracker, attestations, hours))
+            except Exception as e:
+                results.append(CaseResult(attestations, hours, 0, None, False, None, None, error=str(e)))
+            # Anvil drops the snapshot on revert, so take it again for the next case
+            evm_revert(w3, snapshot_id)
+            snapshot_id = evm_snapshot(w3)
+
+    return results
+
+
+def _format_cell(result: CaseResult) -> str:
+    if result.error:
+        return "ERROR"
+    liveness = "N/A" if result.passes_liveness is None else ("PASS" if result.passes_liveness else "FAIL")
+    if result.staking_state != 1:
+        return f"{liveness} {STAKING_STATES.get(result.staking_state, '?').upper()}"
+    return f"{liveness} {wei_to_olas(result.reward_wei)}"
+
+
+def print_grid(results: list[CaseResult], attestation_counts: list[int], hours_list: list[int]):
+    """Print the liveness and reward of every case, with a row per attestation count."""
+    cells = {(result.attestations, result.hours): _format_cell(result) for result in results}
+
+    width = 18
+    print("\n" + "=" * (14 + width * len(hours_list)))
+    print("🧮 STAKING SCENARIOS (liveness and reward in OLAS)")
+    print("=" * (14 + width * len(hours_list)))
+    print(f"{'Attestations':<14}" + "".join(f"{f'{hours}h':<{width}}" for hours in hours_list))
+    print("-" * (14 + width * len(hours_list)))
+    for attestations in attestation_counts:
+        print(f"{attestations:<14}" + "".join(f"{cells[(attestations, hours)]:<{width}}" for hours in hours_list))
+    print("-" * (14 + width * len(hours_list)))
+
+    for result in results:
+        if result.error:
+            print(f"{result.attestations} attestation(s) over {result.hours}h: {result.error}")
+
+
+def _parse_list(value: str) -> list[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Matrix of staking scenarios on a single Anvil deployment")
+    parser.add_argument("--attestations", default=DEFAULT_ATTESTATIONS, help=f"Comma-separated attestation counts (default: {DEFAULT_ATTESTATIONS})")
+    parser.add_argument("--hours", default=DEFAULT_HOURS, help=f"Comma-separated time advances in hours (default: {DEFAULT_HOURS})")
+    parser.add_argument("--output", help="Save the results as JSON")
+
+    args = parser.parse_args()
+
+    service = load_service()
+    w3 = Web3(Web3.HTTPProvider(service["rpc_url"]))
+    if not w3.is_connected():
+        print(f"Error: Could not connect to {service['rpc_url']}")
+        sys.exit(1)
+    if "anvil" not in w3.client_version.lower():
+        print("Error: The scenarios revert the chain state, so they must run against Anvil")
+        sys.exit(1)
+
+    attestation_counts = _parse_list(args.attestations)
+    hours_list = _parse_list(args.hours)
+
+    start = time.perf_counter()
+    results = run_matrix(w3, service, attestation_counts, hours_list)
+    print_grid(results, attestation_counts, hours_list)
+    print(f"\n⏱️  Ran {len(results)} cases in {time.perf_counter() - start:.1f}s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump([asdict(result) for result in results], f, indent=2)
+        print(f"✅ Saved the results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env -S uv run --quiet --script
+# /// script
+# dependencies = [
+#   "web3>=6.0.0",
+# ]
+# ///
+"""
+Accelerated staking soak test on a local Anvil fork.
+
+Runs a whole staking scenario without manual steps: attestations are created on a
+fixed cadence, time is advanced with evm_increaseTime, the staking checkpoint is
+called at the end of every epoch and recorded as in test_staking_checkpoints.py.
+A multi-day scenario runs in seconds.
+
+Requires Anvil started with --auto-impersonate, so that attestations can be sent
+from the service multisig.
+
+Usage:
+  # 1 attestation every 8 hours, for 3 epochs
+  ./staking_soak.py
+
+  # 3 attestations every 12 hours for 5 epochs, starting a new checkpoint log
+  ./staking_soak.py --attestations 3 --every 12 --epochs 5 --reset
+"""
+
+import sys
+import time
+import argparse
+from dataclasses import dataclass
+from eth_account import Account
+from web3 import Web3
+
+from scripts.attestations import create_attestation, load_private_key
+from staking_report import ATTESTATION_TRACKER, ATTESTATION_TRACKER_ABI, STAKING_ABI
+from staking_timeline import load_service
+from test_staking_checkpoints import (
+    CHECKPOINT_INDEX,
+    CHECKPOINT_LOG,
+    LEGACY_CHECKPOINT_FILE,
+    advance_time,
+    load_checkpoints,
+    print_report,
+    record_service_checkpoint,
+)
+
+STAKING_CHECKPOINT_ABI = [
+    {
+        "inputs": [],
+        "name": "checkpoint",
+        "outputs": [],
+        "stateMutability": "nonpayable",
+        "type": "function"
+    },
+]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """N attestations every M hours, for a number of epochs."""
+
+    attestations: int
+    every_hours: int
+    epochs: int
+    epoch_hours: int
+
+    def __str__(self) -> str:
+        return (f"{self.attestations} attestation(s) every {self.every_hours}h "
+                f"for {self.epochs} epoch(s) of {self.epoch_hours}h")
+
+
+def call_checkpoint(w3: Web3, staking_contract: str) -> bool:
+    """Call the checkpoint of the staking contract from an Anvil account."""
+    staking = w3.eth.contract(address=staking_contract, abi=STAKING_CHECKPOINT_ABI)
+    try:
+        tx_hash = staking.functions.checkpoint().transact({"from": w3.eth.accounts[0]})
+        receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=30)
+    except Exception as e:
+        print(f"⚠️  Checkpoint call failed: {e}")
+        return False
+    return receipt["status"] == 1
+
+
+def run_scenario(w3: Web3, service: dict, scenario: Scenario):
+    """Run the scenario, recording a checkpoint at the start and after every epoch."""
+    account = Account.from_key(load_private_key())
+    tracker = w3.eth.contract(address=ATTESTATION_TRACKER, abi=ATTESTATION_TRACKER_ABI)
+
+    checkpoint_data = load_checkpoints()
+    record_service_checkpoint(w3, service, checkpoint_data)
+
+    attestation_num = 0
+    failed = 0
+    for epoch in range(scenario.epochs):
+        print(f"\n▶️  Epoch {epoch + 1}/{scenario.epochs}")
+        elapsed = 0
+        while elapsed < scenario.epoch_hours:
+            for _ in range(scenario.attestations):
+                if not create_attestation(w3, account, tracker, attestation_num, service["multisig"]):
+                    failed += 1
+                attestation_num += 1
+            step = min(scenario.every_hours, scenario.epoch_hours - elapsed)
+            advance_time(w3, step)
+            elapsed += step
+
+        if call_checkpoint(w3, service["staking_contract"]):
+            print("✅ Staking checkpoint called")
+        record_service_checkpoint(w3, service, checkpoint_data)
+
+    print(f"\nCreated {attestation_num - failed} attestations ({failed} failed)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accelerated staking soak test on Anvil")
+    parser.add_argument("--attestations", type=int, default=1, help="Attestations created at every step (default: 1)")
+    parser.add_argument("--every", type=int, default=8, metavar="HOURS", help="Hours between attestation steps (default: 8)")
+    parser.add_argument("--epochs", type=int, default=3, help="Number of epochs to run (default: 3)")
+    parser.add_argument("--epoch-hours", type=int, help="Hours per epoch (default: the liveness period of the staking contract)")
+    parser.add_argument("--reset", action="store_true", help="Start a new checkpoint log")
+
+    args = parser.parse_args()
+
+    # Same overrides and no_staking fallback as staking_report.py
+    service = load_service()
+    w3 = Web3(Web3.HTTPProvider(service["rpc_url"]))
+    if not w3.is_connected():
+        print(f"Error: Could not connect to {service['rpc_url']}")
+        sys.exit(1)
+    if "anvil" not in w3.client_version.lower():
+        print("Error: The soak test advances time, so it must run against Anvil")
+        sys.exit(1)
+
+    epoch_hours = args.epoch_hours
+    if epoch_hours is None:
+        staking = w3.eth.contract(address=service["staking_contract"], abi=STAKING_ABI)
+        epoch_hours = -(-staking.functions.livenessPeriod().call() // 3600)
+
+    if args.reset:
+        for path in (CHECKPOINT_LOG, CHECKPOINT_INDEX, LEGACY_CHECKPOINT_FILE):
+            path.unlink(missing_ok=True)
+
+    scenario = Scenario(args.attestations, args.every, args.epochs, epoch_hours)
+    print(f"🧪 Scenario: {scenario}")
+
+    start = time.perf_counter()
+    run_scenario(w3, service, scenario)
+    print_report(load_checkpoints())
+    print(f"\n⏱️  Simulated {scenario.epochs * scenario.epoch_hours}h in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+#!/usr/bin/env -S uv run --quiet --script
+# /// script
+# dependencies = [
+#   "web3>=6.0.0",
+# ]
+# ///
+"""
+Historical staking timeline of the Quorum voting agent, read from archive state.
+
+The staking state, service info, accrued rewards and attestation count are sampled
+at past blocks with one batched eth_call per block. Samples are stored in
+staking_timeline.jsonl, so later runs only fetch the blocks that are missing.
+Sampling past blocks requires an archive RPC.
+
+Usage:
+  # Sample every hour (1800 blocks) over the last 3 days
+  ./staking_timeline.py
+
+  # Sample every 600 blocks over the last 7 days
+  ./staking_timeline.py --step 600 --days 7
+
+  # Sample at every staking checkpoint
+  ./staking_timeline.py --checkpoints
+
+  # Print the stored timeline
+  ./staking_timeline.py --show
+"""
+
+import os
+import json
+import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from web3 import Web3
+
+from scripts.multicall import Call, aggregate, block_timestamp_call
+from staking_report import (
+    ATTESTATION_TRACKER,
+    ATTESTATION_TRACKER_ABI,
+    STAKING_ABI,
+    STAKING_STATES,
+    get_service_entry,
+    load_all_service_configs,
+    wei_to_olas,
+)
+
+# Configuration
+SCRIPT_PATH = Path(__file__).resolve().parent
+TIMELINE_FILE = SCRIPT_PATH / "staking_timeline.jsonl"
+
+BLOCKS_PER_HOUR = 1800  # Base produces a block every 2 seconds
+DEFAULT_DAYS = 3
+DEFAULT_WORKERS = 8
+LOG_CHUNK_SIZE = 10_000
+
+# Checkpoint(uint256 indexed epoch, uint256 availableRewards, uint256[] serviceIds, uint256[] rewards, uint256 epochLength)
+CHECKPOINT_TOPIC = Web3.to_hex(Web3.keccak(text="Checkpoint(uint256,uint256,uint256[],uint256[],uint256)"))
+
+
+def load_service() -> dict:
+    """Load the service to sample, allowing the same overrides as staking_report.py."""
+    services = load_all_service_configs()
+    if not services:
+        print("Error: No valid service found in .operate/services")
+        sys.exit(1)
+
+    if len(services) > 1:
+        print(f"Warning: Multiple services found. Using {services[0][0].name}")
+
+    service = get_service_entry(*services[0])
+    service["service_id"] = int(os.getenv("TEST_SERVICE_ID") or service["service_id"] or 0)
+    service["staking_contract"] = os.getenv("STAKING_CONTRACT_ADDRESS") or service["staking_contract"]
+    service["multisig"] = os.getenv("TEST_MULTISIG") or service["multisig"]
+
+    if not service["rpc_url"]:
+        print("Error: No RPC URL found (set BASE_LEDGER_RPC)")
+        sys.exit(1)
+
+    if not (service["service_id"] > 0 and service["multisig"]):
+        print("Error: The service has not been deployed on-chain yet")
+        sys.exit(1)
+
+    return service
+
+
+def load_timeline() -> list[dict]:
+    """Load the stored samples."""
+    if not TIMELINE_FILE.exists():
+        return []
+
+    samples = []
+    with open(TIMELINE_FILE) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                samples.append(json.loads(line))
+    return samples
+
+
+def _sample_key(service: dict, block: int) -> tuple:
+    return (service["service_id"], service["staking_contract"].lower(), block)
+
+
+def get_grid_blocks(from_block: int, to_block: int, step: int) -> list[int]:
+    """Evenly spaced blocks, aligned to multiples of the step so that later runs reuse the samples."""
+    first = -(-from_block // step) * step
+    return list(range(first, to_block + 1, step))
+
+
+def get_checkpoint_blocks(w3: Web3, staking_address: str, from_block: int, to_block: int) -> list[int]:
+    """Blocks of the Checkpoint events of the staking contract.
+
+    The range is scanned in chunks, halving the chunk when the RPC rejects it.
+    """
+    blocks = set()
+    chunk_size = LOG_CHUNK_SIZE
+    start = from_block
+    while start <= to_block:
+        end = min(start + chunk_size - 1, to_block)
+        try:
+            logs = w3.eth.get_logs({
+                "address": staking_address,
+                "topics": [CHECKPOINT_TOPIC],
+                "fromBlock": start,
+                "toBlock": end,
+            })
+        except Exception:
+            if chunk_size == 1:
+                raise
+            chunk_size //= 2
+            continue
+
+        blocks.update(log["blockNumber"] for log in logs)
+        start = end + 1
+
+    return sorted(blocks)
+
+
+def read_sample(w3: Web3, service: dict, block: int) -> dict:
+    """Read the staking data of the service at the given block, in a single eth_call."""
+    staking = w3.eth.contract(address=service["staking_contract"], abi=STAKING_ABI)
+    tracker = w3.eth.contract(address=ATTESTATION_TRACKER, abi=ATTESTATION_TRACKER_ABI)
+    service_id = service["service_id"]
+
+    # The contracts may not be deployed yet at old blocks, so every read may fail
+    timestamp, staking_state, service_info, accrued_rewards, num_attestations = aggregate(
+        w3,
+        [
+            block_timestamp_call(w3),
+            Call(staking, "getStakingState", (service_id,), allow_failure=True),
+            Call(staking, "getServiceInfo", (service_id,), allow_failure=True),
+            Call(staking, "calculateStakingReward", (service_id,), allow_failure=True),
+            Call(tracker, "getNumAttestations", (service["multisig"],), allow_failure=True),
+        ],
+        block,
+    )
+
+    return {
+        "service_id": service_id,
+        "staking_contract": service["staking_contract"],
+        "multisig": service["multisig"],
+        "block": block,
+        "timestamp": timestamp,
+        "staking_state": staking_state,
+        "nonces": service_info[2] if service_info else None,
+        "ts_start": service_info[3] if service_info else None,
+        "accrued_rewards": accrued_rewards,
+        "num_attestations": num_attestations,
+    }
+
+
+def fetch_samples(w3: Web3, service: dict, blocks: list[int], workers: int) -> int:
+    """Fetch the samples that are not stored yet, appending them to the timeline file."""
+    stored = {_sample_key(service, sample["block"]) for sample in load_timeline()}
+    missing = [block for block in blocks if _sample_key(service, block) not in stored]
+    print(f"{len(blocks)} sample blocks, {len(blocks) - len(missing)} already stored, fetching {len(missing)}")
+    if not missing:
+        return 0
+
+    failures = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor, open(TIMELINE_FILE, "a") as f:
+        futures = {executor.submit(read_sample, w3, service, block): block for block in missing}
+        for future in as_completed(futures):
+            try:
+                sample = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"Warning: Could not read block {futures[future]}: {e}")
+                continue
+            f.write(json.dumps(sample) + "\n")
+            f.flush()
+
+    if failures:
+        print(f"Warning: {failures} samples failed. Reading past blocks requires an archive RPC.")
+    return len(missing) - failures
+
+
+def print_timeline(service: dict):
+    """Print the stored samples of the service."""
+    samples = sorted(
+        (
+            sample for sample in load_timeline()
+            if sample["service_id"] == service["service_id"]
+            and sample["staking_contract"].lower() == service["staking_contract"].lower()
+        ),
+        key=lambda sample: sample["block"],
+    )
+    if not samples:
+        print("No samples stored yet")
+        return
+
+    print("\n" + "=" * 80)
+    print(f"📈 STAKING TIMELINE - service {service['service_id']}")
+    print("=" * 80)
+    print(f"{'Block':<12} {'Time':<20} {'State':<10} {'Nonce':<8} {'Attest.':<9} {'New':<6} {'Rewards (OLAS)':<15}")
+    print("-" * 80)
+
+    previous_attestations = None
+    for sample in samples:
+        state = STAKING_STATES.get(sample["staking_state"], "-")
+        nonce = sample["nonces"][0] if sample["nonces"] else "-"
+        attestations = sample["num_attestations"]
+        new = (
+            attestations - previous_attestations
+            if attestations is not None and previous_attestations is not None
+            else "-"
+        )
+        rewards = wei_to_olas(sample["accrued_rewards"]) if sample["accrued_rewards"] is not None else "-"
+        print(f"{sample['block']:<12} "
+              f"{datetime.fromtimestamp(sample['timestamp']).strftime('%Y-%m-%d %H:%M:%S'):<20} "
+              f"{state:<10} "
+              f"{nonce:<8} "
+              f"{attestations if attestations is not None else '-':<9} "
+              f"{new:<6} "
+              f"{rewards:<15}")
+        if attestations is not None:
+            previous_attestations = attestations
+
+    print("-" * 80)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Historical staking timeline from archive reads")
+    parser.add_argument("--step", type=int, default=BLOCKS_PER_HOUR, help=f"Blocks between samples (default: {BLOCKS_PER_HOUR})")
+    parser.add_argument("--days", type=float, default=DEFAULT_DAYS, help=f"Days to look back (default: {DEFAULT_DAYS})")
+    parser.add_argument("--from-block", type=int, help="First block to sample (overrides --days)")
+    parser.add_argument("--to-block", type=int, help="Last block to sample (default: latest)")
+    parser.add_argument("--checkpoints", action="store_true", help="Sample at every staking checkpoint instead")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"Parallel requests (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--show", action="store_true", help="Only print the stored timeline")
+
+    args = parser.parse_args()
+
+    service = load_service()
+    if args.show:
+        print_timeline(service)
+        return
+
+    w3 = Web3(Web3.HTTPProvider(service["rpc_url"]))
+    if not w3.is_connected():
+        print(f"Error: Could not connect to {service['rpc_url']}")
+        sys.exit(1)
+
+    to_block = args.to_block if args.to_block is not None else w3.eth.block_number
+    from_block = args.from_block if args.from_block is not None else max(0, to_block - int(args.days * 24 * BLOCKS_PER_HOUR))
+
+    if args.checkpoints:
+        print(f"Scanning checkpoints between blocks {from_block} and {to_block}...")
+        blocks = get_checkpoint_blocks(w3, service["staking_contract"], from_block, to_block)
+    else:
+        blocks = get_grid_blocks(from_block, to_block, args.step)
+
+    fetched = fetch_samples(w3, service, blocks, args.workers)
+    print(f"✅ Stored {fetched} new samples in {TIMELINE_FILE.name}")
+    print_timeline(service)
+
+
+if __name__ == "__main__":
+    main()
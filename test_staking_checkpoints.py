@@ -19,20 +19,45 @@ Usage:
 
   # Final report
   ./test_staking_checkpoints.py --report
+
+  # Export the checkpoints for analysis
+  ./test_staking_checkpoints.py --export csv
 """
 
 import os
+import csv
 import json
 import sys
+from collections import deque
 from pathlib import Path
 from web3 import Web3
 from decimal import Decimal
 from datetime import datetime, timedelta
 import argparse
 
+from liveness_forecast import is_ratio_pass, read_liveness_ratio
+
 # Configuration
 SCRIPT_PATH = Path(__file__).resolve().parent
-CHECKPOINT_FILE = SCRIPT_PATH / "staking_checkpoints.json"
+CHECKPOINT_LOG = SCRIPT_PATH / "staking_checkpoints.jsonl"
+CHECKPOINT_INDEX = SCRIPT_PATH / "staking_checkpoints_index.json"
+LEGACY_CHECKPOINT_FILE = SCRIPT_PATH / "staking_checkpoints.json"
+
+# Fields of every row in the checkpoint log, in order
+CHECKPOINT_FIELDS = (
+    "checkpoint_num",
+    "timestamp",
+    "datetime",
+    "hours_elapsed",
+    "staking_state",
+    "attestations_total",
+    "attestations_since_stake",
+    "attestations_since_baseline",
+    "accrued_rewards_olas",
+    "accrued_rewards_wei",
+    "liveness_ratio",
+    "passes_liveness",
+)
 
 # Contract addresses
 ATTESTATION_TRACKER = "0x9BC8c713a159a028aC5590ffE42DaF0d9A6467AC"
@@ -117,18 +142,65 @@ def load_service_config() -> dict:
         return json.load(f)
 
 
+def _new_index() -> dict:
+    return {"count": 0, "baseline_attestations": None, "first": None, "last": None}
+
+
+def save_index(index: dict):
+    """Atomically save the checkpoint index."""
+    tmp_file = CHECKPOINT_INDEX.with_suffix(".tmp")
+    with open(tmp_file, "w") as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp_file, CHECKPOINT_INDEX)
+
+
+def append_checkpoint(index: dict, checkpoint: dict):
+    """Append a checkpoint to the log and update the index."""
+    with open(CHECKPOINT_LOG, "a") as f:
+        f.write(json.dumps({field: checkpoint[field] for field in CHECKPOINT_FIELDS}) + "\n")
+
+    index["count"] += 1
+    if index["first"] is None:
+        index["first"] = checkpoint
+    index["last"] = checkpoint
+    save_index(index)
+
+
+def migrate_legacy_checkpoints() -> dict:
+    """Move the checkpoints of the legacy JSON file to the log, once."""
+    with open(LEGACY_CHECKPOINT_FILE) as f:
+        legacy = json.load(f)
+
+    CHECKPOINT_LOG.unlink(missing_ok=True)
+    index = _new_index()
+    index["baseline_attestations"] = legacy.get("baseline_attestations")
+    for checkpoint in legacy.get("checkpoints", []):
+        append_checkpoint(index, checkpoint)
+
+    LEGACY_CHECKPOINT_FILE.rename(LEGACY_CHECKPOINT_FILE.with_suffix(".json.migrated"))
+    print(f"📦 Migrated {index['count']} checkpoints from {LEGACY_CHECKPOINT_FILE.name} to {CHECKPOINT_LOG.name}")
+    return index
+
+
 def load_checkpoints() -> dict:
-    """Load checkpoint data from file."""
-    if CHECKPOINT_FILE.exists():
-        with open(CHECKPOINT_FILE) as f:
+    """Load the checkpoint index, without the checkpoints themselves."""
+    if LEGACY_CHECKPOINT_FILE.exists() and not CHECKPOINT_INDEX.exists():
+        return migrate_legacy_checkpoints()
+    if CHECKPOINT_INDEX.exists():
+        with open(CHECKPOINT_INDEX) as f:
             return json.load(f)
-    return {"checkpoints": [], "baseline_attestations": None}
+    return _new_index()
 
 
-def save_checkpoints(data: dict):
-    """Save checkpoint data to file."""
-    with open(CHECKPOINT_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+def iter_checkpoints():
+    """Stream the checkpoints from the log."""
+    if not CHECKPOINT_LOG.exists():
+        return
+    with open(CHECKPOINT_LOG) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
 
 
 def advance_time(w3: Web3, hours: int):
@@ -144,14 +216,26 @@ def advance_time(w3: Web3, hours: int):
     print(f"⏰ Advanced time by {hours} hours ({seconds} seconds)")
 
 
+def get_config_service(config: dict) -> dict:
+    """Service ID, multisig and staking contract of a service configuration."""
+    chain_data = config.get("chain_configs", {}).get("base", {}).get("chain_data", {})
+    return {
+        "service_id": chain_data.get("token"),
+        "multisig": chain_data.get("multisig"),
+        "staking_contract": chain_data.get("user_params", {}).get("staking_program_id"),
+    }
+
+
 def get_current_state(w3: Web3, config: dict) -> dict:
     """Get current staking state."""
-    chain_config = config.get("chain_configs", {}).get("base", {})
-    chain_data = chain_config.get("chain_data", {})
-    
-    service_id = chain_data.get("token")
-    multisig = chain_data.get("multisig")
-    staking_contract_addr = chain_data.get("user_params", {}).get("staking_program_id")
+    return get_service_state(w3, get_config_service(config))
+
+
+def get_service_state(w3: Web3, service: dict) -> dict:
+    """Get the current staking state of a service entry, as returned by get_config_service."""
+    service_id = service["service_id"]
+    multisig = service["multisig"]
+    staking_contract_addr = service["staking_contract"]
     
     # Initialize contracts
     tracker = w3.eth.contract(address=ATTESTATION_TRACKER, abi=ATTESTATION_TRACKER_ABI)
@@ -175,9 +259,8 @@ def get_current_state(w3: Web3, config: dict) -> dict:
     
     # Calculate liveness
     delta_attestations = current_attestations - baseline_attestations
-    threshold = 11574074074074
     liveness_ratio = (delta_attestations * 10**18) // time_elapsed if time_elapsed > 0 else 0
-    passes_liveness = liveness_ratio >= threshold
+    passes_liveness = is_ratio_pass(delta_attestations, time_elapsed, read_liveness_ratio(w3))
     
     return {
         "timestamp": current_time,
@@ -197,7 +280,12 @@ def get_current_state(w3: Web3, config: dict) -> dict:
 
 def record_checkpoint(w3: Web3, config: dict, checkpoint_data: dict):
     """Record a checkpoint."""
-    state = get_current_state(w3, config)
+    record_service_checkpoint(w3, get_config_service(config), checkpoint_data)
+
+
+def record_service_checkpoint(w3: Web3, service: dict, checkpoint_data: dict):
+    """Record a checkpoint of a service entry, as returned by get_config_service."""
+    state = get_service_state(w3, service)
     
     # If this is the first checkpoint and we loaded from Anvil state,
     # we need to account for existing attestations
@@ -206,7 +294,7 @@ def record_checkpoint(w3: Web3, config: dict, checkpoint_data: dict):
         print(f"📍 Initial state baseline: {state['current_attestations']} attestations from Anvil state file")
     
     checkpoint = {
-        "checkpoint_num": len(checkpoint_data["checkpoints"]),
+        "checkpoint_num": checkpoint_data["count"],
         "timestamp": state["timestamp"],
         "datetime": datetime.fromtimestamp(state["timestamp"]).isoformat(),
         "hours_elapsed": state["time_elapsed_hours"],
@@ -220,8 +308,7 @@ def record_checkpoint(w3: Web3, config: dict, checkpoint_data: dict):
         "passes_liveness": state["passes_liveness"],
     }
     
-    checkpoint_data["checkpoints"].append(checkpoint)
-    save_checkpoints(checkpoint_data)
+    append_checkpoint(checkpoint_data, checkpoint)
     
     # Print checkpoint
     print("\n" + "="*60)
@@ -239,9 +326,9 @@ def record_checkpoint(w3: Web3, config: dict, checkpoint_data: dict):
     print("="*60)
 
 
-def print_report(checkpoint_data: dict):
-    """Print final report."""
-    if not checkpoint_data["checkpoints"]:
+def print_report(checkpoint_data: dict, last_n: int = 0):
+    """Print final report, streaming the checkpoints from the log (only the last N if set)."""
+    if not checkpoint_data["count"]:
         print("No checkpoints recorded yet")
         return
     
@@ -255,7 +342,8 @@ def print_report(checkpoint_data: dict):
     print(f"{'CP':<4} {'Hours':<8} {'State':<12} {'Total':<10} {'New':<8} {'Rewards (OLAS)':<18} {'Liveness':<10}")
     print("-"*80)
     
-    for cp in checkpoint_data["checkpoints"]:
+    checkpoints = deque(iter_checkpoints(), maxlen=last_n) if last_n else iter_checkpoints()
+    for cp in checkpoints:
         print(f"{cp['checkpoint_num']:<4} "
               f"{cp['hours_elapsed']:<8.1f} "
               f"{cp['staking_state']:<12} "
@@ -266,10 +354,10 @@ def print_report(checkpoint_data: dict):
     
     print("-"*80)
     
-    # Summary
-    if len(checkpoint_data["checkpoints"]) > 1:
-        first = checkpoint_data["checkpoints"][0]
-        last = checkpoint_data["checkpoints"][-1]
+    # Summary, from the first and last checkpoints kept in the index
+    if checkpoint_data["count"] > 1:
+        first = checkpoint_data["first"]
+        last = checkpoint_data["last"]
         
         total_attestations = last["attestations_since_baseline"] - first["attestations_since_baseline"]
         total_rewards = last["accrued_rewards_wei"] - first["accrued_rewards_wei"]
@@ -281,21 +369,54 @@ def print_report(checkpoint_data: dict):
         print(f"  Final liveness status:   {'✅ PASS' if last['passes_liveness'] else '❌ FAIL'}")
 
 
+def export_checkpoints(export_format: str, output: str):
+    """Export the checkpoints to CSV or Parquet."""
+    if export_format == "csv":
+        with open(output, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=CHECKPOINT_FIELDS)
+            writer.writeheader()
+            writer.writerows(iter_checkpoints())
+    else:
+        try:
+            import pandas as pd
+        except ImportError:
+            print("Error: Parquet export requires pandas and pyarrow")
+            print("  uv run --with pandas --with pyarrow ./test_staking_checkpoints.py --export parquet")
+            sys.exit(1)
+        pd.DataFrame(iter_checkpoints(), columns=list(CHECKPOINT_FIELDS)).to_parquet(output, index=False)
+
+    print(f"✅ Exported checkpoints to {output}")
+
+
 def main():
     parser = argparse.ArgumentParser(description="72-hour staking checkpoint test")
     parser.add_argument("--checkpoint", action="store_true", help="Record current checkpoint")
     parser.add_argument("--advance", type=int, metavar="HOURS", help="Advance time by N hours and record checkpoint")
     parser.add_argument("--report", action="store_true", help="Print final report")
+    parser.add_argument("--last", type=int, default=0, metavar="N", help="Only print the last N checkpoints in the report")
+    parser.add_argument("--export", choices=["csv", "parquet"], help="Export the checkpoints for analysis")
+    parser.add_argument("--output", help="Export file (default: staking_checkpoints.<format>)")
     parser.add_argument("--reset", action="store_true", help="Reset checkpoint data")
     
     args = parser.parse_args()
     
     if args.reset:
-        if CHECKPOINT_FILE.exists():
-            CHECKPOINT_FILE.unlink()
+        for path in (CHECKPOINT_LOG, CHECKPOINT_INDEX, LEGACY_CHECKPOINT_FILE):
+            path.unlink(missing_ok=True)
         print("✅ Checkpoint data reset")
         return
     
+    # Load checkpoints
+    checkpoint_data = load_checkpoints()
+    
+    # The report and the export only need the local checkpoints
+    if args.report:
+        print_report(checkpoint_data, args.last)
+        return
+    if args.export:
+        export_checkpoints(args.export, args.output or str(SCRIPT_PATH / f"staking_checkpoints.{args.export}"))
+        return
+    
     # Load config
     config = load_service_config()
     chain_config = config.get("chain_configs", {}).get("base", {})
@@ -312,12 +433,7 @@ def main():
         print(f"Error: Could not connect to {rpc_url}")
         sys.exit(1)
     
-    # Load checkpoints
-    checkpoint_data = load_checkpoints()
-    
-    if args.report:
-        print_report(checkpoint_data)
-    elif args.advance:
+    if args.advance:
         advance_time(w3, args.advance)
         record_checkpoint(w3, config, checkpoint_data)
         print(f"\n💡 Next: Execute attestations, then run:")
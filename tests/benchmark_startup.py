@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+"""
+Phase-level startup benchmark of run_service.sh.
+
+Drives run_service.sh with the prompts of the service tests, and timestamps every
+phase as soon as it shows up in the output or in the Docker events: poetry install,
+quickstart bootstrap, funding prompts, on-chain deployment, image pull, container
+start and first healthy response. Every run is appended to a JSON lines history and
+compared with the previous run of the same config, so that startup regressions
+show up between releases.
+
+Usage:
+  # Benchmark a config in the current directory, then stop the service
+  poetry run python tests/benchmark_startup.py configs/config_quorum.json
+
+  # Benchmark a first run, in a fresh copy of the repository without .operate
+  poetry run python tests/benchmark_startup.py configs/config_quorum.json --fresh
+
+  # Show the history of a config
+  poetry run python tests/benchmark_startup.py configs/config_quorum.json --history
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import argparse
+import logging
+import tempfile
+import threading
+import subprocess
+import pexpect
+import requests
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+from test_run_service import (
+    HEALTH_CHECK_MAX_BACKOFF,
+    HEALTH_CHECK_TIMEOUT,
+    check_docker_status,
+    get_config_specific_settings,
+    get_health_check_url,
+    get_service_config,
+    get_service_env,
+    log_expect_match,
+    send_input_safely,
+    setup_logging,
+)
+from scripts.docker_status import get_docker_client, name_filter
+from operate.constants import OPERATE
+
+HISTORY_FILE = REPO_ROOT / "startup_benchmarks.jsonl"
+RUN_SERVICE_TIMEOUT = 1800
+
+# Phases recognised in the output of run_service.sh, in the order they are expected
+OUTPUT_MARKERS = {
+    "poetry_install": r"Installing dependencies\.\.\.",
+    "dependencies_installed": r"Dependencies installed",
+    "quickstart": r"\S+ quickstart\s",
+    "onchain_deploy": r"Deploying on-chain service on",
+    "service_funding": r"Funding the service",
+    "local_deploy": r"Deploying the service",
+    "service_started": r"Starting the ",
+}
+# Phases recognised in the prompts answered by the harness
+PROMPT_MARKERS = {
+    "password_prompt": r"password",
+    "funding_prompt": r"Please transfer at least",
+}
+
+
+class PhaseTimer:
+    """Time of the first occurrence of every phase, relative to the start."""
+
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+        self.started_at = datetime.now()
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+        self.phases: Dict[str, float] = {}
+
+    def mark(self, phase: str) -> None:
+        """Record the phase, unless it was already recorded."""
+        with self._lock:
+            if phase in self.phases:
+                return
+            self.phases[phase] = round(time.monotonic() - self._start, 2)
+        self.logger.info(f"⏱️  {phase} at {self.phases[phase]:.1f}s")
+
+    def elapsed(self) -> float:
+        """Seconds since the start."""
+        return round(time.monotonic() - self._start, 2)
+
+
+class DockerPhaseRecorder:
+    """Marks the image pull and the container lifecycle phases from the Docker events."""
+
+    def __init__(self, timer: PhaseTimer, container_name: str):
+        self.timer = timer
+        self._pattern = re.compile(name_filter(container_name, ("_abci_0",)))
+        self._events = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "DockerPhaseRecorder":
+        """Start following the events."""
+        self._events = get_docker_client().events(decode=True, filters={"type": ["container", "image"]})
+        self._thread = threading.Thread(target=self._follow_events, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop following the events."""
+        if self._events is not None:
+            self._events.close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _follow_events(self) -> None:
+        try:
+            for event in self._events:
+                action = event.get("Action") or event.get("status")
+                if event.get("Type") == "image":
+                    if action == "pull":
+                        self.timer.mark("image_pulled")
+                    continue
+                name = event.get("Actor", {}).get("Attributes", {}).get("name", "")
+                if not self._pattern.search(f"/{name}"):
+                    continue
+                if action == "create":
+                    self.timer.mark("container_created")
+                elif action == "start":
+                    self.timer.mark("container_started")
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+
+def drive_run_service(config_path: str, workdir: Path, timer: PhaseTimer, logger: logging.Logger) -> None:
+    """Run run_service.sh, answering its prompts and marking the phases of its output."""
+    prompts = get_config_specific_settings(config_path)["prompts"]
+    prompt_patterns = list(prompts.keys())
+
+    child = pexpect.spawn(
+        f'bash ./run_service.sh {config_path}',
+        encoding='utf-8',
+        timeout=RUN_SERVICE_TIMEOUT,
+        env=get_service_env(logger),
+        cwd=str(workdir),
+    )
+    try:
+        while True:
+            # Prompts come first, so that they win when a marker matches at the same position
+            markers = [phase for phase in OUTPUT_MARKERS if phase not in timer.phases]
+            patterns = prompt_patterns + [OUTPUT_MARKERS[phase] for phase in markers]
+            index = child.expect(patterns, timeout=RUN_SERVICE_TIMEOUT)
+            if index >= len(prompt_patterns):
+                timer.mark(markers[index - len(prompt_patterns)])
+                continue
+
+            pattern = prompt_patterns[index]
+            log_expect_match(child, pattern, index, logger)
+            for phase, marker in PROMPT_MARKERS.items():
+                if re.search(marker, child.after, re.IGNORECASE):
+                    timer.mark(phase)
+
+            response = prompts[pattern]
+            if callable(response):
+                output = child.before + child.after
+                response = response(output, logger)
+            send_input_safely(child, response, logger)
+    except pexpect.EOF:
+        timer.mark("run_service_exited")
+
+
+def wait_until_healthy(config_path: str, workdir: Path, timer: PhaseTimer, logger: logging.Logger) -> None:
+    """Mark the first successful health check."""
+    if "mech" in config_path.lower():
+        logger.info("Skipping the health check for mech service because it's not supported")
+        return
+
+    health_check_url = get_health_check_url(config_path, workdir / OPERATE)
+    delay = 1
+    deadline = time.monotonic() + HEALTH_CHECK_TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(health_check_url, timeout=10).status_code == 200:
+                timer.mark("healthy")
+                return
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(delay)
+        delay = min(delay * 2, HEALTH_CHECK_MAX_BACKOFF)
+    logger.warning(f"Service not healthy after {HEALTH_CHECK_TIMEOUT} seconds")
+
+
+def stop_service(config_path: str, workdir: Path, logger: logging.Logger) -> None:
+    """Stop the service, answering the prompts of stop_service.sh."""
+    prompts = get_config_specific_settings(config_path)["prompts"]
+    patterns = list(prompts.keys())
+    process = pexpect.spawn(f'bash ./stop_service.sh {config_path}', encoding='utf-8', timeout=600, cwd=str(workdir))
+    try:
+        while True:
+            index = process.expect(patterns, timeout=600)
+            response = prompts[patterns[index]]
+            if callable(response):
+                response = response(process.before + process.after, logger)
+            send_input_safely(process, response, logger)
+    except pexpect.EOF:
+        logger.info("Service stop completed")
+
+
+def get_commit() -> Optional[str]:
+    """Commit of the repository, if it is a git checkout."""
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(config_name: str) -> List[dict]:
+    """Previous runs of a config, oldest first."""
+    if not HISTORY_FILE.exists():
+        return []
+    with open(HISTORY_FILE) as f:
+        runs = [json.loads(line) for line in f if line.strip()]
+    return [run for run in runs if run["config"] == config_name]
+
+
+def append_history(run: dict) -> None:
+    """Append a run to the history."""
+    with open(HISTORY_FILE, "a") as f:
+        f.write(json.dumps(run) + "\n")
+
+
+def print_run(run: dict, previous: Optional[dict]) -> None:
+    """Print the phases of a run, and the change since the previous run of the config."""
+    print("\n" + "=" * 80)
+    print(f"🚀 STARTUP BENCHMARK: {run['config']} ({'fresh' if run['fresh'] else 'existing'} .operate)")
+    print("=" * 80)
+    print(f"{'Phase':<22} {'At (s)':>10} {'Duration (s)':>14} {'Previous (s)':>14} {'Change (s)':>12}")
+    print("-" * 80)
+    last = 0.0
+    previous_phases = previous["phases"] if previous else {}
+    for phase, at in sorted(run["phases"].items(), key=lambda item: item[1]):
+        before = previous_phases.get(phase)
+        change = f"{at - before:+.1f}" if before is not None else ""
+        before_str = f"{before:.1f}" if before is not None else ""
+        print(f"{phase:<22} {at:>10.1f} {at - last:>14.1f} {before_str:>14} {change:>12}")
+        last = at
+    print("-" * 80)
+    print(f"{'Total':<22} {run['total_seconds']:>10.1f}")
+    if previous:
+        print(f"Previous run: {previous['timestamp']} (commit {previous.get('commit') or 'unknown'}), "
+              f"total {previous['total_seconds']:.1f}s ({run['total_seconds'] - previous['total_seconds']:+.1f}s)")
+
+
+def print_history(config_name: str) -> None:
+    """Print the total startup time of every run of a config."""
+    runs = load_history(config_name)
+    if not runs:
+        print(f"No benchmark history for {config_name}")
+        return
+    print(f"{'Timestamp':<20} {'Commit':<10} {'Fresh':<6} {'Total (s)':>10}")
+    for run in runs:
+        print(f"{run['timestamp']:<20} {run.get('commit') or '':<10} {str(run['fresh']):<6} {run['total_seconds']:>10.1f}")
+
+
+def benchmark(config_path: str, fresh: bool, keep_running: bool, logger: logging.Logger) -> dict:
+    """Run the service once and return the timestamps of its startup phases."""
+    temp_dir = None
+    workdir = REPO_ROOT
+    if fresh:
+        temp_dir = tempfile.TemporaryDirectory(prefix='operate_benchmark_')
+        workdir = Path(temp_dir.name)
+        shutil.copytree(REPO_ROOT, workdir, dirs_exist_ok=True,
+                        ignore=shutil.ignore_patterns(OPERATE, '.pytest_cache', '__pycache__', '*.pyc', 'logs', '*.log'))
+        logger.info(f"Running in a fresh copy of the repository: {workdir}")
+
+    timer = PhaseTimer(logger)
+    docker_recorder = DockerPhaseRecorder(timer, get_service_config(config_path)["container_name"]).start()
+    try:
+        drive_run_service(config_path, workdir, timer, logger)
+        if check_docker_status(logger, config_path, operate_home=workdir / OPERATE):
+            timer.mark("container_running")
+            wait_until_healthy(config_path, workdir, timer, logger)
+        total_seconds = timer.elapsed()
+    finally:
+        docker_recorder.stop()
+        if not keep_running:
+            stop_service(config_path, workdir, logger)
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir.name, ignore_errors=True)
+
+    return {
+        "timestamp": timer.started_at.strftime('%Y-%m-%d %H:%M:%S'),
+        "config": Path(config_path).stem,
+        "commit": get_commit(),
+        "fresh": fresh,
+        "total_seconds": total_seconds,
+        "phases": timer.phases,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Phase-level startup benchmark of run_service.sh")
+    parser.add_argument("config_path", help="Path to the service config, e.g. configs/config_quorum.json")
+    parser.add_argument("--fresh", action="store_true", help="Run in a fresh copy of the repository, without .operate")
+    parser.add_argument("--keep-running", action="store_true", help="Leave the service running after the benchmark")
+    parser.add_argument("--history", action="store_true", help="Show the benchmark history of the config and exit")
+    args = parser.parse_args()
+
+    config_name = Path(args.config_path).stem
+    if args.history:
+        print_history(config_name)
+        return
+
+    os.chdir(REPO_ROOT)
+    logger = setup_logging(Path(f'benchmark_startup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'))
+    previous_runs = load_history(config_name)
+    run = benchmark(args.config_path, args.fresh, args.keep_running, logger)
+    append_history(run)
+    print_run(run, next((r for r in reversed(previous_runs) if r["fresh"] == run["fresh"]), None))
+    print(f"\n✅ Saved the run to {HISTORY_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Tests of the contract ABI cache of the trader service report."""
+
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from scripts.predict_trader import abi_cache
+from scripts.predict_trader.abi_cache import prefetch_contract_data
+
+STAKING_URL = "https://example.com/staking.json"
+MECH_URL = "https://example.com/mech.json"
+STAKING_DATA = {"abi": [{"type": "function", "name": "getStakingState"}]}
+
+
+def fake_get(url, headers=None, timeout=None):
+    """The staking artifact, and an unreachable mech artifact."""
+    if url == MECH_URL:
+        raise requests.ConnectionError("unreachable")
+    response = mock.Mock(status_code=200, headers={"ETag": '"v1"'})
+    response.json.return_value = STAKING_DATA
+    return response
+
+
+@pytest.fixture(autouse=True)
+def abi_cache_path(tmp_path, monkeypatch):
+    """Empty cache, and no network."""
+    monkeypatch.setattr(abi_cache, "ABI_CACHE_PATH", tmp_path / "abi_cache")
+    monkeypatch.setattr(abi_cache.requests, "get", fake_get)
+
+
+def test_optional_url_failure():
+    """An optional artifact that cannot be fetched is empty."""
+    contract_data = prefetch_contract_data((STAKING_URL,), optional_urls=(MECH_URL,))
+
+    assert contract_data == {STAKING_URL: STAKING_DATA, MECH_URL: {}}
+
+
+def test_required_url_failure():
+    """A required artifact that cannot be fetched is an error."""
+    with pytest.raises(requests.ConnectionError):
+        prefetch_contract_data((STAKING_URL, MECH_URL))
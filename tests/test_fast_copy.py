@@ -0,0 +1,125 @@
+"""Tests of the fast copy of directory trees."""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from scripts import fast_copy
+from scripts.fast_copy import copy_tree
+
+DIR_TIME = 1600000000
+
+
+def write(path: Path, data: bytes) -> Path:
+    """Write a file, creating its directories."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+@pytest.fixture
+def no_reflink(monkeypatch):
+    """Copy without reflinks, which depend on the filesystem of the test."""
+    monkeypatch.setattr(fast_copy, "reflink", lambda source, target: False)
+
+
+def test_top_level_exclude(tmp_path):
+    """Only the top-level entries are excluded."""
+    source = tmp_path / "source"
+    write(source / "keys.json", b"{}")
+    write(source / "logs" / "agent.log", b"log")
+    write(source / "services" / "sc-1" / "logs", b"service log")
+
+    stats = copy_tree(source, tmp_path / "target", exclude=("logs",))
+
+    assert stats.files == 2
+    assert (tmp_path / "target" / "keys.json").read_bytes() == b"{}"
+    assert (tmp_path / "target" / "services" / "sc-1" / "logs").read_bytes() == b"service log"
+    assert not (tmp_path / "target" / "logs").exists()
+
+
+def test_nested_and_empty_directories(tmp_path):
+    """Nested and empty directories are created with the times and permissions of the source."""
+    source = tmp_path / "source"
+    write(source / "a" / "b" / "c" / "file", b"nested")
+    (source / "empty").mkdir()
+    (source / "a" / "empty").mkdir()
+    (source / "a" / "b").chmod(0o750)
+    for directory in (source / "a" / "b", source / "empty", source):
+        os.utime(directory, (DIR_TIME, DIR_TIME))
+
+    copy_tree(source, tmp_path / "target")
+
+    target = tmp_path / "target"
+    assert (target / "a" / "b" / "c" / "file").read_bytes() == b"nested"
+    assert (target / "empty").is_dir() and not any((target / "empty").iterdir())
+    assert (target / "a" / "empty").is_dir()
+    assert (target / "a" / "b").stat().st_mode & 0o777 == 0o750
+    for directory in (target / "a" / "b", target / "empty", target):
+        assert directory.stat().st_mtime == DIR_TIME
+
+
+def test_chunked_copy(tmp_path, monkeypatch, no_reflink):
+    """Large files are copied in chunks, including a last partial one."""
+    monkeypatch.setattr(fast_copy, "CHUNK_SIZE", 1000)
+    data = os.urandom(10 * 1000 + 123)
+    write(tmp_path / "source" / "data" / "large.db", data)
+    write(tmp_path / "source" / "small.json", b"[]")
+
+    stats = copy_tree(tmp_path / "source", tmp_path / "target", workers=4)
+
+    assert (tmp_path / "target" / "data" / "large.db").read_bytes() == data
+    assert (stats.files, stats.copied, stats.verified, stats.bytes) == (2, 2, 2, len(data) + 2)
+
+
+def test_checksum_mismatch(tmp_path, monkeypatch, no_reflink):
+    """A copy which differs from its source is an error."""
+    write(tmp_path / "source" / "file", b"contents")
+    monkeypatch.setattr(fast_copy.shutil, "copyfile", lambda source, target: Path(target).write_bytes(b"corrupt"))
+
+    with pytest.raises(OSError, match="Checksum mismatch"):
+        copy_tree(tmp_path / "source", tmp_path / "target")
+
+
+def test_hardlinks_rerun(tmp_path, no_reflink):
+    """A second run over hardlinked files does not truncate the source."""
+    source_file = write(tmp_path / "source" / "file", b"contents")
+
+    first = copy_tree(tmp_path / "source", tmp_path / "target", allow_hardlinks=True)
+    second = copy_tree(tmp_path / "source", tmp_path / "target", allow_hardlinks=True)
+
+    assert first.hardlinked == second.hardlinked == 1
+    assert os.path.samefile(source_file, tmp_path / "target" / "file")
+    assert source_file.read_bytes() == b"contents"
+
+
+def test_symlinked_target_file(tmp_path):
+    """A symlink in the target is replaced, not written through."""
+    write(tmp_path / "source" / "file", b"contents")
+    outside = write(tmp_path / "outside", b"outside")
+    (tmp_path / "target").mkdir()
+    (tmp_path / "target" / "file").symlink_to(outside)
+
+    copy_tree(tmp_path / "source", tmp_path / "target")
+
+    assert not (tmp_path / "target" / "file").is_symlink()
+    assert (tmp_path / "target" / "file").read_bytes() == b"contents"
+    assert outside.read_bytes() == b"outside"
+
+
+def test_symlink_loop(tmp_path):
+    """A symlink to a parent directory is not followed again."""
+    write(tmp_path / "source" / "a" / "file", b"contents")
+    (tmp_path / "source" / "a" / "parent").symlink_to(tmp_path / "source")
+    write(tmp_path / "shared" / "file", b"shared")
+    (tmp_path / "source" / "linked").symlink_to(tmp_path / "shared")
+
+    stats = copy_tree(tmp_path / "source", tmp_path / "target")
+
+    assert stats.files == 2
+    assert (tmp_path / "target" / "a" / "file").read_bytes() == b"contents"
+    assert (tmp_path / "target" / "linked" / "file").read_bytes() == b"shared"
+    assert not (tmp_path / "target" / "a" / "parent").exists()
@@ -0,0 +1,171 @@
+"""Tests of the streamed merge of the Mech events databases."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from scripts.predict_trader.mech_events import MECH_EVENTS_DB_VERSION, merge_mech_events_files
+
+# Small enough for keys, numbers and strings to be split across chunks
+CHUNK_SIZE = 7
+
+SENDER = "0x7E5A4eA25001a46133e423BAC3512EaB798fcB3B"
+OTHER_SENDER = "0x1111111111111111111111111111111111111111"
+
+
+def event(event_id: str, ipfs_contents: dict = None) -> dict:
+    """A Mech event as stored in the database."""
+    return {
+        "event_id": event_id,
+        "sender": SENDER,
+        "transaction_hash": "0x" + "ab" * 32,
+        "ipfs_hash": "f01701220" + "cd" * 32,
+        "block_number": 21000000 + int(event_id),
+        "block_timestamp": 1700000000 + int(event_id),
+        "ipfs_link": "https://gateway.autonolas.tech/ipfs/",
+        "ipfs_contents": ipfs_contents or {},
+    }
+
+
+def write_db(path: Path, data: dict) -> Path:
+    """Write a database as the trader does."""
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    return path
+
+
+def merge(tmp_path: Path, source: dict, target: dict = None) -> tuple:
+    """Merge the source database into the target one, returning the number of events taken and the result."""
+    source_path = write_db(tmp_path / "source.json", source)
+    target_path = tmp_path / "data" / "mech_events.json"
+    if target is not None:
+        target_path.parent.mkdir()
+        write_db(target_path, target)
+    taken = merge_mech_events_files(source_path, target_path, chunk_size=CHUNK_SIZE)
+    assert not target_path.with_name(target_path.name + ".tmp").exists()
+    return taken, json.loads(target_path.read_text(encoding="utf-8"))
+
+
+def test_missing_target(tmp_path):
+    """Without a target, it is created with the events of the source."""
+    source = {
+        "db_version": MECH_EVENTS_DB_VERSION,
+        SENDER: {"Request": {"1": event("1"), "2": event("2", {"prompt": "Will it rain?"})}},
+    }
+
+    taken, merged = merge(tmp_path, source)
+
+    assert taken == 2
+    assert merged == source
+
+
+def test_ipfs_contents_are_kept(tmp_path):
+    """Of an event in both files, the one with IPFS contents is kept."""
+    source = {
+        "db_version": MECH_EVENTS_DB_VERSION,
+        SENDER: {"Request": {"1": event("1", {"prompt": "from source"}), "2": event("2"), "3": event("3")}},
+    }
+    target = {
+        "db_version": MECH_EVENTS_DB_VERSION,
+        SENDER: {"Request": {"1": event("1"), "2": event("2", {"prompt": "from target"}), "4": event("4")}},
+    }
+
+    taken, merged = merge(tmp_path, source, target)
+
+    assert taken == 2
+    events = merged[SENDER]["Request"]
+    assert sorted(events) == ["1", "2", "3", "4"]
+    assert events["1"]["ipfs_contents"] == {"prompt": "from source"}
+    assert events["2"]["ipfs_contents"] == {"prompt": "from target"}
+
+
+def test_both_with_ipfs_contents(tmp_path):
+    """Of an event with IPFS contents in both files, the target's one is kept."""
+    source = {"db_version": MECH_EVENTS_DB_VERSION, SENDER: {"Request": {"1": event("1", {"p": "source"})}}}
+    target = {"db_version": MECH_EVENTS_DB_VERSION, SENDER: {"Request": {"1": event("1", {"p": "target"})}}}
+
+    taken, merged = merge(tmp_path, source, target)
+
+    assert taken == 0
+    assert merged == target
+
+
+def test_older_source_is_skipped(tmp_path):
+    """The events of an older DB version are not merged."""
+    source = {"db_version": MECH_EVENTS_DB_VERSION - 1, SENDER: {"Request": {"1": event("1")}}}
+    target = {"db_version": MECH_EVENTS_DB_VERSION, SENDER: {"Request": {"2": event("2")}}}
+
+    taken, merged = merge(tmp_path, source, target)
+
+    assert taken == 0
+    assert merged == target
+
+
+def test_newer_source_drops_target(tmp_path):
+    """The events of a target of an older DB version are dropped."""
+    source = {"db_version": MECH_EVENTS_DB_VERSION, SENDER: {"Request": {"1": event("1")}}}
+    target = {"db_version": MECH_EVENTS_DB_VERSION - 1, SENDER: {"Request": {"2": event("2", {"p": "old"})}}}
+
+    taken, merged = merge(tmp_path, source, target)
+
+    assert taken == 1
+    assert merged == source
+
+
+@pytest.mark.parametrize(
+    "source, target, taken, expected",
+    [
+        ({}, None, 0, {"db_version": 0}),
+        ({"db_version": MECH_EVENTS_DB_VERSION}, {}, 0, {}),
+        (
+            {"db_version": MECH_EVENTS_DB_VERSION, SENDER: {}},
+            {"db_version": MECH_EVENTS_DB_VERSION, SENDER: {"Request": {}}},
+            0,
+            {"db_version": MECH_EVENTS_DB_VERSION, SENDER: {"Request": {}}},
+        ),
+        (
+            {"db_version": MECH_EVENTS_DB_VERSION, SENDER: {"Request": {}}},
+            None,
+            0,
+            {"db_version": MECH_EVENTS_DB_VERSION},
+        ),
+        (
+            {"db_version": MECH_EVENTS_DB_VERSION, SENDER: {"Request": {}, "Deliver": {"1": event("1")}}},
+            {},
+            1,
+            {"db_version": MECH_EVENTS_DB_VERSION, SENDER: {"Deliver": {"1": event("1")}}},
+        ),
+    ],
+)
+def test_empty_objects(tmp_path, source, target, taken, expected):  # pylint: disable=too-many-arguments
+    """Empty databases, senders and event groups."""
+    assert merge(tmp_path, source, target) == (taken, expected)
+
+
+def test_several_senders_and_event_names(tmp_path):
+    """The events are merged in their (sender, event_name) groups."""
+    source = {
+        "db_version": MECH_EVENTS_DB_VERSION,
+        SENDER: {"Request": {"1": event("1")}, "Deliver": {"1": event("1", {"result": "yes"})}},
+        OTHER_SENDER: {"Request": {"5": event("5")}},
+    }
+    target = {
+        "db_version": MECH_EVENTS_DB_VERSION,
+        OTHER_SENDER: {"Deliver": {"6": event("6")}},
+        SENDER: {"Request": {"2": event("2")}},
+    }
+
+    taken, merged = merge(tmp_path, source, target)
+
+    assert taken == 3
+    assert merged == {
+        "db_version": MECH_EVENTS_DB_VERSION,
+        OTHER_SENDER: {"Deliver": {"6": event("6")}, "Request": {"5": event("5")}},
+        SENDER: {
+            "Request": {"2": event("2"), "1": event("1")},
+            "Deliver": {"1": event("1", {"result": "yes"})},
+        },
+    }
+    assert list(merged[SENDER]["Request"]) == ["2", "1"]
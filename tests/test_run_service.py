@@ -3,6 +3,7 @@
 
 import re
 import sys
+import fcntl
 import logging
 import pexpect 
 import os
@@ -13,27 +14,54 @@ import tempfile
 import shutil
 from datetime import datetime
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
 from termcolor import colored
 from colorama import init
 from web3 import Web3
 import requests
-import docker
 from dotenv import load_dotenv
 from operate.cli import OperateApp
 from operate.constants import HEALTH_CHECK_URL, OPERATE
 from operate.operate_types import Chain, LedgerType
 
+# Make the repository scripts importable when running pytest from the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from scripts.anvil_fork import AnvilFork, add_balance, get_xdist_worker, is_anvil, set_erc20_balance
+from scripts.docker_status import (
+    ContainerStateCache,
+    ContainerStatus,
+    find_containers,
+    get_docker_client,
+    name_filter,
+)
+
 
 # Initialize colorama and load environment
 init()
 load_dotenv()
 
-STARTUP_WAIT = 10
-SERVICE_INIT_WAIT = 60
-CONTAINER_STOP_WAIT = 20
+# Deadlines of the readiness waits, which return as soon as their condition holds
+SERVICE_READY_TIMEOUT = 300
+CONTAINER_STOP_TIMEOUT = 60
+HEALTH_CHECK_TIMEOUT = 120
+# Consecutive successful health checks for the service to be considered healthy
+HEALTH_CHECK_STABLE_PASSES = 3
+HEALTH_CHECK_INTERVAL = 2
+HEALTH_CHECK_MAX_BACKOFF = 10
 require_extra_coins = False
 
+# Run each config against its own Anvil forks of the RPCs, instead of sharing the RPCs of the environment
+USE_ANVIL_FORKS = os.getenv('TEST_ANVIL_FORKS', '').lower() in ('1', 'true')
+# Optional directory of saved Anvil states named after the RPC variables, e.g. BASE_RPC_URL.json
+ANVIL_STATE_DIR = os.getenv('ANVIL_STATE_DIR')
+
+# Autonomy publishes the agent HTTP server on the first free host port from 8716 when it builds
+# the deployment, so deployments of pytest-xdist workers are serialized until the agent is running
+DEPLOYMENT_LOCK_FILE = Path(tempfile.gettempdir()) / 'quickstart_test_deployment.lock'
+# Printed by the quickstart right before building and starting the deployment
+DEPLOYING_PATTERN = r"Deploying the service"
+
 # Handle the distutils warning
 os.environ['SETUPTOOLS_USE_DISTUTILS'] = 'stdlib'
 
@@ -98,91 +126,166 @@ def get_service_config(config_path: str) -> dict:
             
     raise ValueError(f"No matching service configuration found for {config_path}")
 
-def check_docker_status(logger: logging.Logger, config_path: str) -> bool:
+def get_deployment_container_prefix(operate_home: Path) -> Optional[str]:
+    """
+    Container name prefix of the service deployed from an .operate directory, e.g. "optimusab12".
+    The prefix includes the deployment hash, so it only matches the containers of this deployment.
+    """
+    for compose_file in sorted(operate_home.glob("services/*/deployment/docker-compose.yaml")):
+        match = re.search(r"container_name:\s*(\S+)_abci_0", compose_file.read_text())
+        if match:
+            return match.group(1)
+    return None
+
+def get_container_name(config_path: str, operate_home: Optional[Path] = None) -> str:
+    """
+    Name to look up the containers of a service by.
+    Prefers the prefix of the deployment in operate_home, so that services of other
+    test runs using the same agent are left alone.
+    """
+    if operate_home is not None:
+        prefix = get_deployment_container_prefix(operate_home)
+        if prefix:
+            return prefix
+    return get_service_config(config_path)["container_name"]
+
+def wait_for_containers(
+    logger: logging.Logger,
+    name: str,
+    predicate: Callable[[List[ContainerStatus]], bool],
+    timeout: float,
+) -> Optional[List[ContainerStatus]]:
+    """
+    Wait until the containers matching the name satisfy the predicate.
+    The condition is checked again on every Docker event, so the wait ends as soon as it holds.
+
+    Returns:
+        The matching containers, or None if the timeout expired first
     """
-    Check if Docker ABCI containers are running properly.
+    cache = ContainerStateCache(name)
+    try:
+        cache.start()
+    except Exception as e:
+        logger.warning(f"Docker events unavailable, polling the containers instead: {str(e)}")
+    try:
+        return cache.wait_for(predicate, timeout)
+    finally:
+        cache.stop()
+
+def wait_for_containers_stopped(logger: logging.Logger, container_name: str, timeout: float = CONTAINER_STOP_TIMEOUT) -> bool:
+    """Wait until none of the containers matching the name is running."""
+    containers = wait_for_containers(
+        logger, container_name, lambda containers: not any(c.is_running for c in containers), timeout
+    )
+    if containers is None:
+        logger.warning(f"Containers with name {container_name} still running after {timeout} seconds")
+        return False
+    return True
+
+def check_docker_status(
+    logger: logging.Logger,
+    config_path: str,
+    timeout: float = SERVICE_READY_TIMEOUT,
+    operate_home: Optional[Path] = None,
+) -> bool:
+    """
+    Wait until the Docker ABCI container is running.
     Only checks containers ending with 'abci_0', ignoring Tendermint containers.
     Handles container names with format: {trimmed_service_name}{unique_id}_abci_0
     """
-    service_config = get_service_config(config_path)
-    container_base_name = service_config["container_name"]
+    container_base_name = get_container_name(config_path, operate_home)
     
     # Use filters with just "_abci_0" suffix to catch all ABCI containers
     abci_suffix = "_abci_0"
     
-    max_retries = 3
-    retry_delay = 20
-    
-    for attempt in range(max_retries):
-        logger.info(f"Checking ABCI container status (attempt {attempt + 1}/{max_retries})")
-        try:
-            client = docker.from_env()
-            
-            # List all containers that have the ABCI suffix and start with the base name
-            all_containers = client.containers.list(all=True)
-            abci_containers = [c for c in all_containers 
-                             if c.name.endswith(abci_suffix) and 
-                             c.name.startswith(container_base_name)]
-            
-            running_containers = client.containers.list()
-            running_abci = [c for c in running_containers 
-                          if c.name.endswith(abci_suffix) and 
-                          c.name.startswith(container_base_name)]
-            
-            if not abci_containers:
-                logger.error(f"No ABCI container found with base name {container_base_name} (attempt {attempt + 1}/{max_retries})")
-                if attempt == max_retries - 1:
-                    return False
-                logger.info(f"Waiting {retry_delay} seconds before retry...")
-                time.sleep(retry_delay)
-                continue
-            
-            # Should only be one ABCI container
-            abci_container = abci_containers[0]
-            logger.info(f"ABCI Container {abci_container.name} status: {abci_container.status}")
-            
-            if abci_container.status == "exited":
-                inspect = client.api.inspect_container(abci_container.id)
-                exit_code = inspect['State']['ExitCode']
-                logger.error(f"ABCI Container {abci_container.name} exited with code {exit_code}")
-                logs = abci_container.logs(tail=50).decode('utf-8')
-                logger.error(f"ABCI Container logs:\n{logs}")
-                
-            elif abci_container.status == "restarting":
-                logger.error(f"ABCI Container {abci_container.name} is restarting. Last logs:")
-                logs = abci_container.logs(tail=50).decode('utf-8')
-                logger.error(f"ABCI Container logs:\n{logs}")
-            
-            if not running_abci:
-                if attempt == max_retries - 1:
-                    return False
-                logger.info(f"Waiting {retry_delay} seconds for ABCI container to start...")
-                time.sleep(retry_delay)
-                continue
-            
-            # Check if ABCI container is running
-            if abci_container.status == "running":
-                logger.info(f"ABCI Container {abci_container.name} is running")
-                return True
-            
-            if attempt == max_retries - 1:
-                return False
-                
-            logger.info(f"ABCI container not running, waiting {retry_delay} seconds...")
-            time.sleep(retry_delay)
+    logger.info(f"Waiting up to {timeout} seconds for the ABCI container to run")
+    try:
+        start_time = time.time()
+        abci_containers = wait_for_containers(
+            logger,
+            name_filter(container_base_name, (abci_suffix,)),
+            lambda containers: any(c.is_running for c in containers),
+            timeout,
+        )
+        if abci_containers is not None:
+            abci_container = next(c for c in abci_containers if c.is_running)
+            logger.info(f"ABCI Container {abci_container.name} is running after {time.time() - start_time:.1f} seconds")
+            return True
+        
+        # Timed out, report the state of the ABCI container
+        client = get_docker_client()
+        abci_containers = find_containers(name_filter(container_base_name, (abci_suffix,)), all=True)
+        if not abci_containers:
+            logger.error(f"No ABCI container found with base name {container_base_name}")
+            return False
+        
+        # Should only be one ABCI container
+        abci_container = abci_containers[0]
+        logger.info(f"ABCI Container {abci_container.name} status: {abci_container.state}")
+        
+        if abci_container.state == "exited":
+            inspect = client.api.inspect_container(abci_container.id)
+            exit_code = inspect['State']['ExitCode']
+            logger.error(f"ABCI Container {abci_container.name} exited with code {exit_code}")
+            logs = client.api.logs(abci_container.id, tail=50).decode('utf-8')
+            logger.error(f"ABCI Container logs:\n{logs}")
             
-        except Exception as e:
-            logger.error(f"Error checking Docker status: {str(e)}")
-            if attempt == max_retries - 1:
-                return False
-            logger.info(f"Waiting {retry_delay} seconds before retry...")
-            time.sleep(retry_delay)
-    
-    return False
+        elif abci_container.state == "restarting":
+            logger.error(f"ABCI Container {abci_container.name} is restarting. Last logs:")
+            logs = client.api.logs(abci_container.id, tail=50).decode('utf-8')
+            logger.error(f"ABCI Container logs:\n{logs}")
+        
+        return False
+        
+    except Exception as e:
+        logger.error(f"Error checking Docker status: {str(e)}")
+        return False
 
-def check_service_health(logger: logging.Logger, config_path: str) -> tuple[bool, dict]:
-    """Enhanced service health check with metrics."""
-    service_config = get_service_config(config_path)
+class DeploymentLock:
+    """Lock shared by the pytest-xdist workers, held while a service deployment is built and started."""
+
+    def __init__(self, path: Path = DEPLOYMENT_LOCK_FILE):
+        self.path = path
+        self._file = None
+
+    def acquire(self, logger: logging.Logger) -> None:
+        """Wait until no other worker is deploying."""
+        if self._file is not None:
+            return
+        logger.info("Waiting for the deployment lock...")
+        self._file = open(self.path, 'a')
+        fcntl.flock(self._file, fcntl.LOCK_EX)
+        logger.info("Acquired the deployment lock")
+
+    def release(self) -> None:
+        """Let the other workers deploy."""
+        if self._file is None:
+            return
+        fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+def get_health_check_url(config_path: str, operate_home: Optional[Path] = None) -> str:
+    """
+    Health check URL of the deployed agent, on the host port published by its ABCI container.
+    Falls back to the configured URL if the container or its port binding is not found.
+    """
+    url = urlparse(get_service_config(config_path)["health_check_url"])
+    container_name = get_container_name(config_path, operate_home)
+    client = get_docker_client()
+    for container in find_containers(name_filter(container_name, ("_abci_0",)), client=client):
+        ports = client.api.inspect_container(container.id)['NetworkSettings']['Ports'] or {}
+        bindings = ports.get(f"{url.port}/tcp") or []
+        if bindings:
+            return url._replace(netloc=f"{url.hostname}:{bindings[0]['HostPort']}").geturl()
+    return url.geturl()
+
+def check_service_health(logger: logging.Logger, config_path: str, operate_home: Optional[Path] = None) -> tuple[bool, dict]:
+    """
+    Enhanced service health check with metrics.
+    Passes once the health check succeeds HEALTH_CHECK_STABLE_PASSES times in a row,
+    backing off exponentially while the service is not ready to answer yet.
+    """
 
     if "mech" in config_path.lower():
         logger.info("Bypassing health check for mech service because it's not supported")
@@ -194,7 +297,8 @@ def check_service_health(logger: logging.Logger, config_path: str) -> tuple[bool
             'total_checks': 1
         }
 
-    health_check_url = service_config["health_check_url"]
+    health_check_url = get_health_check_url(config_path, operate_home)
+    logger.info(f"Checking health on {health_check_url}")
     
     metrics = {
         'response_time': None,
@@ -204,8 +308,11 @@ def check_service_health(logger: logging.Logger, config_path: str) -> tuple[bool
         'total_checks': 0
     }
     
-    start_monitoring = time.time()
-    while time.time() - start_monitoring < 120:  # Run for 2 minutes
+    consecutive_passes = 0
+    backoff = HEALTH_CHECK_INTERVAL
+    deadline = time.time() + HEALTH_CHECK_TIMEOUT
+    while time.time() < deadline:
+        delay = HEALTH_CHECK_INTERVAL
         try:
             metrics['total_checks'] += 1
             start_time = time.time()
@@ -215,10 +322,17 @@ def check_service_health(logger: logging.Logger, config_path: str) -> tuple[bool
             
             if response.status_code == 200:
                 metrics['successful_checks'] += 1
+                metrics['error'] = None
+                consecutive_passes += 1
+                backoff = HEALTH_CHECK_INTERVAL
                 logger.info(f"Health check passed (response time: {metrics['response_time']:.2f}s)")
+                if consecutive_passes >= HEALTH_CHECK_STABLE_PASSES:
+                    logger.info(f"Health check completed successfully - {metrics['successful_checks']} checks passed")
+                    return True, metrics
             elif response.status_code == 425:
-                logger.debug('Too early to check health. Waiting 10 seconds...')
-                time.sleep(10)
+                consecutive_passes = 0
+                delay, backoff = backoff, min(backoff * 2, HEALTH_CHECK_MAX_BACKOFF)
+                logger.debug(f'Too early to check health. Waiting {delay} seconds...')
             else:
                 logger.error(f"Health check failed - Status: {response.status_code}")
                 return False, metrics
@@ -228,17 +342,21 @@ def check_service_health(logger: logging.Logger, config_path: str) -> tuple[bool
             logger.error("Health check timeout")
             return False, metrics
         except requests.exceptions.ConnectionError as e:
+            # The server may not be listening yet, retry until the deadline
             metrics['error'] = 'connection_error'
-            logger.error(f"Connection error: {str(e)}")
-            return False, metrics
+            consecutive_passes = 0
+            delay, backoff = backoff, min(backoff * 2, HEALTH_CHECK_MAX_BACKOFF)
+            logger.debug(f"Connection error, retrying in {delay} seconds: {str(e)}")
         except Exception as e:
             metrics['error'] = str(e)
             logger.error(f"Unexpected error in health check: {str(e)}")
             return False, metrics
             
-        elapsed = time.time() - start_time
-        if elapsed < 5:
-            time.sleep(5 - elapsed)
+        time.sleep(max(0, min(delay, deadline - time.time())))
+    
+    if metrics['error'] == 'connection_error':
+        logger.error(f"Health check could not connect within {HEALTH_CHECK_TIMEOUT} seconds")
+        return False, metrics
     
     logger.info(f"Health check completed successfully - {metrics['successful_checks']} checks passed")
     return True, metrics    
@@ -302,6 +420,12 @@ def handle_erc20_funding(output: str, logger: logging.Logger, rpc_url: str) -> s
             amount_in_units = int(required_amount * (10 ** decimals))
             amount_hex = hex(amount_in_units)
             
+            w3 = Web3(Web3.HTTPProvider(rpc_url))
+            if is_anvil(w3):
+                set_erc20_balance(w3, token_address, wallet_address, amount_in_units)
+                logger.info(f"Successfully funded {required_amount} {token_symbol} to {wallet_address} on {chain} Anvil fork")
+                return ""
+            
             headers = {"Content-Type": "application/json"}
             payload = {
                 "jsonrpc": "2.0",
@@ -372,6 +496,11 @@ def handle_native_funding(output: str, logger: logging.Logger, rpc_url: str) ->
                 amount_wei = w3.to_wei(required_amount, 'ether')
                 amount_hex = hex(amount_wei)
                 
+                if is_anvil(w3):
+                    add_balance(w3, wallet_address, amount_wei)
+                    logger.info(f"Successfully funded {required_amount} to {wallet_type} {wallet_address} on Anvil fork")
+                    return ""
+                
                 headers = {"Content-Type": "application/json"}
                 payload = {
                     "jsonrpc": "2.0",
@@ -418,12 +547,11 @@ def create_token_funding_handler(rpc_url: str):
     return handler
 
 
-def check_shutdown_logs(logger: logging.Logger, config_path: str) -> bool:
+def check_shutdown_logs(logger: logging.Logger, config_path: str, operate_home: Optional[Path] = None) -> bool:
     """Check shutdown logs for errors."""
     try:
-        client = docker.from_env()
-        service_config = get_service_config(config_path)
-        container_name = service_config["container_name"]
+        client = get_docker_client()
+        container_name = get_container_name(config_path, operate_home)
         
         containers = client.containers.list(filters={"name": container_name})
         
@@ -447,15 +575,19 @@ def ensure_service_stopped(config_path: str, temp_dir: str, logger: logging.Logg
     try:
         # First check if Docker daemon is running
         try:
-            client = docker.from_env()
+            client = get_docker_client()
             client.ping()
         except Exception as docker_err:
             logger.error(f"Docker daemon not accessible: {str(docker_err)}")
             logger.error("Please ensure Docker is running before starting the tests")
             raise RuntimeError("Docker daemon not running or not accessible. Please start Docker first.") from docker_err
 
-        service_config = get_service_config(config_path)
-        container_name = service_config["container_name"]
+        operate_home = Path(temp_dir) / OPERATE
+        if get_xdist_worker() != "main" and get_deployment_container_prefix(operate_home) is None:
+            # Other workers may be running the same agent, only stop what this one deployed
+            logger.info("No service deployed in this working directory, skipping stop")
+            return True
+        container_name = get_container_name(config_path, operate_home)
         
         # Check if service is running
         containers = client.containers.list(filters={"name": container_name})
@@ -473,7 +605,7 @@ def ensure_service_stopped(config_path: str, temp_dir: str, logger: logging.Logg
             cwd=temp_dir
         )
         process.expect(pexpect.EOF)
-        time.sleep(CONTAINER_STOP_WAIT)
+        wait_for_containers_stopped(logger, container_name)
         
         # Check if any containers are still running
         remaining_containers = client.containers.list(filters={"name": container_name})
@@ -623,8 +755,24 @@ def get_base_config(config_path: str = "") -> dict:
 
     return {"config": base_config, "prompts": base_prompts}
 
-def get_config_specific_settings(config_path: str) -> dict:
-    """Get config specific prompts and test settings."""
+def get_config_specific_settings(
+    config_path: str,
+    rpc_urls: Optional[Dict[str, str]] = None,
+    agent_rpc_urls: Optional[Dict[str, str]] = None,
+) -> dict:
+    """
+    Get config specific prompts and test settings.
+    RPC URLs are taken from rpc_urls when given (e.g. Anvil forks), then from the environment.
+    The RPC prompts are answered with agent_rpc_urls when given, as the agents reach the RPCs
+    from their containers, while the funding handlers run on the host.
+    """
+    rpc_urls = rpc_urls or {}
+    agent_rpc_urls = agent_rpc_urls or {}
+    def get_rpc(name: str, default: Optional[str] = None) -> Optional[str]:
+        return rpc_urls.get(name) or os.getenv(name, default)
+    def get_agent_rpc(name: str, default: Optional[str] = None) -> Optional[str]:
+        return agent_rpc_urls.get(name) or get_rpc(name, default)
+
     # Get base configuration
     base = get_base_config(config_path)
     base_config = base["config"]
@@ -636,12 +784,12 @@ def get_config_specific_settings(config_path: str) -> dict:
         # Modius specific settings
         test_config = {
             **base_config,  # Include base config
-            "RPC_URL": os.getenv('MODIUS_RPC_URL'),
+            "RPC_URL": get_rpc('MODIUS_RPC_URL'),
         }
 
         # Add Modius-specific prompts
         prompts.update({
-                r"eth_newFilter \[hidden input\]": test_config["RPC_URL"],
+                r"eth_newFilter \[hidden input\]": get_agent_rpc('MODIUS_RPC_URL'),
                 r"Please transfer at least.*(?:ETH|xDAI) to the Master (EOA|Safe) (0x[a-fA-F0-9]{40})": 
                     lambda output, logger: create_funding_handler(test_config["RPC_URL"])(output, logger),
                 r"Please transfer at least.*(?:USDC|OLAS) to the Master (?:EOA|Safe) (0x[a-fA-F0-9]{40})":
@@ -652,9 +800,9 @@ def get_config_specific_settings(config_path: str) -> dict:
         # Optimus settings with multiple RPCs
         test_config = {
             **base_config,  # Include base config
-            "MODIUS_RPC_URL": os.getenv('MODIUS_RPC_URL'),
-            "OPTIMISM_RPC_URL": os.getenv('OPTIMISM_RPC_URL'),
-            "BASE_RPC_URL": os.getenv('BASE_RPC_URL'),
+            "MODIUS_RPC_URL": get_rpc('MODIUS_RPC_URL'),
+            "OPTIMISM_RPC_URL": get_rpc('OPTIMISM_RPC_URL'),
+            "BASE_RPC_URL": get_rpc('BASE_RPC_URL'),
         }
 
         def get_chain_rpc(output: str, logger: logging.Logger) -> str:
@@ -678,9 +826,9 @@ def get_config_specific_settings(config_path: str) -> dict:
                 return test_config["MODIUS_RPC_URL"]
 
         prompts.update({
-            r"Enter a Mode RPC that supports eth_newFilter \[hidden input\]": test_config["MODIUS_RPC_URL"],
-            r"Enter a Optimism RPC that supports eth_newFilter \[hidden input\]": test_config["OPTIMISM_RPC_URL"],
-            r"Enter a Base RPC that supports eth_newFilter \[hidden input\]": test_config["BASE_RPC_URL"],
+            r"Enter a Mode RPC that supports eth_newFilter \[hidden input\]": get_agent_rpc('MODIUS_RPC_URL'),
+            r"Enter a Optimism RPC that supports eth_newFilter \[hidden input\]": get_agent_rpc('OPTIMISM_RPC_URL'),
+            r"Enter a Base RPC that supports eth_newFilter \[hidden input\]": get_agent_rpc('BASE_RPC_URL'),
             r"\[(?:optimism|base|mode)\].*Please transfer at least.*(?:ETH|xDAI) to the Master (EOA|Safe) (0x[a-fA-F0-9]{40})": 
                 lambda output, logger: create_funding_handler(get_chain_rpc(output, logger))(output, logger),
             r"\[(?:optimism|base|mode)\].*Please transfer at least.*(?:USDC|OLAS) to the Master (?:EOA|Safe) (0x[a-fA-F0-9]{40})":
@@ -691,12 +839,12 @@ def get_config_specific_settings(config_path: str) -> dict:
         require_extra_coins = True
         test_config = {
             **base_config,  
-            "RPC_URL": os.getenv('GNOSIS_RPC_URL', '')
+            "RPC_URL": get_rpc('GNOSIS_RPC_URL', '')
         }
 
         # Add Mech-specific prompts
         prompts.update({
-            r"eth_newFilter \[hidden input\]": test_config["RPC_URL"],
+            r"eth_newFilter \[hidden input\]": get_agent_rpc('GNOSIS_RPC_URL', ''),
             r"Please transfer at least.*(?:ETH|xDAI) to the Master (EOA|Safe) (0x[a-fA-F0-9]{40})": 
                 lambda output, logger: create_funding_handler(test_config["RPC_URL"])(output, logger)
         })
@@ -705,11 +853,11 @@ def get_config_specific_settings(config_path: str) -> dict:
         # Agents.fun specific settings
         test_config = {
             **base_config,  # Include base config
-            "BASE_RPC_URL": os.getenv('BASE_RPC_URL'),
+            "BASE_RPC_URL": get_rpc('BASE_RPC_URL'),
         }
         # Add Agents.fun-specific prompts
         prompts.update({
-            r"Enter a Base RPC that supports eth_newFilter \[hidden input\]": test_config["BASE_RPC_URL"],
+            r"Enter a Base RPC that supports eth_newFilter \[hidden input\]": get_agent_rpc('BASE_RPC_URL'),
             r"Please transfer at least.*(?:ETH|xDAI) to the Master (EOA|Safe) (0x[a-fA-F0-9]{40})": 
                 lambda output, logger: create_funding_handler(test_config["BASE_RPC_URL"])(output, logger),
         })    
@@ -718,11 +866,11 @@ def get_config_specific_settings(config_path: str) -> dict:
         # Default PredictTrader settings
         test_config = {
             **base_config,  # Include base config
-            "RPC_URL": os.getenv('GNOSIS_RPC_URL', '')
+            "RPC_URL": get_rpc('GNOSIS_RPC_URL', '')
         }
         # Add PredictTrader-specific prompts
         prompts.update({
-            r"eth_newFilter \[hidden input\]": test_config["RPC_URL"],
+            r"eth_newFilter \[hidden input\]": get_agent_rpc('GNOSIS_RPC_URL', ''),
             r"Please transfer at least.*(?:ETH|xDAI) to the Master (EOA|Safe) (0x[a-fA-F0-9]{40})": 
                 lambda output, logger: create_funding_handler(test_config["RPC_URL"])(output, logger),
             r"Please transfer at least.*(?:USDC|OLAS) to the Master (?:EOA|Safe) (0x[a-fA-F0-9]{40})":
@@ -731,6 +879,71 @@ def get_config_specific_settings(config_path: str) -> dict:
 
     return {"prompts": prompts}
 
+def get_config_rpc_vars(config_path: str) -> List[str]:
+    """Environment variables of the RPCs used by a config, as in get_config_specific_settings."""
+    config_path_lower = config_path.lower()
+    if "modius" in config_path_lower:
+        return ['MODIUS_RPC_URL']
+    if "optimus" in config_path_lower:
+        return ['MODIUS_RPC_URL', 'OPTIMISM_RPC_URL', 'BASE_RPC_URL']
+    if "agents.fun" in config_path_lower:
+        return ['BASE_RPC_URL']
+    return ['GNOSIS_RPC_URL']
+
+def start_anvil_forks(config_path: str, logger: logging.Logger) -> Dict[str, AnvilFork]:
+    """
+    Start an Anvil fork of every RPC used by a config, each on its own free port.
+    Forks load the state saved in ANVIL_STATE_DIR when there is one.
+    """
+    forks: Dict[str, AnvilFork] = {}
+    try:
+        for rpc_var in get_config_rpc_vars(config_path):
+            state_path = Path(ANVIL_STATE_DIR) / f"{rpc_var}.json" if ANVIL_STATE_DIR else None
+            if state_path is not None and not state_path.exists():
+                state_path = None
+            fork_url = os.getenv(rpc_var)
+            if not fork_url and state_path is None:
+                raise ValueError(f"{rpc_var} environment variable not set, nothing to fork")
+            forks[rpc_var] = AnvilFork(fork_url=fork_url, state_path=state_path).start()
+            logger.info(f"Started Anvil fork of {rpc_var} on {forks[rpc_var].url}")
+    except Exception:
+        stop_anvil_forks(forks)
+        raise
+    return forks
+
+def stop_anvil_forks(forks: Dict[str, AnvilFork]) -> None:
+    """Stop the Anvil forks of a config."""
+    for fork in forks.values():
+        fork.stop()
+
+def get_service_env(logger: logging.Logger) -> dict:
+    """
+    Environment for the quickstart scripts, which refuse to run inside a virtualenv.
+    The packages of the current virtualenv are kept on the PYTHONPATH.
+    """
+    venv_path = os.environ.get('VIRTUAL_ENV')
+    
+    env = os.environ.copy()
+    env.pop('VIRTUAL_ENV', None)
+    env.pop('POETRY_ACTIVE', None)
+    
+    if venv_path:
+        if os.name == 'nt':  # Windows
+            site_packages = Path(venv_path) / 'Lib' / 'site-packages'
+        else:  # Unix-like
+            site_packages = list(Path(venv_path).glob('lib/python*/site-packages'))[0]
+            
+        pythonpath = env.get('PYTHONPATH', '')
+        env['PYTHONPATH'] = f"{site_packages}:{pythonpath}" if pythonpath else str(site_packages)
+        
+        paths = env['PATH'].split(os.pathsep)
+        paths = [p for p in paths if not p.startswith(str(venv_path))]
+        env['PATH'] = os.pathsep.join(paths)
+    else:
+        logger.warning("No virtualenv detected")
+    
+    return env
+
 def log_expect_match(child, pattern, match_index, logger):
     """Log minimal match information without exposing sensitive data."""
     logger.debug(f"Pattern matched at index: {match_index}")
@@ -779,6 +992,8 @@ class BaseTestService:
     temp_dir = Path
     original_cwd = None
     temp_env = None
+    rpc_urls: Dict[str, str] = {}
+    agent_rpc_urls: Dict[str, str] = {}
     _setup_complete = False
     operate: OperateApp
 
@@ -824,13 +1039,12 @@ class BaseTestService:
         cls._setup_environment()
 
         # Load config specific settings
-        cls.config_settings = get_config_specific_settings(cls.config_path)
+        cls.config_settings = get_config_specific_settings(cls.config_path, cls.rpc_urls, cls.agent_rpc_urls)
         cls.logger.info(f"Loaded settings for config: {cls.config_path}")
         cls.operate = OperateApp(logger=cls.logger, home=Path(cls.temp_dir.name) / OPERATE)
         
         # Start the service
         cls.start_service()
-        time.sleep(STARTUP_WAIT)
         
         cls._setup_complete = True
 
@@ -838,28 +1052,7 @@ class BaseTestService:
     def _setup_environment(cls):
         """Setup environment for tests"""
         cls.logger.info("Setting up test environment...")
-        
-        venv_path = os.environ.get('VIRTUAL_ENV')
-        
-        cls.temp_env = os.environ.copy()
-        cls.temp_env.pop('VIRTUAL_ENV', None)
-        cls.temp_env.pop('POETRY_ACTIVE', None)
-        
-        if venv_path:
-            if os.name == 'nt':  # Windows
-                site_packages = Path(venv_path) / 'Lib' / 'site-packages'
-            else:  # Unix-like
-                site_packages = list(Path(venv_path).glob('lib/python*/site-packages'))[0]
-                
-            pythonpath = cls.temp_env.get('PYTHONPATH', '')
-            cls.temp_env['PYTHONPATH'] = f"{site_packages}:{pythonpath}" if pythonpath else str(site_packages)
-            
-            paths = cls.temp_env['PATH'].split(os.pathsep)
-            paths = [p for p in paths if not p.startswith(str(venv_path))]
-            cls.temp_env['PATH'] = os.pathsep.join(paths)
-        else:
-            cls.logger.warning("No virtualenv detected")
-            
+        cls.temp_env = get_service_env(cls.logger)
         cls.logger.info("Environment setup completed")
 
     @classmethod
@@ -871,12 +1064,11 @@ class BaseTestService:
             # Always try to stop the service first
             try:
                 cls.stop_service()
-                time.sleep(CONTAINER_STOP_WAIT)
                 
                 # Verify all containers are stopped
-                client = docker.from_env()
-                service_config = get_service_config(cls.config_path)
-                container_name = service_config["container_name"]
+                client = get_docker_client()
+                container_name = get_container_name(cls.config_path, Path(cls.temp_dir.name) / OPERATE)
+                wait_for_containers_stopped(cls.logger, container_name)
                 containers = client.containers.list(filters={"name": container_name})
                 
                 if containers:
@@ -917,11 +1109,15 @@ class BaseTestService:
                     cwd="."
                 )
             
+            deployment_lock = DeploymentLock()
             try:
                 while True:
-                    patterns = list(cls.config_settings["prompts"].keys())
+                    patterns = [DEPLOYING_PATTERN] + list(cls.config_settings["prompts"].keys())
                     index = cls.child.expect(patterns, timeout=600)
                     pattern = patterns[index]
+                    if pattern == DEPLOYING_PATTERN:
+                        deployment_lock.acquire(cls.logger)
+                        continue
                     
                     log_expect_match(cls.child, pattern, index, cls.logger)
                     
@@ -934,19 +1130,14 @@ class BaseTestService:
                     
             except pexpect.EOF:
                 cls.logger.info("Initial setup completed")
-                time.sleep(SERVICE_INIT_WAIT)
                 
-                retries = 5
-                while retries > 0:
-                    if check_docker_status(cls.logger, cls.config_path):
-                        break
-                    time.sleep(CONTAINER_STOP_WAIT)
-                    retries -= 1
-                    
-                if retries == 0:
+                if not check_docker_status(cls.logger, cls.config_path, operate_home=Path(cls.temp_dir.name) / OPERATE):
                     service_config = get_service_config(cls.config_path)
                     container_name = service_config["container_name"]
                     raise Exception(f"{container_name} containers failed to start")
+            finally:
+                # The agent publishes its port once running, the next deployment will pick another one
+                deployment_lock.release()
                     
             cls.operate.password = os.getenv('TEST_PASSWORD', 'test_secret')
         except Exception as e:
@@ -988,7 +1179,7 @@ class BaseTestService:
     def test_health_check(self):
         """Test service health endpoint"""
         self.logger.info("Testing service health...")
-        status, metrics = check_service_health(self.logger, self.config_path)
+        status, metrics = check_service_health(self.logger, self.config_path, Path(self.temp_dir.name) / OPERATE)
         self.logger.info(f"Health check metrics: {metrics}")
         assert status == True, f"Health check failed with metrics: {metrics}"
             
@@ -996,46 +1187,60 @@ class BaseTestService:
         """Test service shutdown logs"""
         self.logger.info("Testing shutdown logs...")
         self.stop_service()
-        time.sleep(CONTAINER_STOP_WAIT)
         
-        client = docker.from_env()
-        service_config = get_service_config(self.config_path)
-        container_name = service_config["container_name"]
+        client = get_docker_client()
+        operate_home = Path(self.temp_dir.name) / OPERATE
+        container_name = get_container_name(self.config_path, operate_home)
+        wait_for_containers_stopped(self.logger, container_name)
         
         containers = client.containers.list(filters={"name": container_name})
         assert len(containers) == 0, f"Containers with name {container_name} are still running"
-        assert check_shutdown_logs(self.logger, self.config_path) == True, "Shutdown logs check failed"
+        assert check_shutdown_logs(self.logger, self.config_path, operate_home) == True, "Shutdown logs check failed"
 
 class TempDirMixin:
-    """Mixin to set up and clean up a temporary directory for tests."""
+    """
+    Mixin to set up and clean up a temporary directory for tests.
+    Each config runs in its own copy of the repository, so that it gets its own .operate
+    directory, and, with TEST_ANVIL_FORKS set, its own Anvil forks. Configs can then run in
+    parallel under pytest-xdist (`pytest -n auto`).
+    """
     logger: logging.Logger
     get_test_class: Callable[[str, str], BaseTestService]
     temp_dir: tempfile.TemporaryDirectory
 
     def setup_class(self):
         """Setup for class-level tests."""
-        # Create a temporary directory for stop_service
+        # Create a temporary directory holding the working directory of every config
         self.temp_dir = tempfile.TemporaryDirectory(prefix='operate_test_')
-        
-        # Copy necessary files to temp directory
-        shutil.copytree('.', self.temp_dir.name, dirs_exist_ok=True, 
-                        ignore=shutil.ignore_patterns('.operate', '.pytest_cache', '__pycache__', 
-                                                '*.pyc', 'logs', '*.log', '.env'))
-
-        os.chdir(self.temp_dir.name)
-        self.logger.info(f"Changed working directory to: {self.temp_dir.name}")
+        self.source_dir = os.getcwd()
 
     @pytest.fixture(autouse=True)
     def setup(self, request):
         """Setup for each test case."""
         config_path = request.param
 
+        # Copy necessary files to the working directory of the config
+        config_dir = tempfile.TemporaryDirectory(
+            prefix=f'{Path(config_path).stem}_{get_xdist_worker()}_', dir=self.temp_dir.name
+        )
+        shutil.copytree(self.source_dir, config_dir.name, dirs_exist_ok=True, 
+                        ignore=shutil.ignore_patterns('.operate', '.pytest_cache', '__pycache__', 
+                                                '*.pyc', 'logs', '*.log', '.env'))
+        os.chdir(config_dir.name)
+        self.logger.info(f"Changed working directory to: {config_dir.name}")
+
+        anvil_forks = {}
         try:
+            if USE_ANVIL_FORKS:
+                anvil_forks = start_anvil_forks(config_path, self.logger)
+
             # First ensure any existing service is stopped
-            if not ensure_service_stopped(config_path, self.temp_dir.name, self.logger):
+            if not ensure_service_stopped(config_path, config_dir.name, self.logger):
                 raise RuntimeError("Failed to stop existing service")
 
-            self.test_class = self.get_test_class(config_path, self.temp_dir)
+            self.test_class = self.get_test_class(config_path, config_dir)
+            self.test_class.rpc_urls = {rpc_var: fork.url for rpc_var, fork in anvil_forks.items()}
+            self.test_class.agent_rpc_urls = {rpc_var: fork.container_url for rpc_var, fork in anvil_forks.items()}
             self.test_class.setup_class()
 
             yield
@@ -1043,7 +1248,9 @@ class TempDirMixin:
                 self.test_class.teardown_class()
                 
         finally:
-            pass
+            stop_anvil_forks(anvil_forks)
+            os.chdir(self.source_dir)
+            cleanup_directory(config_dir.name, self.logger)
 
     def teardown_class(self):
         # Clean up the temporary directory
@@ -0,0 +1,69 @@
+"""Tests of the fleet report of the staking services."""
+
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+from staking_report import FLEET_BATCH_SIZE, read_fleet_snapshots
+
+# Fleet report of a service whose RPC never answers
+HANGING_FLEET_REPORT = textwrap.dedent(
+    """
+    import time
+    from unittest import mock
+
+    import staking_report
+
+    entry = {
+        "name": "sc-1", "service_id": "1", "multisig": staking_report.ZERO_ADDRESS,
+        "rpc_url": "http://localhost:8545", "agent_address": None,
+    }
+    with mock.patch.object(staking_report, "load_all_service_configs", return_value=[(None, None)]), \\
+            mock.patch.object(staking_report, "get_service_entry", return_value=entry), \\
+            mock.patch.object(staking_report, "_read_fleet_batch", side_effect=lambda *args: time.sleep(60)):
+        staking_report.fleet_report(timeout=0.5)
+    """
+)
+
+
+def test_fleet_report_timeout_does_not_block_exit():
+    """A read still running after the timeout is reported, and does not keep the report running."""
+    result = subprocess.run(
+        [sys.executable, "-c", HANGING_FLEET_REPORT],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=20,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert "timeout" in result.stdout.splitlines()[-1]
+
+
+def test_read_fleet_snapshots_batches():
+    """Services are read by batches of at most FLEET_BATCH_SIZE sharing an RPC."""
+    services = [{"name": f"sc-{i}", "rpc_url": f"http://rpc-{i % 2}"} for i in range(2 * FLEET_BATCH_SIZE + 2)]
+    batches = []
+
+    def read_batch(rpc_url, batch):
+        batches.append((rpc_url, [service["name"] for service in batch]))
+        if rpc_url == "http://rpc-1" and len(batch) < FLEET_BATCH_SIZE:
+            raise ConnectionError("RPC down")
+        return [None if service["name"] == "sc-0" else service["name"] for service in batch]
+
+    rows, errors = read_fleet_snapshots(services, read_batch, timeout=5)
+
+    assert sorted(len(batch) for _, batch in batches) == [1, 1, FLEET_BATCH_SIZE, FLEET_BATCH_SIZE]
+    assert all(services[int(name[3:])]["rpc_url"] == rpc_url for rpc_url, batch in batches for name in batch)
+    assert rows[0] == ("error", None)
+    assert rows[2] == ("ok", "sc-2")
+    assert rows[-1] == ("error", None)
+    assert errors == [f"sc-{2 * FLEET_BATCH_SIZE + 1}: RPC down"]
+
+
+def test_read_fleet_snapshots_without_services():
+    """Nothing is read without services."""
+    assert read_fleet_snapshots([], lambda rpc_url, batch: [], timeout=5) == ([], [])
@@ -4,7 +4,6 @@ import logging
 import pexpect 
 import os
 import json
-import time
 import pytest
 from datetime import datetime
 from pathlib import Path
@@ -26,7 +25,6 @@ from test_run_service import (
     setup_logging,
     get_config_files,
     BaseTestService,
-    STARTUP_WAIT,
 )
 
 def get_included_test_configs() -> List[str]:
@@ -98,7 +96,7 @@ class StakingBaseTestService(BaseTestService):
 
     def get_staking_config_settings(self) -> dict:
         """Get config specific settings with updated staking handler."""
-        settings = get_config_specific_settings(self.config_path)
+        settings = get_config_specific_settings(self.config_path, self.rpc_urls, self.agent_rpc_urls)
         if r"Enter your choice" in settings["prompts"]:
             settings["prompts"].pop(r"Enter your choice", None)
         settings["prompts"][r"Enter your choice \(1 - \d+\):"] = self.handle_staking_choice
@@ -183,7 +181,6 @@ class StakingBaseTestService(BaseTestService):
         # Restore and call original start_service
         cls.start_service = original_start
         cls.start_service()
-        time.sleep(STARTUP_WAIT)
         
         # Now set setup complete
         cls._setup_complete = True
@@ -218,7 +215,7 @@ class StakingBaseTestService(BaseTestService):
             if not env_var:
                 raise ValueError(f"Unsupported chain: {chain_name}")
                 
-            rpc_url = os.getenv(env_var)
+            rpc_url = self.rpc_urls.get(env_var) or os.getenv(env_var)
             if not rpc_url:
                 raise ValueError(f"{env_var} environment variable not set")
             
@@ -275,7 +272,7 @@ class StakingBaseTestService(BaseTestService):
             if not env_var:
                 raise ValueError(f"Unsupported chain: {chain_name}")
                 
-            rpc_url = os.getenv(env_var)
+            rpc_url = self.rpc_urls.get(env_var) or os.getenv(env_var)
             if not rpc_url:
                 raise ValueError(f"{env_var} environment variable not set")
             
@@ -0,0 +1,49 @@
+"""Tests of the staking snapshot of the trader service report."""
+
+import sys
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from scripts.predict_trader import staking_snapshot
+from scripts.predict_trader.staking_snapshot import StakingSnapshotReader, StakingState
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+STAKING_CONTRACT = "0xeF662b5266db0AeFe55554c50cA6Ad25c1DA16fb"
+
+
+def test_read_unstaked_service():
+    """An unstaked service has an empty service info, which must not be indexed."""
+    reader = StakingSnapshotReader(
+        w3=mock.Mock(),
+        staking_token_address=STAKING_CONTRACT,
+        service_id=167,
+        safe_address=ZERO_ADDRESS,
+        operator_address=ZERO_ADDRESS,
+    )
+    results = [
+        1700000000,  # block timestamp
+        StakingState.UNSTAKED.value,
+        10**20,  # minStakingDeposit
+        (ZERO_ADDRESS, ZERO_ADDRESS, 0, 0, 0),  # mapServiceInfo
+        1699990000,  # tsCheckpoint
+        86400,  # livenessPeriod
+        1700076400,  # getNextRewardCheckpointTimestamp
+        (ZERO_ADDRESS, ZERO_ADDRESS, [], 0, 0, 0),  # getServiceInfo, with no nonces
+        10**15,  # livenessRatio
+        0,  # getOperatorBalance
+        0,  # getAgentBond
+        None,  # mapRequestsCounts
+        None,  # mapRequestCounts
+    ]
+
+    with mock.patch.object(reader, "_get_calls", return_value=[mock.Mock()] * len(results)), \
+            mock.patch.object(staking_snapshot, "aggregate", return_value=results):
+        snapshot = reader.read(block_number=123)
+
+    assert snapshot.staking_state == StakingState.UNSTAKED
+    assert not snapshot.is_staked
+    assert snapshot.block_number == 123
+    assert snapshot.block_timestamp == 1700000000
+    assert snapshot.accrued_rewards == 0
+    assert snapshot.mech_request_count_on_last_checkpoint == 0
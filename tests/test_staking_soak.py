@@ -0,0 +1,113 @@
+"""Tests of the service resolution of the staking soak driver."""
+
+import json
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import staking_report
+import staking_soak
+import test_staking_checkpoints
+from staking_report import DEFAULT_STAKING_CONTRACT
+from staking_timeline import load_service
+
+CONFIG_MULTISIG = "0x7E5A4eA25001a46133e423BAC3512EaB798fcB3B"
+OVERRIDE_MULTISIG = "0x1111111111111111111111111111111111111111"
+OVERRIDE_STAKING_CONTRACT = "0x2222222222222222222222222222222222222222"
+
+
+def write_service(operate_dir: Path, name: str, staking_program_id: str) -> None:
+    """Write a service configuration as operate does."""
+    service_dir = operate_dir / ".operate" / "services" / name
+    service_dir.mkdir(parents=True)
+    config = {
+        "name": name,
+        "chain_configs": {
+            "base": {
+                "ledger_config": {"rpc": "http://localhost:8545"},
+                "chain_data": {
+                    "token": 167,
+                    "multisig": CONFIG_MULTISIG,
+                    "user_params": {"staking_program_id": staking_program_id},
+                },
+            }
+        },
+    }
+    (service_dir / "config.json").write_text(json.dumps(config))
+
+
+@pytest.fixture
+def operate_dir(tmp_path, monkeypatch):
+    """Temporary repository root with a no_staking service, and an invalid one sorted first."""
+    for var in ("TEST_SERVICE_ID", "TEST_MULTISIG", "STAKING_CONTRACT_ADDRESS", "BASE_LEDGER_RPC"):
+        monkeypatch.delenv(var, raising=False)
+    monkeypatch.setattr(staking_report, "SCRIPT_PATH", tmp_path)
+    write_service(tmp_path, "invalid_sc-0", "not_an_address")
+    write_service(tmp_path, "sc-1", "no_staking")
+    return tmp_path
+
+
+def run_soak(service: dict) -> mock.Mock:
+    """Run a one-epoch scenario on a mocked chain, returning the mocked checkpoint recorder."""
+    with mock.patch.object(staking_soak, "record_service_checkpoint") as record, \
+            mock.patch.object(staking_soak, "create_attestation", return_value=True) as create, \
+            mock.patch.object(staking_soak, "call_checkpoint", return_value=True) as checkpoint, \
+            mock.patch.object(staking_soak, "advance_time"), \
+            mock.patch.object(staking_soak, "load_checkpoints", return_value={}), \
+            mock.patch.object(staking_soak, "load_private_key", return_value="0x" + "11" * 32):
+        staking_soak.run_scenario(mock.Mock(), service, staking_soak.Scenario(1, 24, 1, 24))
+
+    assert all(call.args[4] == service["multisig"] for call in create.call_args_list)
+    checkpoint.assert_called_once_with(mock.ANY, service["staking_contract"])
+    return record
+
+
+def test_no_staking_service(operate_dir):
+    """A no_staking service is recorded against the default staking contract."""
+    service = load_service()
+    assert service["name"] == "sc-1"
+    assert service["staking_contract"] == DEFAULT_STAKING_CONTRACT
+
+    record = run_soak(service)
+    assert record.call_count == 2
+    assert all(call.args[1] is service for call in record.call_args_list)
+
+
+def test_env_overrides(operate_dir, monkeypatch):
+    """The soak records the service given by the environment overrides."""
+    monkeypatch.setenv("TEST_SERVICE_ID", "42")
+    monkeypatch.setenv("TEST_MULTISIG", OVERRIDE_MULTISIG)
+    monkeypatch.setenv("STAKING_CONTRACT_ADDRESS", OVERRIDE_STAKING_CONTRACT)
+    service = load_service()
+    assert (service["service_id"], service["multisig"], service["staking_contract"]) == (
+        42, OVERRIDE_MULTISIG, OVERRIDE_STAKING_CONTRACT
+    )
+
+    record = run_soak(service)
+    assert all(call.args[1] is service for call in record.call_args_list)
+
+
+def test_service_state_reads_the_service_entry():
+    """The state of a checkpoint is read from the service entry, not from the raw configuration."""
+    w3 = mock.Mock()
+    w3.eth.get_block.return_value = {"timestamp": 1000}
+    staking = w3.eth.contract.return_value
+    staking.functions.getServiceInfo.return_value.call.return_value = [OVERRIDE_MULTISIG, OVERRIDE_MULTISIG, [0, 5], 100]
+    staking.functions.getStakingState.return_value.call.return_value = 1
+    w3.eth.contract.return_value.functions.getNumAttestations.return_value.call.return_value = 7
+    staking.functions.calculateStakingReward.return_value.call.return_value = 0
+    service = {"service_id": 42, "multisig": OVERRIDE_MULTISIG, "staking_contract": DEFAULT_STAKING_CONTRACT}
+
+    with mock.patch.object(test_staking_checkpoints, "read_liveness_ratio", return_value=10**15):
+        state = test_staking_checkpoints.get_service_state(w3, service)
+
+    assert mock.call(address=DEFAULT_STAKING_CONTRACT, abi=test_staking_checkpoints.STAKING_ABI) in w3.eth.contract.call_args_list
+    staking.functions.getStakingState.assert_called_once_with(42)
+    staking.functions.getNumAttestations.assert_called_once_with(OVERRIDE_MULTISIG)
+    assert (state["service_id"], state["multisig"], state["staking_contract"]) == (
+        42, OVERRIDE_MULTISIG, DEFAULT_STAKING_CONTRACT
+    )
+    assert state["delta_attestations"] == 2